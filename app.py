@@ -2,11 +2,27 @@ import os
 import json
 import logging
 import requests
+from contextlib import ExitStack
 from datetime import datetime
-from flask import Flask, request, jsonify, render_template
-from flask_socketio import SocketIO, emit
+from flask import Flask, request, render_template, Response, stream_with_context, g
+from flask_socketio import SocketIO, emit, join_room
 from dotenv import load_dotenv
 from database import *
+from export import stream_export, export_content_type
+from responses import json_response, requested_fields, project
+from ratelimit import RateLimiter, Backpressure, PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH, retry_after_header
+from deltas import MeetingDeltas
+from payloads import DeltaEncoder, ENCODING_JSON, ENCODING_BINARY
+from sync import MeetingSync
+from profiling import RequestProfiler
+from reports import ReportGenerator
+from terms import TermIndex, MeetingTerms, build_meeting_terms, TERM_TOP_K, TERM_MAX_K
+from sentiment import SentimentIndex
+from assets import AssetManifest, PageCache
+from ingest import (
+    ingest_participant_joined, ingest_participant_left, ingest_meeting_started, ingest_meeting_ended,
+    ingest_transcription, transcription_is_complete
+)
 
 # Load environment variables
 load_dotenv()
@@ -20,28 +36,198 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'secret!')
 socketio = SocketIO(app, async_mode='gevent')
 
+# Talk-time, status and engagement changes are coalesced and emitted as meeting_delta events,
+# as JSON or, for clients that opt in, as compact binary frames
+delta_encoder = DeltaEncoder()
+meeting_sync = MeetingSync()
+meeting_deltas = MeetingDeltas(socketio, encoder=delta_encoder, sync=meeting_sync)
+
+def publish_meeting_event(event, payload):
+    """Emit a meeting event to all clients, tagged with the meeting's next sync version"""
+    version = meeting_sync.record(payload['meeting_id'], event, payload)
+    socketio.emit(event, dict(payload, version=version))
+
+# Post-meeting reports are built in worker processes after a meeting is archived
+report_generator = ReportGenerator()
+
+# Live term counts per meeting, rebuilt from the stored transcriptions after a restart
+TERM_SOURCE_FIELDS = ['id', 'participant_id', 'transcript', 'timestamp']
+term_index = TermIndex(loader=lambda meeting_id: get_transcriptions_db(meeting_id, TERM_SOURCE_FIELDS))
+
+# Rolling sentiment per meeting and participant, pushed with meeting_delta events
+SENTIMENT_SOURCE_FIELDS = ['id', 'participant_id', 'sentiment_score', 'timestamp']
+sentiment_index = SentimentIndex(loader=lambda meeting_id: get_transcriptions_db(meeting_id, SENTIMENT_SOURCE_FIELDS))
+
 # Initialize database
 init_db()
 
+########################################################################################################################
+# Request Diagnostics
+########################################################################################################################
+
+request_profiler = RequestProfiler()
+
+def request_meeting_id():
+    """Meeting id a request is about, from the URL, query string or JSON body"""
+    meeting_id = (request.view_args or {}).get('meeting_id') or request.args.get('meeting_id')
+    if meeting_id is None and request.is_json:
+        meeting_id = (request.get_json(silent=True) or {}).get('meeting_id')
+    return normalize_meeting_id(meeting_id)
+
+@app.before_request
+def start_request_diagnostics():
+    """Trace the request's SQL in debug mode (or with SQL_TRACE), and profile it when asked to"""
+    tracing = app.debug or SQL_TRACE
+    profiling = request_profiler.enabled and request_profiler.should_profile(request.headers)
+    if not (tracing or profiling):
+        return
+
+    g.query_trace = QueryTrace(explain=tracing)
+    g.query_trace_scope = ExitStack()
+    g.query_trace_scope.enter_context(observe_statements(g.query_trace))
+    if profiling:
+        g.request_profile = request_profiler.start()
+
+@app.after_request
+def finish_request_diagnostics(response):
+    trace = g.get('query_trace')
+    if trace is None:
+        return response
+
+    if app.debug or SQL_TRACE:
+        trace.log_summary(f"{request.method} {request.path}")
+        response.headers['X-Query-Count'] = str(trace.count)
+        response.headers['X-Query-Time-Ms'] = f"{trace.total_seconds * 1000:.2f}"
+
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        try:
+            summary = request_profiler.finish(
+                profile,
+                trace,
+                request.url_rule.rule if request.url_rule else None,
+                request.method,
+                request.path,
+                request_meeting_id(),
+                response.status_code
+            )
+            response.headers['X-Profile-Id'] = summary['name']
+        except Exception as e:
+            print(f"Error writing request profile: {str(e)}")
+    return response
+
+@app.teardown_request
+def close_request_diagnostics(exc=None):
+    scope = g.pop('query_trace_scope', None)
+    if scope is not None:
+        scope.close()
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        request_profiler.stop(profile)
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_request_profiles():
+    """List the slowest recent request profiles (requires the profiling token; not found without one)"""
+    if not request_profiler.token:
+        # Sampled profiles hold request paths, meeting ids and SQL, so they are never listed openly
+        return json_response({
+            "success": False,
+            "message": "Not found"
+        }, 404)
+    if not request_profiler.authorized(request.headers):
+        return json_response({
+            "success": False,
+            "message": "Forbidden"
+        }, 403)
+
+    limit = request.args.get('limit', 20, type=int)
+    return json_response({
+        "success": True,
+        "data": request_profiler.slowest(limit)
+    }, 200)
+
 ########################################################################################################################
 # HTML Routes
 ########################################################################################################################
 
+# Static files are fingerprinted and precompressed once; url_for('static', ...) resolves to the hashed names
+static_assets = AssetManifest(app.static_folder)
+app.url_defaults(static_assets.url_defaults)
+app.view_functions['static'] = static_assets.serve
+
+# Pages without template arguments are rendered once
+page_cache = PageCache()
+
 @app.route('/')
 def index():
     """Render the main dashboard page"""
-    return render_template('index.html')
+    return page_cache.render('index.html')
 
 @app.route('/transcript-list/')
 def transcript_list():
     """Render the transcript list page"""
-    return render_template('transcript_list.html')
+    return page_cache.render('transcript_list.html')
 
 @app.route('/transcript-list/<meeting_id>')
 def transcript_detail(meeting_id):
     """Render the transcript detail page"""
     return render_template('transcript_detail.html', meeting_id=meeting_id)
 
+########################################################################################################################
+# Event Ingest
+########################################################################################################################
+
+# Events are stored by ingest.py (shared with the bulk importer); what follows is their live side:
+# socket events, the live indexes and report generation
+
+def finish_meeting(meeting_id, archived):
+    """Queue the report of a meeting that has just been archived and drop its live state"""
+    if archived:
+        # A new archive gets a new attempt even if the last report failed
+        report_generator.submit(meeting_id, retry=True)
+        terms = term_index.snapshot(meeting_id)
+        if terms:
+            save_meeting_terms_db(meeting_id, terms)
+    term_index.forget(meeting_id)
+    sentiment_index.forget(meeting_id)
+    delta_encoder.forget(meeting_id)
+    
+    # Emit to connected clients
+    publish_meeting_event('meeting_ended', {
+        'meeting_id': meeting_id,
+    })
+    meeting_sync.forget(meeting_id)
+
+def publish_transcription(data, saved):
+    """Emit a newly stored transcription and count it in the live term and sentiment indexes"""
+    meeting_id = normalize_meeting_id(data.get('meeting_id'))
+    participant_id = data.get('participant_id')
+    timestamp = data.get('timestamp')
+
+    # Emit socket event with the new transcription
+    transcription_data = {
+        'id': saved['id'],
+        'meeting_id': meeting_id,
+        'participant_id': participant_id,
+        'participant_name': data.get('participant_name'),
+        'transcript': saved['transcript'],
+        'sentiment_score': saved['sentiment_score'],
+        'timestamp': timestamp
+    }
+    
+    publish_meeting_event('new_transcription', transcription_data)
+    term_index.add(meeting_id, saved['id'], participant_id, saved['transcript'], timestamp)
+
+    # Updated sentiment aggregates go out with the next meeting_delta tick
+    meeting_sentiment, participant_sentiment = sentiment_index.add(
+        meeting_id, saved['id'], participant_id, saved['sentiment_score'], timestamp
+    )
+    meeting_deltas.record(
+        meeting_id, participant_id,
+        meeting_fields={'sentiment': meeting_sentiment},
+        sentiment=participant_sentiment
+    )
+
 ########################################################################################################################
 # Webhook Routes
 ########################################################################################################################
@@ -53,36 +239,20 @@ def handle_participant_joined(data):
         data = request.json
         print(f"Received participant joined webhook: {data}")
         
-        # Verify the webhook event type
-        if data.get('event') == 'meeting.participant_joined':
-            meeting_id = data.get('payload', {}).get('object', {}).get('id')
-            participant = data.get('payload', {}).get('object', {}).get('participant', {})
-            
-            participant_info = {
-                'id': participant.get('id'),
-                'name': participant.get('user_name'),
-                'user_id': participant.get('user_id'),
-                'join_time': datetime.now().isoformat(),
-                'leave_time': None,
-                'duration': 0,
-                'talk_time': 0
-            }
-            
-            # Save participant data to database
-            save_engagement_data_db(meeting_id, participant_info)
-            
+        joined = ingest_participant_joined(data)
+        if joined:
+            meeting_id, participant_info = joined
             # Emit to connected clients
-            socketio.emit('participant_joined', {
+            publish_meeting_event('participant_joined', {
                 'meeting_id': meeting_id,
                 'participant': participant_info
             })
-            
-            return jsonify({"status": "success"}), 200
+            return json_response({"status": "success"}, 200)
     except Exception as e:
         print(f"Error processing participant joined webhook: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}, 500)
     
-    return jsonify({"status": "ignored"}), 200
+    return json_response({"status": "ignored"}, 200)
 
 def handle_participant_left(data):
     """Handle participant left events from Zoom webhooks"""
@@ -91,27 +261,20 @@ def handle_participant_left(data):
         data = request.json
         print(f"Received participant left webhook: {data}")
         
-        # Verify the webhook event type
-        if data.get('event') == 'meeting.participant_left':
-            meeting_id = data.get('payload', {}).get('object', {}).get('id')
-            participant = data.get('payload', {}).get('object', {}).get('participant', {})
-            participant_id = participant.get('id')
-            
-            # Update the participant leave time
-            update_participant_leave_time_db(meeting_id, participant_id)
-            
+        left = ingest_participant_left(data)
+        if left:
+            meeting_id, participant_id = left
             # Emit to connected clients
-            socketio.emit('participant_left', {
+            publish_meeting_event('participant_left', {
                 'meeting_id': meeting_id,
                 'participant_id': participant_id
             })
-            
-            return jsonify({"status": "success"}), 200
+            return json_response({"status": "success"}, 200)
     except Exception as e:
         print(f"Error processing participant left webhook: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}, 500)
     
-    return jsonify({"status": "ignored"}), 200
+    return json_response({"status": "ignored"}, 200)
 
 def handle_meeting_started(data):
     """Handle meeting started events from Zoom webhooks"""
@@ -120,23 +283,20 @@ def handle_meeting_started(data):
         data = request.json
         print(f"Received meeting started webhook: {data}")
         
-        # Verify the webhook event type
-        if data.get('event') == 'meeting.started':
-            meeting_id = data.get('payload', {}).get('object', {}).get('id')
-            topic = data.get('payload', {}).get('object', {}).get('topic', 'Untitled Meeting')
-            
+        started = ingest_meeting_started(data)
+        if started:
+            meeting_id, topic = started
             # Emit to connected clients
-            socketio.emit('meeting_started', {
+            publish_meeting_event('meeting_started', {
                 'meeting_id': meeting_id,
                 'topic': topic
             })
-            
-            return jsonify({"status": "success"}), 200
+            return json_response({"status": "success"}, 200)
     except Exception as e:
         print(f"Error processing meeting started webhook: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}, 500)
     
-    return jsonify({"status": "ignored"}), 200
+    return json_response({"status": "ignored"}, 200)
 
 def handle_meeting_ended(data):
     """Handle meeting ended events from Zoom webhooks"""   
@@ -145,24 +305,15 @@ def handle_meeting_ended(data):
         data = request.json
         print(f"Received meeting ended webhook: {data}")
         
-        # Verify the webhook event type
-        if data.get('event') == 'meeting.ended':
-            meeting_id = data.get('payload', {}).get('object', {}).get('id')
-
-            # Archive transcripts to final storage and clear interim data
-            save_and_archive_meeting_data_db(meeting_id)
-            
-            # Emit to connected clients
-            socketio.emit('meeting_ended', {
-                'meeting_id': meeting_id,
-            })
-            
-            return jsonify({"status": "success"}), 200
+        ended = ingest_meeting_ended(data)
+        if ended:
+            finish_meeting(*ended)
+            return json_response({"status": "success"}, 200)
     except Exception as e:
         print(f"Error processing meeting ended webhook: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}, 500)
     
-    return jsonify({"status": "ignored"}), 200
+    return json_response({"status": "ignored"}, 200)
 
 @app.route("/webhook", methods=["POST"])
 def zoom_webhook():
@@ -185,107 +336,219 @@ def zoom_webhook():
 
     except Exception as e:
         print(f"Error processing webhook event: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+        return json_response({"status": "error", "message": str(e)}, 500)
 
-    return jsonify({"status": "ignored"}), 200
+    return json_response({"status": "ignored"}, 200)
+
+########################################################################################################################
+# Ingest Throttling
+########################################################################################################################
+
+rate_limiter = RateLimiter()
+backpressure = Backpressure(write_pressure)
+
+def throttle_ingest(data, participant_id, priority):
+    """
+    Apply write backpressure and per-client rate limits to an ingest request
+    Returns the error response to send back, or None if the request may proceed
+    """
+    retry_after = backpressure.should_shed(priority)
+    if retry_after:
+        response = json_response({
+            "success": False,
+            "message": "Server is busy, update dropped"
+        }, 429)
+        response.headers['Retry-After'] = retry_after_header(retry_after)
+        return response
+
+    meeting_id = normalize_meeting_id(data.get('meeting_id'))
+    retry_after = rate_limiter.check([
+        ('browser', data.get('browser_id')),
+        ('participant', f"{meeting_id}:{participant_id}" if participant_id else None),
+        ('meeting', meeting_id),
+    ])
+    if retry_after:
+        response = json_response({
+            "success": False,
+            "message": "Rate limit exceeded"
+        }, 429)
+        response.headers['Retry-After'] = retry_after_header(retry_after)
+        return response
+
+    return None
 
 ########################################################################################################################
 # Dashboard API Routes
 ########################################################################################################################
 
+@app.route('/api/meetings', methods=['GET'])
+def list_meetings():
+    """List meetings by status (?status=active by default), from the trigger-maintained summary"""
+    status = request.args.get('status', 'active')
+    if status not in MEETING_STATUSES:
+        return json_response({
+            "success": False,
+            "message": f"Invalid status, expected one of: {', '.join(MEETING_STATUSES)}"
+        }, 400)
+
+    try:
+        meetings = get_meetings_by_status_db(status, requested_fields())
+    except ValueError as e:
+        return json_response({
+            "success": False,
+            "message": str(e)
+        }, 400)
+
+    if meetings is None:
+        return json_response({
+            "success": False,
+            "message": "Error listing meetings"
+        }, 500)
+
+    return json_response({
+        "success": True,
+        "data": meetings
+    }, 200)
+
 @app.route('/api/meetings/<meeting_id>', methods=['GET'])
 def get_meeting_data(meeting_id):
     """Fetch meeting data with optional type parameter"""
     try:
         data_type = request.args.get('type', 'info')  # Default to 'info'
-        meeting_id = meeting_id.replace(" ", "")
+        fields = requested_fields()
+        meeting_id = normalize_meeting_id(meeting_id)
         
         if data_type == 'info':
             # Get basic meeting information
-            data = get_meeting_info_db(meeting_id)
+            data = project(get_meeting_info_db(meeting_id), fields)
             print(f"Fetching meeting info for meeting {meeting_id}: {data}")
         elif data_type == 'transcriptions':
             # Get live transcriptions
-            data = get_transcriptions_db(meeting_id)
+            data = get_transcriptions_db(meeting_id, fields)
             print(f"Fetching transcriptions for meeting {meeting_id}: {data}")
         elif data_type == 'participants':
             # Get participants
-            data = get_meeting_participants_db(meeting_id)
+            data = get_meeting_participants_db(meeting_id, fields)
             print(f"Fetching participants for meeting {meeting_id}: {data}")
+        elif data_type == 'sentiment':
+            # Get rolling sentiment, overall and per participant
+            data = sentiment_index.summary(meeting_id)
         elif data_type == 'transcript':
             # Try to get final transcript first
-            data = get_final_transcript_db(meeting_id)
+            data = get_final_transcript_db(meeting_id, fields)
             print(f"Fetching final transcript for meeting {meeting_id}: {data}")
             # If no final transcript exists, get interim transcriptions
             if not data:
                 data = get_transcriptions_db(meeting_id)
-                return jsonify({
+                return json_response({
                     "success": True,
                     "is_final": False,
                     "data": data
-                }), 200
+                }, 200)
             else:
-                return jsonify({
+                return json_response({
                     "success": True, 
                     "is_final": True,
                     "data": data
-                }), 200
+                }, 200)
                 
         if data:
-            return jsonify({"success": True, "data": data}), 200
+            return json_response({"success": True, "data": data}, 200)
         else:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": f"No {data_type} found for meeting {meeting_id}"
-            }), 404
-            
+            }, 404)
+
+    except ValueError as e:
+        return json_response({"success": False, "message": str(e)}, 400)
     except Exception as e:
         print(f"Error fetching meeting data: {str(e)}")
-        return jsonify({"success": False, "message": str(e)}), 500
+        return json_response({"success": False, "message": str(e)}, 500)
+
+@app.route('/api/meetings/<meeting_id>/terms', methods=['GET'])
+def get_meeting_terms(meeting_id):
+    """
+    Top terms of a meeting: overall and in the recent window (?k= terms, ?participant_id= for one speaker)
+    Ended meetings are served from the counts stored with their archive
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+    k = request.args.get('k', TERM_TOP_K, type=int)
+    if not 0 < k <= TERM_MAX_K:
+        return json_response({
+            "success": False,
+            "message": f"k must be between 1 and {TERM_MAX_K}"
+        }, 400)
+    participant_id = request.args.get('participant_id')
+
+    try:
+        is_final = has_final_transcript_db(meeting_id)
+        if is_final:
+            stored = get_meeting_terms_db(meeting_id)
+            if stored:
+                index = MeetingTerms.from_snapshot(stored)
+            else:
+                # Archives from before term counts were stored are indexed on the fly
+                index = build_meeting_terms(get_transcriptions_db(meeting_id, TERM_SOURCE_FIELDS))
+            data = dict(index.top(k, participant_id), utterances=index.utterances) if index else None
+        else:
+            data = term_index.top(meeting_id, k, participant_id)
+
+        if data is None:
+            return json_response({
+                "success": False,
+                "message": f"No terms found for meeting {meeting_id}"
+            }, 404)
+
+        return json_response({
+            "success": True,
+            "is_final": is_final,
+            "data": dict(data, meeting_id=meeting_id)
+        }, 200)
+
+    except Exception as e:
+        print(f"Error fetching meeting terms: {str(e)}")
+        return json_response({"success": False, "message": str(e)}, 500)
 
 @app.route('/api/participant/active', methods=['POST'])
 def update_participant_active_status():
     """Update the active status of a participant"""
     try:
         data = request.json
-        meeting_id = data.get('meeting_id')
+        meeting_id = normalize_meeting_id(data.get('meeting_id'))
         participant_id = data.get('participant_id')
         is_active = data.get('is_active', False)
         browser_id = data.get('browser_id')
         
         if not meeting_id or not participant_id:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": "Missing required fields: meeting_id or participant_id"
-            }), 400
+            }, 400)
             
         # Update participant active status in the database
-        result = update_participant_status_db(meeting_id, participant_id, is_active, browser_id)
+        result = update_participant_status_db(meeting_id, participant_id, is_active, browser_id).result()
         
         if result:
-            # Emit socket event to notify clients
-            socketio.emit('participant_status_change', {
-                'meeting_id': meeting_id,
-                'participant_id': participant_id,
-                'is_active': is_active
-            })
+            # Notify clients with the next meeting_delta tick
+            meeting_deltas.record(meeting_id, participant_id, is_active=is_active)
             
-            return jsonify({
+            return json_response({
                 "success": True,
                 "message": f"Participant status updated to {'active' if is_active else 'inactive'}"
-            }), 200
+            }, 200)
         else:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": "Failed to update participant status"
-            }), 500
+            }, 500)
             
     except Exception as e:
         print(f"Error updating participant status: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "message": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/transcription', methods=['POST'])
 def add_transcription():
@@ -293,71 +556,54 @@ def add_transcription():
     print("adding transcription: ", request.json)
     try:
         data = request.json
-        meeting_id = data.get('meeting_id')
         participant_id = data.get('participant_id')
-        participant_name = data.get('participant_name')
-        transcript = data.get('transcript')
-        timestamp = data.get('timestamp')
-        browser_id = data.get('browser_id')
         
-        if not all([meeting_id, participant_id, participant_name, transcript]):
-            return jsonify({
+        if not transcription_is_complete(data):
+            return json_response({
                 "success": False,
                 "message": "Missing required fields"
-            }), 400
+            }, 400)
+
+        throttled = throttle_ingest(data, participant_id, PRIORITY_HIGH)
+        if throttled:
+            return throttled
             
-        # Process the transcription (sentiment analysis, etc.)
-        sentiment_score = analyze_sentiment(transcript)
-        
-        # Save to database
-        transcription_id = save_transcription_db(
-            meeting_id, 
-            participant_id, 
-            participant_name, 
-            transcript, 
-            sentiment_score, 
-            timestamp, 
-            browser_id
-        )
+        saved = ingest_transcription(data)
+        if saved and not saved['duplicate']:
+            publish_transcription(data, saved)
+
+        if saved and saved['duplicate']:
+            return json_response({
+                "success": True,
+                "id": saved['id'],
+                "duplicate": True
+            }, 200)
         
-        if transcription_id:
-            # Emit socket event with the new transcription
-            transcription_data = {
-                'id': transcription_id,
-                'meeting_id': meeting_id,
-                'participant_id': participant_id,
-                'participant_name': participant_name,
-                'transcript': transcript,
-                'sentiment_score': sentiment_score,
-                'timestamp': timestamp
-            }
-            
-            socketio.emit('new_transcription', transcription_data)
-            
-            return jsonify({
+        if saved:
+            return json_response({
                 "success": True,
-                "id": transcription_id,
-                "sentiment_score": sentiment_score
-            }), 201
+                "id": saved['id'],
+                "sentiment_score": saved['sentiment_score']
+            }, 201)
         else:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": "Failed to save transcription"
-            }), 500
+            }, 500)
             
     except Exception as e:
         print(f"Error adding transcription: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "message": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/talk-time', methods=['POST'])
 def update_talk_time():
     """Update talk time for a participant"""
     try:
         data = request.json
-        meeting_id = data.get('meeting_id')
+        meeting_id = normalize_meeting_id(data.get('meeting_id'))
         participant_id = data.get('participant_id')
         talk_time = data.get('talk_time', 0)
         print("!!!TALK TIME!!!")
@@ -365,38 +611,40 @@ def update_talk_time():
         print(meeting_id)
         
         if not meeting_id or not participant_id:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": "Missing required fields: meeting_id or participant_id"
-            }), 400
+            }, 400)
+
+        # Interim updates are superseded by the next one, so they are the first to be shed
+        priority = PRIORITY_LOW if data.get('is_interim') else PRIORITY_NORMAL
+        throttled = throttle_ingest(data, participant_id, priority)
+        if throttled:
+            return throttled
             
         # Update talk time in the database
-        result = update_participant_talk_time_db(meeting_id, participant_id, talk_time)
+        result = update_participant_talk_time_db(meeting_id, participant_id, talk_time).result()
         
         if result:
-            # Emit socket event to notify clients
-            socketio.emit('talk_time_updated', {
-                'meeting_id': meeting_id,
-                'participant_id': participant_id,
-                'talk_time': talk_time
-            })
+            # Notify clients with the next meeting_delta tick
+            meeting_deltas.record(meeting_id, participant_id, talk_time=talk_time)
             
-            return jsonify({
+            return json_response({
                 "success": True,
                 "message": f"Talk time updated to {talk_time} seconds"
-            }), 200
+            }, 200)
         else:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": "Failed to update talk time"
-            }), 500
+            }, 500)
             
     except Exception as e:
         print(f"Error updating talk time: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "message": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/engagement-snapshot', methods=['POST'])
 def update_engagement_snapshot():
@@ -405,7 +653,7 @@ def update_engagement_snapshot():
     try:
         data = request.json
         print(data)
-        meeting_id = data.get('meeting_id')
+        meeting_id = normalize_meeting_id(data.get('meeting_id'))
         participants = data.get('participants')
         participant_id = participants[0].get('id')
         is_engaged = data.get('is_engaged', False)
@@ -416,39 +664,38 @@ def update_engagement_snapshot():
         if not meeting_id or not participant_id:
             print(meeting_id, participant_id)
             print("bad req")
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": "Missing required fields: meeting_id or participant_id"
-            }), 400
+            }, 400)
+
+        throttled = throttle_ingest(data, participant_id, PRIORITY_NORMAL)
+        if throttled:
+            return throttled
             
         # Save engagement snapshot to database
-        result = save_engagement_snapshot_db(meeting_id, participant_id, is_engaged, timestamp, browser_id, engagement_score)
+        result = save_engagement_snapshot_db(meeting_id, participant_id, is_engaged, timestamp, browser_id, engagement_score).result()
         
         if result:
-            # Emit socket event to notify clients
-            socketio.emit('engagement_update', {
-                'meeting_id': meeting_id,
-                'participant_id': participant_id,
-                'is_engaged': is_engaged,
-                'timestamp': timestamp
-            })
+            # Notify clients with the next meeting_delta tick
+            meeting_deltas.record(meeting_id, participant_id, is_engaged=is_engaged, timestamp=timestamp)
             
-            return jsonify({
+            return json_response({
                 "success": True,
                 "message": f"Engagement snapshot recorded for participant {participant_id}"
-            }), 200
+            }, 200)
         else:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": "Failed to record engagement snapshot"
-            }), 500
+            }, 500)
             
     except Exception as e:
         print(f"Error updating engagement snapshot: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "message": str(e)
-        }), 500
+        }, 500)
 
 ########################################################################################################################
 # Transcript API Routes
@@ -459,168 +706,258 @@ def get_all_transcripts():
     """Retrieve a list of all available transcripts"""
     print("getting all transcripts")
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # Query to get all final transcripts with basic info
-        cursor.execute('''
-        SELECT
-            meeting_id,
-            meeting_date,
-            created_at,
-            transcript_data,
-            participant_data
-        FROM final_meeting_transcripts
-        ORDER BY created_at DESC
-        ''')
-
-        rows = cursor.fetchall()
-
-        # Convert to list of dictionaries
-        transcripts = []
-        for row in rows:
-            # Load JSON data
-            transcript_data = json.loads(row['transcript_data'])
-            participant_data = json.loads(row['participant_data'])
-
-            # Extract meeting topic from transcript data (if available)
-            meeting_topic = transcript_data[0].get('meeting_topic', "Untitled Meeting") if transcript_data else "Untitled Meeting"  # Adjust based on actual structure
-
-            # Get participant count from participant data
-            participant_count = len(participant_data) if participant_data else 0
-
-            transcripts.append({
-                'meeting_id': row['meeting_id'],
-                'meeting_date': row['meeting_date'],
-                'created_at': row['created_at'],
-                'meeting_topic': meeting_topic,
-                'participant_count': participant_count
-            })
-
-        return jsonify({
-            "success": True,
-            "data": transcripts
-        }), 200
-
-    except Exception as e:
-        print(f"Error retrieving transcript list: {str(e)}")
-        return jsonify({
+        transcripts = get_all_transcripts_db(requested_fields())
+    except ValueError as e:
+        return json_response({
             "success": False,
             "message": str(e)
-        }), 500
-    finally:
-        conn.close()
+        }, 400)
+
+    if transcripts is None:
+        return json_response({
+            "success": False,
+            "message": "Error retrieving transcript list"
+        }, 500)
+
+    return json_response({
+        "success": True,
+        "data": transcripts
+    }, 200)
 
 @app.route('/api/transcripts/<meeting_id>', methods=['GET'])
 def get_final_transcript(meeting_id):
-    """Retrieve archived transcript for a meeting"""
+    """
+    Retrieve archived transcript for a meeting
+    With offset/limit or start/end (timestamp window) query params, only that page of utterances is returned;
+    limit defaults to and is capped at TRANSCRIPT_MAX_PAGE_SIZE
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
     print("final transcript meeting id: ", meeting_id)
     try:
-        result = get_final_transcript_db(meeting_id)
+        paging = {key: request.args.get(key) for key in ('offset', 'limit', 'start', 'end')}
+        if any(value is not None for value in paging.values()):
+            offset = int(paging['offset']) if paging['offset'] else 0
+            limit = int(paging['limit']) if paging['limit'] else TRANSCRIPT_MAX_PAGE_SIZE
+            if offset < 0:
+                raise ValueError("offset must not be negative")
+            if limit <= 0:
+                raise ValueError("limit must be positive")
+            result = get_final_transcript_page_db(
+                meeting_id,
+                offset=offset,
+                limit=min(limit, TRANSCRIPT_MAX_PAGE_SIZE),
+                start_time=paging['start'],
+                end_time=paging['end']
+            )
+        else:
+            result = get_final_transcript_db(meeting_id, requested_fields())
         
         if result:
-            return jsonify({
+            return json_response({
                 "success": True,
                 "data": result
-            }), 200
+            }, 200)
         else:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": f"No final transcript found for meeting {meeting_id}"
-            }), 404
-            
+            }, 404)
+
+    except ValueError as e:
+        return json_response({
+            "success": False,
+            "message": str(e)
+        }, 400)
     except Exception as e:
         print(f"Error retrieving final transcript: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "message": str(e)
-        }), 500
+        }, 500)
+
+@app.route('/api/transcripts/<meeting_id>/report', methods=['GET'])
+def get_meeting_report(meeting_id):
+    """
+    Retrieve the precomputed post-meeting report of an archived meeting
+    Answers 202 while the report is still being generated (older archives get one queued on first request),
+    and 500 if generating it failed
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+    report = get_meeting_report_db(meeting_id)
+    if report is not None:
+        return json_response({
+            "success": True,
+            "data": report
+        }, 200)
+
+    if not has_final_transcript_db(meeting_id):
+        return json_response({
+            "success": False,
+            "message": f"No final transcript found for meeting {meeting_id}"
+        }, 404)
+
+    report_generator.submit(meeting_id)
+    error = report_generator.failure(meeting_id)
+    if error is not None:
+        return json_response({
+            "success": False,
+            "message": f"Report for meeting {meeting_id} could not be generated: {error}"
+        }, 500)
+
+    return json_response({
+        "success": False,
+        "message": f"Report for meeting {meeting_id} is being generated"
+    }, 202)
 
 @app.route('/api/transcripts/<meeting_id>', methods=['DELETE'])
 def delete_permanent_transcript(meeting_id):
     """Delete a permanent transcript record"""
+    meeting_id = normalize_meeting_id(meeting_id)
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Delete the final transcript
-        cursor.execute('''
-        DELETE FROM final_meeting_transcripts
-        WHERE meeting_id = ?
-        ''', (meeting_id,))
-        
-        conn.commit()
-        
-        if cursor.rowcount > 0:
-            print(f"Deleted permanent transcript for meeting {meeting_id}")
-            return jsonify({
+        if delete_final_transcript_db(meeting_id).result():
+            return json_response({
                 "success": True,
                 "message": f"Permanent transcript for meeting {meeting_id} deleted"
-            }), 200
+            }, 200)
         else:
-            return jsonify({
+            return json_response({
                 "success": False,
                 "message": f"No permanent transcript found for meeting {meeting_id}"
-            }), 404
+            }, 404)
             
     except Exception as e:
         print(f"Error deleting permanent transcript: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "message": str(e)
-        }), 500
-    finally:
-        conn.close()
+        }, 500)
 
 ########################################################################################################################
-# Sentiment Analysis
+# Analytics API Routes
 ########################################################################################################################
 
-def analyze_sentiment(text):
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
     """
-    Analyze the sentiment of the given text
-    Returns a score between -1 (negative) and 1 (positive)
+    Cross-meeting analytics answered from the precomputed rollups
+    Query params: group_by (participant|meeting|day), start/end (YYYY-MM-DD),
+    participant_id and meeting_id (comma separated)
+    Per day, participant_count is the number of participant-meetings, not of distinct people
     """
+    group_by = request.args.get('group_by', 'participant')
+    start_date = request.args.get('start')
+    end_date = request.args.get('end')
+    participant_ids = [i.strip() for i in request.args.get('participant_id', '').split(',') if i.strip()]
+    meeting_ids = [normalize_meeting_id(i) for i in request.args.get('meeting_id', '').split(',') if i.strip()]
+
     try:
-        # Simple dictionary of positive and negative words
-        positive_words = [
-            'good', 'great', 'excellent', 'amazing', 'happy', 'like', 'love', 
-            'best', 'better', 'yes', 'agree', 'thanks', 'thank', 'appreciate'
-        ]
-        
-        negative_words = [
-            'bad', 'terrible', 'awful', 'hate', 'dislike', 'worst', 'worse',
-            'no', 'not', 'disagree', 'difficult', 'problem', 'issue', 'sorry'
-        ]
-        
-        # Convert to lowercase and split into words
-        words = text.lower().split()
-        
-        # Count positive and negative words
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
-        
-        # Calculate sentiment score between -1 and 1
-        total = positive_count + negative_count
-        if total == 0:
-            return 0  # Neutral
-        
-        score = (positive_count - negative_count) / total
-        return score
-        
-    except Exception as e:
-        print(f"Error in sentiment analysis: {str(e)}")
-        return 0  # Return neutral on error
+        data = get_analytics_db(group_by, start_date, end_date, participant_ids, meeting_ids)
+    except ValueError as e:
+        return json_response({
+            "success": False,
+            "message": str(e)
+        }, 400)
+
+    if data is None:
+        return json_response({
+            "success": False,
+            "message": "Error retrieving analytics"
+        }, 500)
+
+    return json_response({
+        "success": True,
+        "group_by": group_by,
+        "data": project(data, requested_fields())
+    }, 200)
+
+########################################################################################################################
+# Export API Routes
+########################################################################################################################
+
+@app.route('/api/export', methods=['GET'])
+def export_archived_meetings():
+    """
+    Stream one table (utterances or participants) of the selected archived meetings
+    Query params: table, format (csv|parquet|arrow), start/end (YYYY-MM-DD), ids (comma separated)
+    """
+    table = request.args.get('table', 'utterances')
+    fmt = request.args.get('format', 'csv')
+    start_date = request.args.get('start')
+    end_date = request.args.get('end')
+    ids = request.args.get('ids')
+    meeting_ids = [normalize_meeting_id(i) for i in ids.split(',') if i.strip()] if ids else None
+
+    try:
+        stream = stream_export(table, fmt, start_date, end_date, meeting_ids)
+    except ValueError as e:
+        return json_response({
+            "success": False,
+            "message": str(e)
+        }, 400)
+
+    mimetype, extension = export_content_type(fmt)
+    return Response(
+        stream_with_context(stream),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={table}.{extension}'}
+    )
 
 ########################################################################################################################
 # SocketIO Events
 ########################################################################################################################
 
 @socketio.on('connect')
-def handle_connect():
-    """Handle client connection to WebSocket"""
-    print('Client connected')
+def handle_connect(auth=None):
+    """
+    Handle client connection to WebSocket
+    Clients pass auth {"encoding": "binary"} to receive meeting_delta as binary frames
+    """
+    encoding = ENCODING_BINARY if (auth or {}).get('encoding') == ENCODING_BINARY else ENCODING_JSON
+    join_room(meeting_deltas.room(encoding))
+    print(f'Client connected ({encoding} meeting deltas)')
+
+@socketio.on('sync_meeting')
+def handle_sync_meeting(data):
+    """
+    Bring a dashboard up to date with a meeting
+    A client sending the epoch and version it last applied gets only the missed events (sync_replay);
+    otherwise, or when those events are no longer buffered, it gets a fresh versioned snapshot
+    """
+    if not isinstance(data, dict):
+        data = {}
+    meeting_id = normalize_meeting_id(data.get('meeting_id'))
+    if not meeting_id:
+        return
+
+    missed = meeting_sync.events_since(meeting_id, data.get('epoch'), data.get('version'))
+    if missed is not None:
+        emit('sync_replay', {
+            'meeting_id': meeting_id,
+            'epoch': meeting_sync.epoch,
+            'events': missed
+        })
+        return
+
+    # Taken before reading, so an event racing the snapshot is replayed rather than lost
+    version = meeting_sync.version(meeting_id)
+    emit('sync_snapshot', {
+        'meeting_id': meeting_id,
+        'epoch': meeting_sync.epoch,
+        'version': version,
+        'info': get_meeting_info_db(meeting_id),
+        'participants': get_meeting_participants_db(meeting_id),
+        'transcriptions': get_transcriptions_db(meeting_id),
+        'sentiment': sentiment_index.summary(meeting_id)
+    })
+
+@socketio.on('delta_index')
+def handle_delta_index(data):
+    """Send the participant index of a meeting to a binary client that joined mid-meeting"""
+    meeting_id = normalize_meeting_id((data or {}).get('meeting_id'))
+    emit('delta_index', {
+        'meeting_id': meeting_id,
+        'participants': delta_encoder.participant_ids(meeting_id)
+    })
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -0,0 +1,190 @@
+"""
+Fingerprinted, precompressed static assets and cached rendering of the static pages, without a build step
+
+At startup every file under static/ is read once, named after a hash of its content
+(css/styles.css -> css/styles.3f2a9c1b7d.css) and compressed with gzip, and with brotli when it is
+installed. url_for('static', filename=...) in the templates resolves to the fingerprinted name, which
+is served from memory with the best encoding the client accepts and an immutable one-year
+Cache-Control, since any change to the file changes its name. The unhashed names keep working, but
+are revalidated on every use.
+
+Pages that depend only on their template (the dashboard and the transcript list) are rendered once
+and kept compressed; they are revalidated with an ETag, so a new deployment's asset names are picked
+up. In debug mode assets are re-read when a file changes and pages are rendered on every hit.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from flask import request, current_app, render_template, send_from_directory, Response
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+ASSET_HASH_LENGTH = 10
+ASSET_MAX_AGE = 365 * 24 * 3600                 # fingerprinted names change with their content
+ASSET_COMPRESS_MIN_BYTES = int(os.getenv('ASSET_COMPRESS_MIN_BYTES', 512))
+ASSET_GZIP_LEVEL = 9                            # compressed once, so the slowest levels are affordable
+ASSET_BROTLI_QUALITY = 11
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+def _compress(body, mimetype):
+    """Encodings of a body as {content encoding: bytes}, keeping only compressions that make it smaller"""
+    variants = {'identity': body}
+    if len(body) < ASSET_COMPRESS_MIN_BYTES or not mimetype.startswith(COMPRESSIBLE_TYPES):
+        return variants
+    compressed = {'gzip': gzip.compress(body, ASSET_GZIP_LEVEL)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(body, quality=ASSET_BROTLI_QUALITY)
+    for encoding, data in compressed.items():
+        if len(data) < len(body):
+            variants[encoding] = data
+    return variants
+
+def _encoded_response(variants, mimetype, etag, cache_control):
+    """Response with the smallest variant the client accepts, answering 304 when its ETag still matches"""
+    encoding = 'identity'
+    for candidate in ('br', 'gzip'):
+        if candidate in variants and request.accept_encodings[candidate]:
+            encoding = candidate
+            break
+
+    response = Response(variants[encoding], mimetype=mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    if len(variants) > 1:
+        response.vary.add('Accept-Encoding')
+    # Each encoding is a different representation, so it gets its own ETag
+    response.set_etag(etag if encoding == 'identity' else f"{etag}-{encoding}")
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+########################################################################################################################
+# Static Assets
+########################################################################################################################
+
+class StaticAsset:
+    """A static file's content, hash and encodings"""
+
+    __slots__ = ('filename', 'fingerprinted', 'mimetype', 'digest', 'variants')
+
+    def __init__(self, filename, body):
+        self.filename = filename
+        self.digest = hashlib.sha256(body).hexdigest()[:ASSET_HASH_LENGTH]
+        root, ext = os.path.splitext(filename)
+        self.fingerprinted = f"{root}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        self.variants = _compress(body, self.mimetype)
+
+
+class AssetManifest:
+    """
+    Fingerprinted assets of a static folder
+    Hook it into the app with app.url_defaults(manifest.url_defaults) and as the 'static' view function
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._assets = {}
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self.build()
+
+    def _scan(self):
+        """Modification time of every file under the folder, by path relative to it (with / separators)"""
+        mtimes = {}
+        for directory, dirnames, filenames in os.walk(self.folder):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for name in filenames:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                filename = os.path.relpath(path, self.folder).replace(os.sep, '/')
+                try:
+                    mtimes[filename] = os.path.getmtime(path)
+                except OSError:
+                    continue
+        return mtimes
+
+    def build(self):
+        """Hash and compress every file of the folder"""
+        mtimes = self._scan()
+        assets = {}
+        for filename in mtimes:
+            try:
+                with open(os.path.join(self.folder, filename), 'rb') as f:
+                    asset = StaticAsset(filename, f.read())
+            except OSError as e:
+                print(f"Error reading static asset {filename}: {str(e)}")
+                continue
+            assets[filename] = asset
+            assets[asset.fingerprinted] = asset
+        with self._lock:
+            self._assets = assets
+            self._mtimes = mtimes
+        print(f"Fingerprinted {len(mtimes)} static assets{' (brotli unavailable, gzip only)' if brotli is None else ''}")
+
+    def refresh(self):
+        """Rebuild if any file was added, removed or modified (used in debug mode)"""
+        if self._scan() != self._mtimes:
+            self.build()
+
+    def url_name(self, filename):
+        """Fingerprinted name of a static file (the name itself for files not in the manifest)"""
+        if current_app.debug:
+            self.refresh()
+        asset = self._assets.get(filename)
+        return asset.fingerprinted if asset is not None and asset.filename == filename else filename
+
+    def url_defaults(self, endpoint, values):
+        """Rewrite url_for('static', filename=...) to the fingerprinted name"""
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = self.url_name(values['filename'])
+
+    def serve(self, filename):
+        """Serve a static file from memory; fingerprinted names are cached for good"""
+        asset = self._assets.get(filename)
+        if asset is None:
+            # Added after startup: fall back to Flask's file serving
+            return send_from_directory(self.folder, filename)
+
+        if filename == asset.fingerprinted:
+            cache_control = f"public, max-age={ASSET_MAX_AGE}, immutable"
+        else:
+            cache_control = 'no-cache'
+        return _encoded_response(asset.variants, asset.mimetype, asset.digest, cache_control)
+
+########################################################################################################################
+# Cached Pages
+########################################################################################################################
+
+class PageCache:
+    """Rendered, compressed HTML of pages that take no template arguments"""
+
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def render(self, template):
+        """Response for a page, rendered on first use (on every use in debug mode)"""
+        if current_app.debug:
+            return Response(render_template(template), mimetype='text/html')
+
+        with self._lock:
+            page = self._pages.get(template)
+        if page is None:
+            body = render_template(template).encode('utf-8')
+            page = (_compress(body, 'text/html'), hashlib.sha256(body).hexdigest()[:ASSET_HASH_LENGTH])
+            with self._lock:
+                page = self._pages.setdefault(template, page)
+
+        variants, etag = page
+        return _encoded_response(variants, 'text/html', etag, 'no-cache')
+
+    def clear(self):
+        """Forget every rendered page"""
+        with self._lock:
+            self._pages.clear()
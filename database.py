@@ -1,58 +1,1297 @@
+import contextvars
+import hashlib
+import heapq
+import os
+import queue
 import sqlite3
 import json
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
 
-DATABASE_PATH = 'zoom_engagement.db'
+try:
+    from gevent import getcurrent
+    from gevent._hub_local import get_hub_if_exists
+    from gevent.event import AsyncResult
+except ImportError:  # plain threads only
+    get_hub_if_exists = None
+
+logger = logging.getLogger(__name__)
+
+DATABASE_PATH = os.getenv('DATABASE_PATH', 'zoom_engagement.db')
+DATABASE_SHARDS = int(os.getenv('DATABASE_SHARDS', 1))      # database files meetings are spread over
+READER_POOL_SIZE = int(os.getenv('DB_READER_POOL_SIZE', 4))
+WRITE_BATCH_SIZE = int(os.getenv('DB_WRITE_BATCH_SIZE', 64))
+BUSY_TIMEOUT_MS = 5000
+
+########################################################################################################################
+# Connection Management
+########################################################################################################################
+
+# Callback(cursor, sql, parameters, seconds) told about every statement run on behalf of the current
+# request, if any; it may return a dict whose 'rows' the cursor then counts up as rows are fetched
+_statement_observer = contextvars.ContextVar('statement_observer', default=None)
+
+class ObservedCursor(sqlite3.Cursor):
+    """Cursor that reports statements to the active observer (a single lookup when there is none)"""
+
+    _statement = None
+
+    def execute(self, sql, parameters=()):
+        observer = _statement_observer.get()
+        if observer is None:
+            self._statement = None
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._statement = observer(self, sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        observer = _statement_observer.get()
+        if observer is None:
+            self._statement = None
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._statement = observer(self, sql, None, time.perf_counter() - start)
+
+    # Rows read by iterating the cursor are not counted, to keep streaming exports at C speed
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None and self._statement is not None:
+            self._statement['rows'] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._statement is not None:
+            self._statement['rows'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if self._statement is not None:
+            self._statement['rows'] += len(rows)
+        return rows
+
+
+class ObservedConnection(sqlite3.Connection):
+    """Connection whose cursors, including the ones behind conn.execute, are ObservedCursors"""
+
+    def cursor(self, factory=ObservedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+@contextmanager
+def observe_statements(observer):
+    """Report every statement run in this context, including queued writes it waits on, to observer"""
+    token = _statement_observer.set(observer)
+    try:
+        yield
+    finally:
+        _statement_observer.reset(token)
+
+def _observed(operation, observer):
+    """Run a write operation on the writer thread under the submitting request's observer"""
+    def run(cursor):
+        with observe_statements(observer):
+            return operation(cursor)
+    return run
+
+
+class WriteFuture(Future):
+    """
+    Future for a queued write whose result() yields to other greenlets
+    The app runs on gevent without monkey patching, so a plain Future.result() would block the OS
+    thread the hub runs on, and every request with it, until the writer thread is done. Called from
+    a greenlet, result() parks on an AsyncResult that the writer wakes through the hub's async
+    watcher (the only thread-safe way into a gevent loop); elsewhere it blocks as usual.
+    """
+
+    def result(self, timeout=None):
+        hub = get_hub_if_exists() if get_hub_if_exists is not None else None
+        if hub is None or getcurrent() is hub or self.done():
+            return super().result(timeout)
+
+        woken = AsyncResult()
+        watcher = hub.loop.async_()
+        watcher.start(woken.set)
+        lock = threading.Lock()
+        waiting = [True]
+
+        def wake(_):
+            with lock:
+                if waiting[0]:
+                    watcher.send()
+
+        try:
+            self.add_done_callback(wake)
+            woken.wait(timeout)
+        finally:
+            with lock:
+                waiting[0] = False
+                watcher.stop()
+                watcher.close()
+        return super().result(0)
+
+
+class DatabaseWriter:
+    """
+    Owns the only read-write connection to the database
+    Write operations are queued from any greenlet/thread and applied by a single worker,
+    which groups whatever is waiting into one transaction (one savepoint per operation)
+    """
+
+    def __init__(self, path, batch_size=WRITE_BATCH_SIZE, on_rollback=None, shard=0):
+        self.path = path
+        self.shard = shard
+        self.batch_size = batch_size
+        # Called with the shard whenever an operation or a whole batch is rolled back, to drop state cached from it
+        self.on_rollback = on_rollback
+        # Moving average of how long a write waits (queue + lock) before its transaction starts
+        self.wait_seconds = 0.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f'db-writer-{shard}', daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, default=None, error_message="Error applying write"):
+        """
+        Queue operation(cursor) for the writer
+        Returns a Future resolved with the operation's return value once its transaction has
+        committed, or with default if the operation (or the commit) failed
+        """
+        future = WriteFuture()
+        observer = _statement_observer.get()
+        if observer is not None:
+            operation = _observed(operation, observer)
+        self._queue.put((operation, default, error_message, future, time.monotonic()))
+        return future
+
+    def queue_depth(self):
+        """Number of write operations waiting for the writer"""
+        return self._queue.qsize()
+
+    def oldest_wait(self):
+        """Seconds the oldest queued write has been waiting so far (0 when nothing is queued)"""
+        with self._queue.mutex:
+            item = self._queue.queue[0] if self._queue.queue else None
+        return time.monotonic() - item[4] if item is not None else 0.0
+
+    def close(self):
+        """Apply everything already queued, then stop the writer"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, factory=ObservedConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        _attach_live(conn, self.shard)
+        _prepare_live(conn)
+        try:
+            while True:
+                if self._queue.empty():
+                    # An idle writer is under no pressure
+                    self.wait_seconds = 0.0
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                stopping = False
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._apply(conn, batch)
+                if stopping:
+                    break
+        finally:
+            conn.close()
+
+    def _apply(self, conn, batch):
+        """Run a batch of operations in one transaction, isolating failures with savepoints"""
+        results = []
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            waited = time.monotonic() - batch[0][4]
+            self.wait_seconds = 0.8 * self.wait_seconds + 0.2 * waited
+            for operation, default, error_message, _, _ in batch:
+                cursor.execute("SAVEPOINT write_op")
+                try:
+                    results.append(operation(cursor))
+                    cursor.execute("RELEASE write_op")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write_op")
+                    cursor.execute("RELEASE write_op")
+                    print(f"{error_message}: {str(e)}")
+                    results.append(default)
+                    self._rolled_back()
+            cursor.execute("COMMIT")
+        except Exception as e:
+            print(f"Error committing write batch: {str(e)}")
+            if conn.in_transaction:
+                conn.rollback()
+            results = [default for _, default, _, _, _ in batch]
+            self._rolled_back()
+
+        for (_, _, _, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _rolled_back(self):
+        if self.on_rollback is not None:
+            self.on_rollback(self.shard)
+
+
+class ReaderPool:
+    """Bounded pool of query_only connections, each request reading from one WAL snapshot"""
+
+    def __init__(self, path, size=READER_POOL_SIZE, shard=0):
+        self.path = path
+        self.shard = shard
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, factory=ObservedConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA query_only = ON")
+        _attach_live(conn, self.shard)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a reader connection with a read transaction open for the duration"""
+        conn = self._acquire()
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+            self._idle.put(conn)
+
+
+# Writers, reader pools and live tier checkpointers, per shard
+_writers = {}
+_readers = {}
+_checkpointers = {}
+_connection_lock = threading.Lock()
+
+def get_writer(shard=0):
+    """Return a shard's process-wide writer, starting it (and its live tier checkpoints) on first use"""
+    writer = _writers.get(shard)
+    if writer is None:
+        with _connection_lock:
+            writer = _writers.get(shard)
+            if writer is None:
+                writer = _writers[shard] = DatabaseWriter(shard_path(shard), on_rollback=forget_cached_keys, shard=shard)
+                if shard not in _checkpointers:
+                    _checkpointers[shard] = LiveCheckpointer(shard)
+    return writer
+
+def read_connection(shard=0):
+    """Borrow a pooled read-only connection to a shard: `with read_connection(shard) as conn: ...`"""
+    readers = _readers.get(shard)
+    if readers is None:
+        with _connection_lock:
+            readers = _readers.get(shard)
+            if readers is None:
+                readers = _readers[shard] = ReaderPool(shard_path(shard), shard=shard)
+    return readers.connection()
+
+def submit_write(operation, default=None, error_message="Error applying write", shard=0):
+    """Queue operation(cursor) on a shard's single writer and return its Future"""
+    return get_writer(shard).submit(operation, default, error_message)
+
+def write_pressure():
+    """
+    Return (queued write count, average seconds a write waits to start) for backpressure decisions,
+    from the most loaded shard
+    """
+    writers = [get_writer(shard) for shard in range(DATABASE_SHARDS)]
+    # The moving average only moves when a batch starts, so a writer stuck on a slow batch is caught
+    # by the age of its oldest queued write instead
+    return (max(w.queue_depth() for w in writers),
+            max(max(w.wait_seconds, w.oldest_wait()) for w in writers))
+
+
+########################################################################################################################
+# Storage Tiers
+########################################################################################################################
+
+def _default_live_path():
+    """A tmpfs file named after the main database, so databases on one host never share a live tier"""
+    path = os.path.abspath(DATABASE_PATH)
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else os.path.dirname(path)
+    digest = hashlib.sha1(path.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(directory, f"{os.path.basename(path)}-{digest}-live.db")
+
+# Meetings in progress write to a "live" database attached from tmpfs, so their writes never wait on
+# the disk; it is backed up to LIVE_BACKUP_PATH every LIVE_CHECKPOINT_SECONDS, and archiving a meeting
+# moves its rows into the same tables of the main ("cold") database
+LIVE_DATABASE_PATH = os.getenv('LIVE_DATABASE_PATH') or _default_live_path()
+LIVE_BACKUP_PATH = os.getenv('LIVE_BACKUP_PATH', DATABASE_PATH + '.live-backup')
+LIVE_CHECKPOINT_SECONDS = float(os.getenv('LIVE_CHECKPOINT_SECONDS', 5))
+
+# Tables present in both tiers, with their indexes ({schema} is 'main' or 'live')
+TIERED_TABLES = {
+    'transcriptions': '''
+    CREATE TABLE IF NOT EXISTS {schema}.transcriptions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meeting_key INTEGER NOT NULL REFERENCES meetings (meeting_key),
+        participant_key INTEGER NOT NULL REFERENCES participants (participant_key),
+        transcript TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        sentiment_score REAL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        client_id TEXT
+    )
+    ''',
+    'engagement_data': '''
+    CREATE TABLE IF NOT EXISTS {schema}.engagement_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meeting_key INTEGER NOT NULL REFERENCES meetings (meeting_key),
+        participant_id TEXT NOT NULL,
+        participant_name TEXT NOT NULL,
+        join_time TEXT,
+        leave_time TEXT,
+        duration INTEGER DEFAULT 0,
+        talk_time INTEGER DEFAULT 0,
+        engagement_score INTEGER DEFAULT 0,
+        browser_id TEXT,
+        is_active BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+}
+# Columns added after a table was first created: (table, column, type), appended in this order
+TIERED_COLUMNS = [
+    ('transcriptions', 'client_id', 'TEXT'),
+]
+TIERED_INDEXES = [
+    # Used to look participants up per meeting
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_engagement_data_meeting ON engagement_data (meeting_key, participant_id)",
+    # Used to read a meeting's transcriptions in order
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_transcriptions_meeting ON transcriptions (meeting_key, timestamp)",
+    # Covering index so per-participant counts and sentiment never touch the table
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_transcriptions_participant ON transcriptions (participant_key, timestamp, sentiment_score)",
+    # Used to find a retried transcription by its client id
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_transcriptions_client ON transcriptions (meeting_key, client_id) WHERE client_id IS NOT NULL",
+]
+
+# Rows of both tiers; SQLite pushes a meeting_key filter down into each branch and its index
+TRANSCRIPTION_ROWS = '(SELECT * FROM live.transcriptions UNION ALL SELECT * FROM main.transcriptions)'
+ENGAGEMENT_ROWS = '(SELECT * FROM live.engagement_data UNION ALL SELECT * FROM main.engagement_data)'
+
+def _attach_live(conn, shard=0):
+    """Attach a shard's live tier to a connection as schema 'live'"""
+    conn.execute("ATTACH DATABASE ? AS live", (_shard_file(LIVE_DATABASE_PATH, shard),))
+
+def _create_tier_tables(cursor, schema):
+    for table_sql in TIERED_TABLES.values():
+        cursor.execute(table_sql.format(schema=schema))
+    # Both tiers must keep the same column order, since rows move between them with SELECT *
+    for table, column, column_type in TIERED_COLUMNS:
+        if column not in _table_columns(cursor, table, schema):
+            cursor.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {column} {column_type}")
+    for index_sql in TIERED_INDEXES:
+        cursor.execute(index_sql.format(schema=schema))
+
+def _prepare_live(conn):
+    """
+    Writer-side setup of the live tier: no fsync, ids that never collide with cold rows, rows a crash
+    left in both tiers removed from the live one, and the meeting summary triggers
+    """
+    conn.execute("PRAGMA live.synchronous = OFF")
+    for table in TIERED_TABLES:
+        conn.execute(f"DELETE FROM live.{table} WHERE id IN (SELECT id FROM main.{table})")
+    _seed_live_ids(conn)
+    _create_summary_triggers(conn)
+
+def _seed_live_ids(conn):
+    """Make the live tier hand out ids above every cold one"""
+    for table in TIERED_TABLES:
+        cold_max = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM main.{table}").fetchone()[0]
+        row = conn.execute("SELECT seq FROM live.sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO live.sqlite_sequence (name, seq) VALUES (?, ?)", (table, cold_max))
+        elif row[0] < cold_max:
+            conn.execute("UPDATE live.sqlite_sequence SET seq = ? WHERE name = ?", (cold_max, table))
+
+def _move_to_cold(cursor, meeting_key):
+    """Move an archived meeting's rows from the live tier to the cold one (ids are kept)"""
+    for table in TIERED_TABLES:
+        cursor.execute(f"INSERT INTO main.{table} SELECT * FROM live.{table} WHERE meeting_key = ?", (meeting_key,))
+        cursor.execute(f"DELETE FROM live.{table} WHERE meeting_key = ?", (meeting_key,))
+
+def _update_engagement(cursor, assignments, values, meeting_key, participant_id):
+    """Update a participant's engagement row in whichever tier holds it; returns the number of rows updated"""
+    for schema in ('live', 'main'):
+        cursor.execute(
+            f"UPDATE {schema}.engagement_data SET {assignments} WHERE meeting_key = ? AND participant_id = ?",
+            (*values, meeting_key, participant_id)
+        )
+        if cursor.rowcount > 0:
+            return cursor.rowcount
+    return 0
+
+def _copy_database(source_path, target_path):
+    """Copy a database file through the backup API, replacing the target atomically"""
+    temp_path = f"{target_path}.tmp"
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(temp_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    os.replace(temp_path, target_path)
+
+def restore_live_tier(shard=0):
+    """After a reboot emptied tmpfs, bring a shard's live tier back from its last checkpoint"""
+    live_path = _shard_file(LIVE_DATABASE_PATH, shard)
+    backup_path = _shard_file(LIVE_BACKUP_PATH, shard)
+    if not os.path.exists(live_path) and os.path.exists(backup_path):
+        _copy_database(backup_path, live_path)
+        print(f"Restored live meeting data from {backup_path}")
+
+def checkpoint_live_tier(shard=0):
+    """Back a shard's live tier up to disk (a consistent snapshot, taken off the write path)"""
+    try:
+        _copy_database(_shard_file(LIVE_DATABASE_PATH, shard), _shard_file(LIVE_BACKUP_PATH, shard))
+    except Exception as e:
+        print(f"Error checkpointing live meeting data: {str(e)}")
+
+
+class LiveCheckpointer:
+    """Background thread backing a shard's live tier up every interval seconds"""
+
+    def __init__(self, shard=0, interval=LIVE_CHECKPOINT_SECONDS):
+        self.shard = shard
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'live-checkpoint-{shard}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread after one last checkpoint"""
+        self._stop.set()
+        self._thread.join()
+        checkpoint_live_tier(self.shard)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            checkpoint_live_tier(self.shard)
+
+########################################################################################################################
+# Sharding
+########################################################################################################################
+
+# Meetings are spread over DATABASE_SHARDS database files by a hash of their id. Each file has its own
+# writer, reader pool and live tier, so writes for meetings on different shards never wait on one
+# another's lock; listings, exports and analytics read every shard and merge the results. Shard 0 is
+# DATABASE_PATH itself, and rebalance.py moves meetings between files when the shard count changes.
+
+def _shard_file(path, shard):
+    """Path of a shard's copy of a database file (shard 0 keeps the configured path)"""
+    if shard == 0:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.shard{shard}{extension}"
+
+def shard_path(shard):
+    """Database file of a shard"""
+    return _shard_file(DATABASE_PATH, shard)
+
+def _meeting_hash(meeting_id):
+    """Stable 63-bit hash of a canonical meeting id (the same in every process, unlike hash())"""
+    return int.from_bytes(hashlib.sha1(meeting_id.encode('utf-8')).digest()[:8], 'big') >> 1
+
+def meeting_shard(meeting_id, shards=None):
+    """Shard holding a meeting's rows, for the configured (or the given) number of shards"""
+    return _meeting_hash(normalize_meeting_id(meeting_id) or '') % (shards or DATABASE_SHARDS)
+
+def _shards_for(meeting_ids=None):
+    """Shards holding the given meetings, or every shard"""
+    if not meeting_ids:
+        return range(DATABASE_SHARDS)
+    return sorted({meeting_shard(meeting_id) for meeting_id in meeting_ids})
+
+def _read_shards(query, params=(), shards=None):
+    """Run one read on each shard (every shard by default), returning a list of dict rows per shard"""
+    rows = []
+    for shard in range(DATABASE_SHARDS) if shards is None else shards:
+        with read_connection(shard) as conn:
+            rows.append([dict(row) for row in conn.execute(query, params)])
+    return rows
+
+def _merge_sorted_shards(shard_rows, reverse=False):
+    """Merge per-shard row lists, each already sorted on its sort_key column, dropping that column"""
+    merged = heapq.merge(*shard_rows, key=lambda row: row['sort_key'], reverse=reverse)
+    return [{name: value for name, value in row.items() if name != 'sort_key'} for row in merged]
+
+def _iter_shards(query, params, key, shards=None):
+    """Stream one read's rows from each shard, merged by key (each shard's rows must already be sorted by it)"""
+    def _rows(shard):
+        with read_connection(shard) as conn:
+            yield from conn.execute(query, params)
+    return heapq.merge(*[_rows(shard) for shard in (range(DATABASE_SHARDS) if shards is None else shards)], key=key)
+
+def _check_shard_layout(cursor, shard, shards):
+    """
+    Record the shard count a database file is laid out for and return the recorded count
+    A file from before sharding that already holds meetings is recorded as the only shard, and a file without
+    meetings simply takes the configured count
+    """
+    cursor.execute("CREATE TABLE IF NOT EXISTS shard_layout (shard INTEGER NOT NULL, shard_count INTEGER NOT NULL)")
+    cursor.execute("SELECT shard_count FROM shard_layout")
+    row = cursor.fetchone()
+    cursor.execute("SELECT 1 FROM meetings LIMIT 1")
+    has_meetings = cursor.fetchone() is not None
+
+    if row is None:
+        layout = 1 if has_meetings else shards
+        cursor.execute("INSERT INTO shard_layout (shard, shard_count) VALUES (?, ?)", (shard, layout))
+        return layout
+    if row[0] != shards and not has_meetings:
+        cursor.execute("UPDATE shard_layout SET shard_count = ?", (shards,))
+        return shards
+    return row[0]
+
+def _rekey_meetings(cursor):
+    """Give meetings keyed before keys were derived from their ids their _meeting_hash key, in every table"""
+    cursor.execute("SELECT meeting_key, meeting_id FROM meetings")
+    rekeyed = [
+        (_meeting_hash(meeting_id), key) for key, meeting_id in cursor.fetchall()
+        if key != _meeting_hash(meeting_id)
+    ]
+    if not rekeyed:
+        return
+
+    for schema in ('main', 'live'):
+        cursor.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")
+        for table in [row[0] for row in cursor.fetchall()]:
+            if 'meeting_key' in _table_columns(cursor, table, schema):
+                cursor.executemany(f"UPDATE {schema}.{table} SET meeting_key = ? WHERE meeting_key = ?", rekeyed)
+    print(f"Rekeyed {len(rekeyed)} meetings")
+
+########################################################################################################################
+# Bulk Loading
+########################################################################################################################
+
+BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', 5000))
+
+# Tiered indexes no write path reads (the ingest path needs the others for its own lookups); a bulk
+# load drops them and builds them once at the end instead of updating them row by row
+BULK_DEFERRED_INDEXES = ['idx_transcriptions_participant']
+
+class BulkWriter:
+    """
+    Stand-in for the DatabaseWriter during a bulk load: operations run inline on the calling thread,
+    one savepoint each, and are committed together every batch_size operations
+    Futures resolve as soon as their operation has run, before its batch commits
+    """
+
+    def __init__(self, path, batch_size=BULK_BATCH_SIZE, on_rollback=None, shard=0):
+        self.shard = shard
+        self.batch_size = batch_size
+        self.on_rollback = on_rollback
+        self.wait_seconds = 0.0
+        # Operations lost to batches that failed to commit
+        self.lost = 0
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, factory=ObservedConnection)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        _attach_live(self._conn, shard)
+        _prepare_live(self._conn)
+        self._cursor = self._conn.cursor()
+
+    def submit(self, operation, default=None, error_message="Error applying write"):
+        """Run operation(cursor) in the current batch; returns a resolved Future (default if it failed)"""
+        if not self._conn.in_transaction:
+            self._cursor.execute("BEGIN IMMEDIATE")
+        self._cursor.execute("SAVEPOINT write_op")
+        try:
+            result = operation(self._cursor)
+            self._cursor.execute("RELEASE write_op")
+        except Exception as e:
+            self._cursor.execute("ROLLBACK TO write_op")
+            self._cursor.execute("RELEASE write_op")
+            print(f"{error_message}: {str(e)}")
+            result = default
+            self._rolled_back()
+
+        self._uncommitted += 1
+        if self._uncommitted >= self.batch_size:
+            self.commit()
+        future = Future()
+        future.set_result(result)
+        return future
+
+    def commit(self):
+        """Commit the current batch; returns False if it had to be rolled back"""
+        count, self._uncommitted = self._uncommitted, 0
+        if not self._conn.in_transaction:
+            return True
+        try:
+            self._cursor.execute("COMMIT")
+            return True
+        except Exception as e:
+            print(f"Error committing bulk batch of {count} writes: {str(e)}")
+            self._conn.rollback()
+            self.lost += count
+            self._rolled_back()
+            return False
+
+    def queue_depth(self):
+        return 0
+
+    def oldest_wait(self):
+        return 0.0
+
+    def drop_deferred_indexes(self):
+        for schema in ('main', 'live'):
+            for name in BULK_DEFERRED_INDEXES:
+                self._cursor.execute(f"DROP INDEX IF EXISTS {schema}.{name}")
+
+    def close(self):
+        """Commit what is left, build the deferred indexes and close the connection"""
+        self.commit()
+        try:
+            for schema in ('main', 'live'):
+                for index_sql in TIERED_INDEXES:
+                    if any(f".{name} " in index_sql for name in BULK_DEFERRED_INDEXES):
+                        self._cursor.execute(index_sql.format(schema=schema))
+        finally:
+            self._conn.close()
+
+    def _rolled_back(self):
+        if self.on_rollback is not None:
+            self.on_rollback(self.shard)
+
+@contextmanager
+def bulk_load(batch_size=BULK_BATCH_SIZE):
+    """
+    Send every write queued inside the block through one BulkWriter per shard, with BULK_DEFERRED_INDEXES
+    dropped until the block ends: `with bulk_load() as writers: ...`
+    Live tier checkpoints are suspended meanwhile (each shard's is taken once at the end), and resume
+    with the next writer started after the block
+    Meant for offline imports; the server should not be writing to the same database meanwhile
+    """
+    with _connection_lock:
+        for writer in _writers.values():
+            writer.close()
+        _writers.clear()
+        for checkpointer in _checkpointers.values():
+            checkpointer.stop()
+        _checkpointers.clear()
+        for shard in range(DATABASE_SHARDS):
+            _writers[shard] = BulkWriter(shard_path(shard), batch_size, on_rollback=forget_cached_keys, shard=shard)
+        writers = list(_writers.values())
+    try:
+        for writer in writers:
+            writer.drop_deferred_indexes()
+        yield writers
+    finally:
+        with _connection_lock:
+            _writers.clear()
+            # None should have started inside the block; make sure none outlives it
+            for checkpointer in _checkpointers.values():
+                checkpointer.stop()
+            _checkpointers.clear()
+        for writer in writers:
+            writer.close()
+            checkpoint_live_tier(writer.shard)
+
+########################################################################################################################
+# Query Tracing
+########################################################################################################################
+
+SQL_TRACE = os.getenv('SQL_TRACE', '').lower() in ('1', 'true', 'yes')     # trace outside debug mode too
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', 3))     # runs of one statement per request flagged as N+1
+
+# Statements whose query plan has been checked already (each is EXPLAINed once per process)
+_explained_statements = set()
+
+class QueryTrace:
+    """
+    Every statement run on behalf of one request, with its duration and rows returned
+    Used as the observer of observe_statements; optionally EXPLAINs new SELECTs to catch full scans
+    """
+
+    def __init__(self, explain=True):
+        self.explain = explain
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def __call__(self, cursor, sql, parameters, seconds):
+        statement = {'sql': ' '.join(sql.split()), 'parameters': parameters, 'seconds': seconds, 'rows': 0}
+        with self._lock:
+            self.statements.append(statement)
+        if self.explain and parameters is not None:
+            _check_query_plan(cursor.connection, statement['sql'], parameters)
+        return statement
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def total_seconds(self):
+        return sum(statement['seconds'] for statement in self.statements)
+
+    def by_statement(self):
+        """Per distinct SQL text: runs, total time and rows, slowest first"""
+        totals = {}
+        for statement in self.statements:
+            entry = totals.setdefault(statement['sql'], {'sql': statement['sql'], 'count': 0, 'seconds': 0.0, 'rows': 0})
+            entry['count'] += 1
+            entry['seconds'] += statement['seconds']
+            entry['rows'] += statement['rows']
+        return sorted(totals.values(), key=lambda entry: entry['seconds'], reverse=True)
+
+    def repeated(self, threshold=QUERY_REPEAT_THRESHOLD):
+        """
+        Statements run at least threshold times in this request (the N+1 pattern), with how many of
+        those runs were exact duplicates (same parameters too)
+        """
+        repeats = []
+        for entry in self.by_statement():
+            if entry['count'] >= threshold:
+                runs = [repr(s['parameters']) for s in self.statements if s['sql'] == entry['sql']]
+                repeats.append({'sql': entry['sql'], 'count': entry['count'], 'duplicates': len(runs) - len(set(runs))})
+        return repeats
+
+    def log_summary(self, label):
+        """Log the request's query count and time, warning about repeated statements"""
+        logger.info(f"{label}: {self.count} queries in {self.total_seconds * 1000:.2f} ms")
+        for repeat in self.repeated():
+            logger.warning(
+                f"{label}: statement ran {repeat['count']} times ({repeat['duplicates']} identical), "
+                f"possible N+1: {repeat['sql']}"
+            )
+
+def _check_query_plan(conn, sql, parameters):
+    """Log EXPLAIN QUERY PLAN for a read that scans a whole table instead of using an index"""
+    if sql in _explained_statements or not sql.upper().startswith(('SELECT', 'WITH')):
+        return
+    _explained_statements.add(sql)
+    try:
+        # The base class execute bypasses ObservedCursor, so the EXPLAIN itself is not traced
+        plan = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error explaining query: {str(e)}")
+        return
+
+    details = [row[3] for row in plan]
+    scans = [detail for detail in details if detail.startswith('SCAN') and 'INDEX' not in detail and 'CONSTANT ROW' not in detail]
+    if scans:
+        logger.warning(f"Full scan ({'; '.join(scans)}) in query: {sql}\nQuery plan:\n  " + '\n  '.join(details))
+
+########################################################################################################################
+# Meeting and Participant Keys
+########################################################################################################################
+
+MEETING_KEY_CACHE_SIZE = int(os.getenv('MEETING_KEY_CACHE_SIZE', 10000))
+PARTICIPANT_KEY_CACHE_SIZE = int(os.getenv('PARTICIPANT_KEY_CACHE_SIZE', 50000))
+
+# Columns that older schemas stored as text and that are now integer keys, per table
+# (engagement_data comes first so participants can be seeded from it during migration)
+LEGACY_KEY_COLUMNS = {
+    'engagement_data': ('meeting_id',),
+    'transcriptions': ('meeting_id', 'participant_id'),
+    'final_meeting_transcripts': ('meeting_id',),
+    'final_transcript_chunks': ('meeting_id',),
+}
+
+# Canonical meeting id -> integer meeting_key
+_meeting_keys = {}
+# (meeting_key, participant id) -> (participant_key, participant_name, user_id, browser_id)
+_participant_keys = {}
+
+def normalize_meeting_id(meeting_id):
+    """
+    Canonical form of a Zoom meeting id, used everywhere a meeting id enters the app
+    Zoom shows ids with spaces ("123 4567 8901") and webhooks may send them as numbers
+    """
+    if meeting_id is None:
+        return None
+    return ''.join(str(meeting_id).split())
+
+def forget_cached_keys(shard=None):
+    """
+    Drop every cached meeting and participant key, and the recent transcript segments of the shard
+    (of every shard without one), since a rolled back write may have created them
+    """
+    _meeting_keys.clear()
+    _participant_keys.clear()
+    if shard is None:
+        _recent_segments.clear()
+    else:
+        _recent_segments.pop(shard, None)
+
+def _meeting_key(cursor, meeting_id, create=False):
+    """
+    Resolve a meeting id to its integer key, from the in-memory cache when possible
+    With create (writer only), a meetings row is added the first time an id is seen
+    Returns None for an unknown meeting when not creating
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+    meeting_key = _meeting_keys.get(meeting_id)
+    if meeting_key is not None:
+        return meeting_key
+
+    cursor.execute("SELECT meeting_key FROM meetings WHERE meeting_id = ?", (meeting_id,))
+    row = cursor.fetchone()
+    if row:
+        meeting_key = row[0]
+    elif create:
+        # Keys are derived from the id, so they are unique across shards: caches keyed by meeting_key
+        # stay valid, and a meeting keeps its key when moved to another shard
+        meeting_key = _meeting_hash(meeting_id)
+        cursor.execute("INSERT INTO meetings (meeting_key, meeting_id) VALUES (?, ?)", (meeting_key, meeting_id))
+    else:
+        return None
+
+    if len(_meeting_keys) >= MEETING_KEY_CACHE_SIZE:
+        _meeting_keys.clear()
+    _meeting_keys[meeting_id] = meeting_key
+    return meeting_key
+
+def _participant_key(cursor, meeting_key, participant_id, participant_name=None, user_id=None, browser_id=None):
+    """
+    Resolve a meeting's participant to its integer key, adding the participants row on first sight (writer only)
+    Non-empty name, Zoom user id and browser id values replace the stored ones; unchanged values cost no write
+    """
+    cache_key = (meeting_key, participant_id)
+    cached = _participant_keys.get(cache_key)
+    if cached is None:
+        cursor.execute('''
+        SELECT participant_key, participant_name, user_id, browser_id FROM participants
+        WHERE meeting_key = ? AND participant_id = ?
+        ''', (meeting_key, participant_id))
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute('''
+            INSERT INTO participants (meeting_key, participant_id, participant_name, user_id, browser_id)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (meeting_key, participant_id, participant_name, user_id, browser_id))
+            row = (cursor.lastrowid, participant_name, user_id, browser_id)
+        cached = tuple(row)
+
+    participant_key, *known = cached
+    latest = [new or old for new, old in zip((participant_name, user_id, browser_id), known)]
+    if latest != known:
+        cursor.execute(
+            "UPDATE participants SET participant_name = ?, user_id = ?, browser_id = ? WHERE participant_key = ?",
+            (*latest, participant_key)
+        )
+
+    if len(_participant_keys) >= PARTICIPANT_KEY_CACHE_SIZE:
+        _participant_keys.clear()
+    _participant_keys[cache_key] = (participant_key, *latest)
+    return participant_key
+
+def _table_columns(cursor, table, schema='main'):
+    cursor.execute(f"PRAGMA {schema}.table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+def _detach_legacy_tables(cursor):
+    """
+    Rename tables that still carry text key columns out of the way (with their indexes)
+    Returns the names of the renamed tables, to be passed to _copy_legacy_tables
+    """
+    legacy_tables = []
+    for table, key_columns in LEGACY_KEY_COLUMNS.items():
+        if set(key_columns) & set(_table_columns(cursor, table)):
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+            legacy_tables.append(table)
+    return legacy_tables
+
+def _copy_legacy_tables(cursor, legacy_tables):
+    """Copy renamed legacy tables into their integer keyed replacements, then drop them"""
+    for table in LEGACY_KEY_COLUMNS:
+        if table not in legacy_tables:
+            continue
+        legacy = f"{table}_legacy"
+        legacy_columns = _table_columns(cursor, legacy)
+        keys = {}
+
+        if 'meeting_id' in legacy_columns:
+            # Ids were normalized inconsistently before, so rows of one meeting may be spelled differently
+            cursor.execute(f'''
+            INSERT OR IGNORE INTO meetings (meeting_key, meeting_id)
+            SELECT meeting_hash(meeting_id), meeting_id FROM (
+                SELECT DISTINCT normalize_meeting_id(meeting_id) AS meeting_id FROM {legacy}
+                WHERE meeting_id IS NOT NULL
+            )
+            ''')
+            keys['meeting_key'] = '''(
+                SELECT m.meeting_key FROM meetings m WHERE m.meeting_id = normalize_meeting_id(l.meeting_id)
+            )'''
+        else:
+            keys['meeting_key'] = 'l.meeting_key'
+
+        if table == 'transcriptions' and 'participant_id' in legacy_columns:
+            # Participants are seeded from engagement data first, then from anyone who only ever spoke
+            cursor.execute('''
+            INSERT OR IGNORE INTO participants (meeting_key, participant_id, participant_name, browser_id)
+            SELECT meeting_key, participant_id, MAX(participant_name), MAX(browser_id)
+            FROM engagement_data
+            GROUP BY meeting_key, participant_id
+            ''')
+            cursor.execute(f'''
+            INSERT OR IGNORE INTO participants (meeting_key, participant_id, participant_name, browser_id)
+            SELECT {keys['meeting_key']} AS meeting_key, l.participant_id, MAX(l.participant_name), MAX(l.browser_id)
+            FROM {legacy} l
+            GROUP BY 1, 2
+            ''')
+            keys['participant_key'] = f'''(
+                SELECT p.participant_key FROM participants p
+                WHERE p.meeting_key = {keys['meeting_key']} AND p.participant_id = l.participant_id
+            )'''
+
+        columns = [c for c in _table_columns(cursor, table) if c in keys or c in legacy_columns]
+        cursor.execute(f'''
+        INSERT OR REPLACE INTO {table} ({', '.join(columns)})
+        SELECT {', '.join(keys.get(c, f"l.{c}") for c in columns)}
+        FROM {legacy} l
+        ''')
+        cursor.execute(f"DROP TABLE {legacy}")
+        print(f"Migrated {table} to integer keys")
+
+########################################################################################################################
+# Field Projection
+########################################################################################################################
+
+# Output field name -> SQL expression, per API resource
+TRANSCRIPTION_FIELDS = {
+    'id': 't.id',
+    'meeting_id': 'm.meeting_id',
+    'participant_id': 'p.participant_id',
+    'participant_name': 'p.participant_name',
+    'transcript': 't.transcript',
+    'timestamp': 't.timestamp',
+    'sentiment_score': 't.sentiment_score',
+    'browser_id': 'p.browser_id',
+    'created_at': 't.created_at'
+}
+DEFAULT_TRANSCRIPTION_FIELDS = [
+    'id', 'meeting_id', 'participant_id', 'participant_name', 'transcript', 'timestamp', 'sentiment_score'
+]
+
+PARTICIPANT_FIELDS = {
+    'id': 'participant_id',
+    'name': 'participant_name',
+    'join_time': 'join_time',
+    'leave_time': 'leave_time',
+    'duration': 'duration',
+    'talk_time': 'talk_time'
+}
+
+# The topic, if any, lives on the first archived utterance
+MEETING_TOPIC_SQL = '''COALESCE((
+    SELECT json_extract(c.chunk_data, '$[0].meeting_topic') FROM final_transcript_chunks c
+    WHERE c.meeting_key = final_meeting_transcripts.meeting_key AND c.chunk_index = 0
+), 'Untitled Meeting')'''
+
+TRANSCRIPT_LIST_FIELDS = {
+    'meeting_id': 'meeting_id',
+    'meeting_date': 'meeting_date',
+    'created_at': 'created_at',
+    'meeting_topic': MEETING_TOPIC_SQL,
+    'participant_count': 'json_array_length(participant_data)'
+}
+
+FINAL_TRANSCRIPT_FIELDS = {
+    'meeting_id': 'meeting_id',
+    'meeting_date': 'meeting_date',
+    'created_at': 'created_at',
+    'transcript_data': 'transcript_data',
+    'participant_data': 'participant_data',
+    'meeting_topic': MEETING_TOPIC_SQL
+}
+
+MEETING_SUMMARY_FIELDS = {
+    'id': 'm.meeting_id',
+    'topic': "'Meeting ' || m.meeting_id",
+    'status': 's.status',
+    'start_time': 's.start_time',
+    'participant_count': 's.participant_count',
+    'active_count': 's.active_count',
+    'total_talk_time': 's.total_talk_time',
+    'utterance_count': 's.utterance_count'
+}
+
+def _select_list(field_map, fields=None, default=None):
+    """
+    Translate requested output fields into a SELECT column list
+    Raises ValueError for fields the resource does not have
+    """
+    fields = fields or default or list(field_map)
+    unknown = [f for f in fields if f not in field_map]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return ', '.join(f"{field_map[f]} AS {f}" for f in fields)
+
+########################################################################################################################
+# Meeting Summary
+########################################################################################################################
+
+MEETING_STATUSES = ('active', 'ended', 'offline')
+
+# A meeting is offline until it has engagement rows, then active until its transcript is archived
+_SUMMARY_STATUS_SQL = f'''CASE
+    WHEN NOT EXISTS (SELECT 1 FROM {ENGAGEMENT_ROWS} e WHERE e.meeting_key = {{key}}) THEN 'offline'
+    WHEN EXISTS (SELECT 1 FROM main.final_meeting_transcripts f WHERE f.meeting_key = {{key}}) THEN 'ended'
+    ELSE 'active'
+END'''
+
+# The summary is derived data kept in the live tier, so live-meeting writes never touch the cold one.
+# Its triggers span both tiers, which only TEMP triggers may do; they are created on the writer's
+# connection, the only one that writes (trigger statements cannot qualify the table they write, so
+# meeting_summary must exist in the live tier only). Rows moved to the cold tier keep their id and
+# are not counted as deleted.
+MEETING_SUMMARY_TRIGGERS = {
+    'meeting_summary_meeting_insert': '''
+        AFTER INSERT ON main.meetings
+        BEGIN
+            INSERT OR IGNORE INTO meeting_summary (meeting_key) VALUES (NEW.meeting_key);
+        END''',
+    'meeting_summary_engagement_insert': f'''
+        AFTER INSERT ON live.engagement_data
+        BEGIN
+            UPDATE meeting_summary SET
+                start_time = CASE WHEN start_time IS NULL OR NEW.join_time < start_time
+                    THEN COALESCE(NEW.join_time, start_time) ELSE start_time END,
+                participant_count = participant_count + (
+                    SELECT COUNT(*) = 1 FROM {ENGAGEMENT_ROWS}
+                    WHERE meeting_key = NEW.meeting_key AND participant_id = NEW.participant_id
+                ),
+                active_count = active_count + (CASE WHEN NEW.is_active THEN 1 ELSE 0 END),
+                total_talk_time = total_talk_time + COALESCE(NEW.talk_time, 0),
+                status = {_SUMMARY_STATUS_SQL.format(key='NEW.meeting_key')}
+            WHERE meeting_key = NEW.meeting_key;
+        END''',
+    'meeting_summary_engagement_delete': f'''
+        AFTER DELETE ON live.engagement_data
+        WHEN NOT EXISTS (SELECT 1 FROM main.engagement_data WHERE id = OLD.id)
+        BEGIN
+            UPDATE meeting_summary SET
+                start_time = (SELECT MIN(join_time) FROM {ENGAGEMENT_ROWS} WHERE meeting_key = OLD.meeting_key),
+                participant_count = participant_count - NOT EXISTS (
+                    SELECT 1 FROM {ENGAGEMENT_ROWS}
+                    WHERE meeting_key = OLD.meeting_key AND participant_id = OLD.participant_id
+                ),
+                active_count = active_count - (CASE WHEN OLD.is_active THEN 1 ELSE 0 END),
+                total_talk_time = total_talk_time - COALESCE(OLD.talk_time, 0),
+                status = {_SUMMARY_STATUS_SQL.format(key='OLD.meeting_key')}
+            WHERE meeting_key = OLD.meeting_key;
+        END''',
+    'meeting_summary_transcription_insert': '''
+        AFTER INSERT ON live.transcriptions
+        BEGIN
+            UPDATE meeting_summary SET utterance_count = utterance_count + 1 WHERE meeting_key = NEW.meeting_key;
+        END''',
+    'meeting_summary_transcription_delete': '''
+        AFTER DELETE ON live.transcriptions
+        WHEN NOT EXISTS (SELECT 1 FROM main.transcriptions WHERE id = OLD.id)
+        BEGIN
+            UPDATE meeting_summary SET utterance_count = utterance_count - 1 WHERE meeting_key = OLD.meeting_key;
+        END''',
+    'meeting_summary_archive_insert': '''
+        AFTER INSERT ON main.final_meeting_transcripts
+        BEGIN
+            UPDATE meeting_summary SET status = CASE WHEN participant_count > 0 THEN 'ended' ELSE 'offline' END
+            WHERE meeting_key = NEW.meeting_key;
+        END''',
+    'meeting_summary_archive_delete': '''
+        AFTER DELETE ON main.final_meeting_transcripts
+        BEGIN
+            UPDATE meeting_summary SET status = CASE WHEN participant_count > 0 THEN 'active' ELSE 'offline' END
+            WHERE meeting_key = OLD.meeting_key;
+        END''',
+}
+# Updates may hit a row in either tier (e.g. a late leave event for an archived meeting)
+_SUMMARY_UPDATE_TRIGGER = '''
+        AFTER UPDATE OF join_time, talk_time, is_active ON {schema}.engagement_data
+        WHEN NEW.join_time IS NOT OLD.join_time
+            OR NEW.talk_time IS NOT OLD.talk_time
+            OR NEW.is_active IS NOT OLD.is_active
+        BEGIN
+            UPDATE meeting_summary SET
+                start_time = CASE WHEN NEW.join_time IS OLD.join_time THEN start_time
+                    ELSE (SELECT MIN(join_time) FROM ''' + ENGAGEMENT_ROWS + ''' WHERE meeting_key = NEW.meeting_key) END,
+                active_count = active_count
+                    + (CASE WHEN NEW.is_active THEN 1 ELSE 0 END) - (CASE WHEN OLD.is_active THEN 1 ELSE 0 END),
+                total_talk_time = total_talk_time + COALESCE(NEW.talk_time, 0) - COALESCE(OLD.talk_time, 0)
+            WHERE meeting_key = NEW.meeting_key;
+        END'''
+for _schema in ('live', 'main'):
+    MEETING_SUMMARY_TRIGGERS[f'meeting_summary_{_schema}_engagement_update'] = _SUMMARY_UPDATE_TRIGGER.format(schema=_schema)
+
+def _create_summary_triggers(conn):
+    for name, body in MEETING_SUMMARY_TRIGGERS.items():
+        conn.execute(f"CREATE TEMP TRIGGER IF NOT EXISTS {name} {body}")
+
+def _create_meeting_summary(cursor):
+    """Create the trigger-maintained meeting_summary table and summarize meetings it does not cover yet"""
+    # Earlier versions kept the summary and its triggers in the cold tier
+    for name in MEETING_SUMMARY_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS main.{name}")
+    cursor.execute("DROP TRIGGER IF EXISTS main.meeting_summary_engagement_update")
+    cursor.execute("DROP TABLE IF EXISTS main.meeting_summary")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS live.meeting_summary (
+        meeting_key INTEGER PRIMARY KEY,
+        start_time TEXT,
+        participant_count INTEGER NOT NULL DEFAULT 0,
+        active_count INTEGER NOT NULL DEFAULT 0,
+        total_talk_time INTEGER NOT NULL DEFAULT 0,
+        utterance_count INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL DEFAULT 'offline'
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS live.idx_meeting_summary_status ON meeting_summary (status, start_time)")
+
+    # Meetings from before the table existed (or from a lost live tier) are summarized from scratch once
+    cursor.execute(f'''
+    INSERT INTO live.meeting_summary (
+        meeting_key, start_time, participant_count, active_count, total_talk_time, utterance_count, status
+    )
+    SELECT
+        m.meeting_key,
+        (SELECT MIN(join_time) FROM {ENGAGEMENT_ROWS} e WHERE e.meeting_key = m.meeting_key),
+        (SELECT COUNT(DISTINCT participant_id) FROM {ENGAGEMENT_ROWS} e WHERE e.meeting_key = m.meeting_key),
+        (SELECT COUNT(*) FROM {ENGAGEMENT_ROWS} e WHERE e.meeting_key = m.meeting_key AND e.is_active),
+        (SELECT COALESCE(SUM(talk_time), 0) FROM {ENGAGEMENT_ROWS} e WHERE e.meeting_key = m.meeting_key),
+        (SELECT COUNT(*) FROM {TRANSCRIPTION_ROWS} t WHERE t.meeting_key = m.meeting_key),
+        {_SUMMARY_STATUS_SQL.format(key='m.meeting_key')}
+    FROM meetings m
+    WHERE NOT EXISTS (SELECT 1 FROM live.meeting_summary s WHERE s.meeting_key = m.meeting_key)
+    ''')
+    if cursor.rowcount > 0:
+        print(f"Summarized {cursor.rowcount} meetings")
 
 ########################################################################################################################
 # Database Initialization
 ########################################################################################################################
 
-def init_db():
-    """Initialize the database with required tables"""
+def init_db(shards=None):
+    """
+    Initialize every shard's database with the required tables
+    Raises RuntimeError if a shard's meetings are laid out for another shard count, since they would be
+    looked up in the wrong files
+    """
+    shards = shards or DATABASE_SHARDS
+    if os.path.exists(shard_path(shards)):
+        # rebalance.py removes the files of shards it no longer uses
+        raise RuntimeError(
+            f"{shard_path(shards)} exists but only {shards} shards are configured; "
+            f"run `python rebalance.py --shards {shards}` before starting the server"
+        )
+    for shard in range(shards):
+        layout = init_shard_db(shard, shards)
+        if layout is not None and layout != shards:
+            raise RuntimeError(
+                f"{shard_path(shard)} holds meetings laid out for {layout} shards but {shards} are configured; "
+                f"run `python rebalance.py --shards {shards}` before starting the server"
+            )
+
+def init_shard_db(shard, shards):
+    """
+    Initialize one shard's database (laid out for the given shard count) with the required tables
+    Returns the shard count the file is laid out for (see _check_shard_layout), or None on error
+    """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(shard_path(shard))
         cursor = conn.cursor()
+
+        # WAL lets the pooled readers keep working off a snapshot while the writer commits
+        cursor.execute("PRAGMA journal_mode = WAL")
+
+        # The live tier is restored from its last checkpoint when a reboot emptied tmpfs
+        restore_live_tier(shard)
+        _attach_live(conn, shard)
+        cursor.execute("PRAGMA live.journal_mode = WAL")
         
-        # Create transcriptions table
+        # Meetings are stored once; every other table references them by integer key
+        conn.create_function('normalize_meeting_id', 1, normalize_meeting_id, deterministic=True)
+        conn.create_function('meeting_hash', 1, _meeting_hash, deterministic=True)
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS transcriptions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            meeting_id TEXT NOT NULL,
-            participant_id TEXT NOT NULL,
-            participant_name TEXT NOT NULL,
-            transcript TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            sentiment_score REAL DEFAULT 0,
-            browser_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        CREATE TABLE IF NOT EXISTS meetings (
+            meeting_key INTEGER PRIMARY KEY,
+            meeting_id TEXT NOT NULL UNIQUE,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         ''')
-        
-        # Create engagement data table
+
+        # Participants are stored once per meeting, from their join or first utterance
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS engagement_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            meeting_id TEXT NOT NULL,
+        CREATE TABLE IF NOT EXISTS participants (
+            participant_key INTEGER PRIMARY KEY,
+            meeting_key INTEGER NOT NULL REFERENCES meetings (meeting_key),
             participant_id TEXT NOT NULL,
-            participant_name TEXT NOT NULL,
-            join_time TEXT,
-            leave_time TEXT,
-            duration INTEGER DEFAULT 0,
-            talk_time INTEGER DEFAULT 0,
-            engagement_score INTEGER DEFAULT 0,
+            participant_name TEXT,
+            user_id TEXT,
             browser_id TEXT,
-            is_active BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            UNIQUE (meeting_key, participant_id)
         )
         ''')
-        
+
+        # Tables still keyed by text ids are moved aside, then copied into the new tables below
+        legacy_tables = _detach_legacy_tables(cursor)
+
+        # Create the transcriptions and engagement data tables of the cold tier
+        _create_tier_tables(cursor, 'main')
+
         # Create final transcripts table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS final_meeting_transcripts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            meeting_id TEXT NOT NULL UNIQUE,
+            meeting_key INTEGER NOT NULL UNIQUE REFERENCES meetings (meeting_key),
             meeting_date TEXT NOT NULL,
             transcript_data TEXT NOT NULL,
             participant_data TEXT NOT NULL,
@@ -60,93 +1299,270 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         ''')
-        
+
+        # Create archived transcript chunks table: fixed-size runs of utterances with their time range
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS final_transcript_chunks (
+            meeting_key INTEGER NOT NULL REFERENCES meetings (meeting_key),
+            chunk_index INTEGER NOT NULL,
+            first_utterance INTEGER NOT NULL,
+            utterance_count INTEGER NOT NULL,
+            start_time TEXT,
+            end_time TEXT,
+            chunk_data TEXT NOT NULL,
+            PRIMARY KEY (meeting_key, chunk_index)
+        ) WITHOUT ROWID
+        ''')
+
+        _copy_legacy_tables(cursor, legacy_tables)
+
+        # Which shard of how many this file is, so a changed DATABASE_SHARDS is noticed
+        layout = _check_shard_layout(cursor, shard, shards)
+
+        # Live meetings' rows go to the live tier
+        _create_tier_tables(cursor, 'live')
+
+        # Create post-meeting reports table, one precomputed report per archived meeting
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meeting_reports (
+            meeting_key INTEGER PRIMARY KEY REFERENCES meetings (meeting_key),
+            report TEXT NOT NULL,
+            generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        # Create meeting terms table, the final term counts of each archived meeting
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meeting_terms (
+            meeting_key INTEGER PRIMARY KEY REFERENCES meetings (meeting_key),
+            terms TEXT NOT NULL
+        )
+        ''')
+
+        # Index used by date-range selection of archived meetings (exports, listings)
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_final_transcripts_meeting_date
+        ON final_meeting_transcripts (meeting_date)
+        ''')
+
+        # Create analytics rollup tables, maintained when a meeting is archived
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meeting_rollups (
+            meeting_id TEXT PRIMARY KEY,
+            meeting_day TEXT NOT NULL,
+            participant_count INTEGER DEFAULT 0,
+            utterance_count INTEGER DEFAULT 0,
+            total_talk_time INTEGER DEFAULT 0,
+            sentiment_sum REAL DEFAULT 0,
+            positive_count INTEGER DEFAULT 0,
+            neutral_count INTEGER DEFAULT 0,
+            negative_count INTEGER DEFAULT 0
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS participant_rollups (
+            meeting_id TEXT NOT NULL,
+            participant_id TEXT NOT NULL,
+            meeting_day TEXT NOT NULL,
+            participant_name TEXT,
+            talk_time INTEGER DEFAULT 0,
+            talk_share REAL DEFAULT 0,
+            utterance_count INTEGER DEFAULT 0,
+            sentiment_sum REAL DEFAULT 0,
+            positive_count INTEGER DEFAULT 0,
+            neutral_count INTEGER DEFAULT 0,
+            negative_count INTEGER DEFAULT 0,
+            PRIMARY KEY (meeting_id, participant_id)
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_rollups (
+            meeting_day TEXT PRIMARY KEY,
+            meeting_count INTEGER DEFAULT 0,
+            participant_count INTEGER DEFAULT 0,
+            utterance_count INTEGER DEFAULT 0,
+            total_talk_time INTEGER DEFAULT 0,
+            sentiment_sum REAL DEFAULT 0,
+            positive_count INTEGER DEFAULT 0,
+            neutral_count INTEGER DEFAULT 0,
+            negative_count INTEGER DEFAULT 0
+        )
+        ''')
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_meeting_rollups_day ON meeting_rollups (meeting_day)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_participant_rollups_day ON participant_rollups (meeting_day)")
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_participant_rollups_participant
+        ON participant_rollups (participant_id, meeting_day)
+        ''')
+
+        # Per-meeting counters behind meeting info and the active meetings listing
+        _create_meeting_summary(cursor)
+
+        # Meetings keyed by rowid before keys were derived from their ids
+        _rekey_meetings(cursor)
+
+        # Archives written as a single transcript blob are split into chunks once
+        _migrate_transcript_chunks(cursor)
+
+        # Archives written before the rollup tables existed are rolled up once
+        _backfill_rollups(cursor)
+
         conn.commit()
-        print("Database initialized successfully")
+        print(f"Database initialized successfully ({shard_path(shard)})")
+        return layout
     except Exception as e:
         print(f"Error initializing database: {str(e)}")
+        return None
     finally:
         conn.close()
 
+########################################################################################################################
+# Transcript Deduplication
+########################################################################################################################
+
+DEDUP_WINDOW_SIZE = int(os.getenv('DEDUP_WINDOW_SIZE', 20))              # recent segments kept per participant
+
+# shard -> {(meeting_key, participant_key): deque of (browser_id, sequence, transcription id)} of the
+# segments most recently stored; only touched by the shard's writer
+_recent_segments = {}
+
+def _dedupe_segment(cursor, shard, meeting_key, participant_key, browser_id, client_id, sequence):
+    """
+    Check whether a transcription is a retry of one already stored: the same client_id, or the same
+    browser's sequence number among the participant's recent segments
+    Returns the id of the row it repeats, or None
+    """
+    if client_id:
+        # A retried POST
+        cursor.execute(
+            f"SELECT id FROM {TRANSCRIPTION_ROWS} t WHERE meeting_key = ? AND client_id = ?",
+            (meeting_key, client_id)
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            return row[0]
+
+    if sequence is None:
+        return None
+    # A line replayed after a reconnect
+    recent = _recent_segments.get(shard, {}).get((meeting_key, participant_key), ())
+    for segment_browser_id, segment_sequence, transcription_id in recent:
+        if segment_sequence == sequence and segment_browser_id == browser_id:
+            return transcription_id
+    return None
+
+def _remember_segment(shard, meeting_key, participant_key, transcription_id, browser_id, sequence):
+    segments = _recent_segments.setdefault(shard, {})
+    recent = segments.get((meeting_key, participant_key))
+    if recent is None:
+        recent = segments[(meeting_key, participant_key)] = deque(maxlen=DEDUP_WINDOW_SIZE)
+    recent.append((browser_id, sequence, transcription_id))
+
 ########################################################################################################################
 # Database Meeting Operations
 ########################################################################################################################
 
+def _meeting_info(cursor, meeting_id):
+    """Build the meeting info dict using an already open cursor (reader or writer)"""
+    meeting_id = normalize_meeting_id(meeting_id)
+    meeting_key = _meeting_key(cursor, meeting_id)
+    summary = None
+
+    if meeting_key is not None:
+        # A single primary-key lookup; triggers keep the summary current
+        cursor.execute('''
+        SELECT start_time, participant_count, active_count, total_talk_time, utterance_count, status
+        FROM live.meeting_summary WHERE meeting_key = ?
+        ''', (meeting_key,))
+        summary = cursor.fetchone()
+
+    if summary and summary['status'] != 'offline':
+        meeting = {
+            "id": meeting_id,
+            "topic": f"Meeting {meeting_id}",
+            "status": summary['status'],
+            "start_time": summary['start_time'],
+            "duration": 0,  # We don't track this yet
+            "participant_count": summary['participant_count'],
+            "active_count": summary['active_count'],
+            "total_talk_time": summary['total_talk_time'],
+            "utterance_count": summary['utterance_count']
+        }
+    else:
+        # Meeting doesn't exist in the database yet
+        meeting = {
+            "id": meeting_id,
+            "topic": f"Meeting {meeting_id}",
+            "status": "offline",  # Changed from "unknown" to "offline"
+            "start_time": None,
+            "duration": 0,
+            "participant_count": 0,
+            "active_count": 0,
+            "total_talk_time": 0,
+            "utterance_count": summary['utterance_count'] if summary else 0
+        }
+
+    return meeting
+
 def get_meeting_info_db(meeting_id):
     """Retrieve meeting details from the database"""
     try:
-        # Connect to database
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check if meeting exists in engagement data
-        cursor.execute(
-            "SELECT meeting_id, MIN(join_time) as start_time FROM engagement_data WHERE meeting_id = ? GROUP BY meeting_id",
-            (meeting_id,)
-        )
-        meeting_data = cursor.fetchone()
-        
-        # Query for participant count
-        cursor.execute(
-            "SELECT COUNT(DISTINCT participant_id) FROM engagement_data WHERE meeting_id = ?",
-            (meeting_id,)
-        )
-        participant_count_row = cursor.fetchone()
-        participant_count = participant_count_row[0] if participant_count_row else 0
-        
-        # Check if meeting has ended (has final transcript)
-        cursor.execute(
-            "SELECT 1 FROM final_meeting_transcripts WHERE meeting_id = ? LIMIT 1",
-            (meeting_id,)
-        )
-        is_ended = cursor.fetchone() is not None
-        
-        if meeting_data:
-            meeting = {
-                "id": meeting_data['meeting_id'],
-                "topic": f"Meeting {meeting_id}",
-                "status": "ended" if is_ended else "active",
-                "start_time": meeting_data['start_time'],
-                "duration": 0,  # We don't track this yet
-                "participant_count": participant_count
-            }
-        else:
-            # Meeting doesn't exist in the database yet
-            meeting = {
-                "id": meeting_id,
-                "topic": f"Meeting {meeting_id}",
-                "status": "offline",  # Changed from "unknown" to "offline"
-                "start_time": None,
-                "duration": 0,
-                "participant_count": 0
-            }
-
-        return meeting
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            return _meeting_info(conn.cursor(), meeting_id)
             
     except Exception as e:
         print(f"Database error in get_meeting_info_db: {str(e)}")
         return None
-    finally:
-        conn.close()
 
-def get_transcriptions_db(meeting_id):
-    """Retrieve transcriptions for a meeting from the database"""
+def get_meetings_by_status_db(status='active', fields=None):
+    """
+    List meetings with the given status (see MEETING_STATUSES), most recently started first
+    fields projects the returned keys (see MEETING_SUMMARY_FIELDS); raises ValueError for unknown fields
+    Returns a list of dicts, or None on error
+    """
+    columns = _select_list(MEETING_SUMMARY_FIELDS, fields)
+    try:
+        shard_rows = _read_shards(f'''
+        SELECT {columns}, COALESCE(s.start_time, '') AS sort_key
+        FROM live.meeting_summary s JOIN meetings m USING (meeting_key)
+        WHERE s.status = ?
+        ORDER BY sort_key DESC
+        ''', (status,))
+
+        return _merge_sorted_shards(shard_rows, reverse=True)
+
+    except Exception as e:
+        print(f"Error listing {status} meetings: {str(e)}")
+        return None
+
+def get_transcriptions_db(meeting_id, fields=None):
+    """
+    Retrieve transcriptions for a meeting from the database
+    fields projects the returned columns (see TRANSCRIPTION_FIELDS); raises ValueError for unknown fields
+    """
     print("inside get   transcriptions_db")
     print("meeting id:", meeting_id)
+    columns = _select_list(TRANSCRIPTION_FIELDS, fields, DEFAULT_TRANSCRIPTION_FIELDS)
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT *
-        FROM transcriptions
-        WHERE meeting_id = ? 
-        ORDER BY timestamp ASC
-        ''', (meeting_id,))
-        
-        rows = cursor.fetchall()
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            cursor = conn.cursor()
+            meeting_key = _meeting_key(cursor, meeting_id)
+            if meeting_key is None:
+                return []
+            
+            cursor.execute(f'''
+            SELECT {columns}
+            FROM {TRANSCRIPTION_ROWS} t
+            JOIN meetings m ON m.meeting_key = t.meeting_key
+            JOIN participants p ON p.participant_key = t.participant_key
+            WHERE t.meeting_key = ? 
+            ORDER BY t.timestamp ASC
+            ''', (meeting_key,))
+            
+            rows = cursor.fetchall()
 
         print("num rows:", rows)
         
@@ -161,72 +1577,75 @@ def get_transcriptions_db(meeting_id):
     except Exception as e:
         print(f"Database error in get_transcriptions_db: {str(e)}")
         return []
-    finally:
-        conn.close()
 
-def save_transcription_db(meeting_id, participant_id, participant_name, transcript, sentiment_score, timestamp, browser_id):
-    """Save transcription data to the database"""
+def save_transcription_db(meeting_id, participant_id, participant_name, transcript, sentiment_score, timestamp, browser_id,
+                          client_id=None, sequence=None):
+    """
+    Queue a transcription insert on the writer, skipping retries of one already stored (same client_id,
+    or the same browser sequence number among the participant's recent segments)
+    Returns a Future resolving to {id, duplicate, transcript, sentiment_score}, or None if the insert failed
+    """
     print("meeting_id: ", meeting_id)
-    meeting_id = meeting_id.replace(" ", "")    # remove spaces since fetching already has a cleaned meeting id
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
+    meeting_id = normalize_meeting_id(meeting_id)
+    shard = meeting_shard(meeting_id)
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id, create=True)
+        participant_key = _participant_key(
+            cursor, meeting_key, participant_id, participant_name=participant_name, browser_id=browser_id
+        )
+
+        duplicate_of = _dedupe_segment(cursor, shard, meeting_key, participant_key, browser_id, client_id, sequence)
+        if duplicate_of is not None:
+            print(f"Duplicate transcription for meeting {meeting_id}, participant {participant_name}: {transcript}")
+            return {'id': duplicate_of, 'duplicate': True, 'transcript': None, 'sentiment_score': None}
+
         cursor.execute('''
-        INSERT INTO transcriptions (meeting_id, participant_id, participant_name, transcript, timestamp, sentiment_score, browser_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (meeting_id, participant_id, participant_name, transcript, timestamp, sentiment_score, browser_id))
-        
-        # Get the inserted ID
-        transcription_id = cursor.lastrowid
+        INSERT INTO live.transcriptions (meeting_key, participant_key, transcript, timestamp, sentiment_score, client_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (meeting_key, participant_key, transcript, timestamp, sentiment_score, client_id))
+        _remember_segment(shard, meeting_key, participant_key, cursor.lastrowid, browser_id, sequence)
         
-        conn.commit()
         print(f"Transcription saved for meeting {meeting_id}, participant {participant_name}: {transcript}")
-        return transcription_id
-    except Exception as e:
-        print(f"Error saving transcription: {str(e)}")
-        return None
-    finally:
-        conn.close()
+        return {'id': cursor.lastrowid, 'duplicate': False, 'transcript': transcript, 'sentiment_score': sentiment_score}
+
+    return submit_write(_op, None, "Error saving transcription", shard=shard)
 
 def save_engagement_data_db(meeting_id, participant_data):
-    """Save engagement data to the database"""
+    """
+    Queue an engagement data upsert on the writer
+    Returns a Future resolving to True on success, False otherwise
+    """
     print("meeting_id: ", meeting_id)
-    meeting_id = meeting_id.replace(" ", "")    # remove spaces!!
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Check if participant already exists
-        cursor.execute('''
-        SELECT id FROM engagement_data
-        WHERE meeting_id = ? AND participant_id = ?
-        ''', (meeting_id, participant_data.get('id')))
-        
-        result = cursor.fetchone()
-        
-        if result:
-            # Update existing record
-            cursor.execute('''
-            UPDATE engagement_data
-            SET leave_time = ?, duration = ?, talk_time = ?
-            WHERE meeting_id = ? AND participant_id = ?
-            ''', (
+    meeting_id = normalize_meeting_id(meeting_id)
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id, create=True)
+        _participant_key(
+            cursor, meeting_key, participant_data.get('id'),
+            participant_name=participant_data.get('name'), user_id=participant_data.get('user_id')
+        )
+
+        # Update the existing record in whichever tier holds it
+        updated = _update_engagement(
+            cursor, "leave_time = ?, duration = ?, talk_time = ?",
+            (
                 participant_data.get('leave_time'),
                 participant_data.get('duration', 0),
-                participant_data.get('talk_time', 0),
-                meeting_id,
-                participant_data.get('id')
-            ))
-        else:
+                participant_data.get('talk_time', 0)
+            ),
+            meeting_key, participant_data.get('id')
+        )
+
+        if not updated:
             # Insert new record
             cursor.execute('''
-            INSERT INTO engagement_data (
-                meeting_id, participant_id, participant_name, join_time, leave_time, duration, talk_time
+            INSERT INTO live.engagement_data (
+                meeting_key, participant_id, participant_name, join_time, leave_time, duration, talk_time
             )
             VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (
-                meeting_id,
+                meeting_key,
                 participant_data.get('id'),
                 participant_data.get('name'),
                 participant_data.get('join_time'),
@@ -235,39 +1654,39 @@ def save_engagement_data_db(meeting_id, participant_data):
                 participant_data.get('talk_time', 0)
             ))
         
-        conn.commit()
         print(f"Engagement data saved for meeting {meeting_id}, participant {participant_data.get('name')}")
         return True
-    except Exception as e:
-        print(f"Error saving engagement data: {str(e)}")
-        return False
-    finally:
-        conn.close()
+
+    return submit_write(_op, False, "Error saving engagement data", shard=meeting_shard(meeting_id))
 
 def save_engagement_snapshot_db(meeting_id, participant_id, is_engaged, timestamp, browser_id, engagement_score):
-    """Save engagement snapshot data to the database"""
-    meeting_id = meeting_id.replace(" ", "")  # remove spaces to ensure consistency
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
+    """
+    Queue an engagement snapshot on the writer
+    Returns a Future resolving to True on success, False otherwise
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id, create=True)
+        _participant_key(cursor, meeting_key, participant_id, browser_id=browser_id)
+
         # First, we need to make sure the participant exists in the engagement_data table
-        cursor.execute('''
-        SELECT id FROM engagement_data
-        WHERE meeting_id = ? AND participant_id = ?
-        ''', (meeting_id, participant_id))
+        cursor.execute(f'''
+        SELECT id FROM {ENGAGEMENT_ROWS} e
+        WHERE meeting_key = ? AND participant_id = ?
+        ''', (meeting_key, participant_id))
         
         result = cursor.fetchone()
         
         if not result:
             # If participant doesn't exist, create a basic record first
             cursor.execute('''
-            INSERT INTO engagement_data (
-                meeting_id, participant_id, participant_name, join_time, engagement_score
+            INSERT INTO live.engagement_data (
+                meeting_key, participant_id, participant_name, join_time, engagement_score
             )
             VALUES (?, ?, ?, ?, ?)
             ''', (
-                meeting_id,
+                meeting_key,
                 participant_id,
                 f"Participant {participant_id}",  # Default name if not known
                 timestamp,
@@ -277,35 +1696,30 @@ def save_engagement_snapshot_db(meeting_id, participant_id, is_engaged, timestam
         # Now we can update the engagement data
         # Since we don't have a dedicated engagement_snapshots table,
         # we'll update the is_active field in the engagement_data table
-        cursor.execute('''
-        UPDATE engagement_data
-        SET is_active = ?, browser_id = ?
-        WHERE meeting_id = ? AND participant_id = ?
-        ''', (is_engaged, browser_id, meeting_id, participant_id))
-        
-        conn.commit()
-        print(f"Engagement snapshot saved for meeting {meeting_id}, participant {participant_id}: {is_engaged}")
-        return True
-    except Exception as e:
-        print(f"Error saving engagement snapshot: {str(e)}")
-        return False
-    finally:
-        conn.close()
-
-def update_participant_leave_time_db(meeting_id, participant_id):
-    """Update the leave time for a participant"""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Get current time
-        leave_time = datetime.now().isoformat()
+        _update_engagement(cursor, "is_active = ?, browser_id = ?", (is_engaged, browser_id), meeting_key, participant_id)
         
+        print(f"Engagement snapshot saved for meeting {meeting_id}, participant {participant_id}: {is_engaged}")
+        return True
+
+    return submit_write(_op, False, "Error saving engagement snapshot", shard=meeting_shard(meeting_id))
+
+def update_participant_leave_time_db(meeting_id, participant_id, leave_time=None):
+    """
+    Queue a leave time update (now, unless leave_time is given) on the writer
+    Returns a Future resolving to True if the participant was found and updated
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+    # Get current time
+    leave_time = leave_time or datetime.now().isoformat()
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id, create=True)
+
         # Get join time to calculate duration
-        cursor.execute('''
-        SELECT join_time FROM engagement_data
-        WHERE meeting_id = ? AND participant_id = ?
-        ''', (meeting_id, participant_id))
+        cursor.execute(f'''
+        SELECT join_time FROM {ENGAGEMENT_ROWS} e
+        WHERE meeting_key = ? AND participant_id = ?
+        ''', (meeting_key, participant_id))
         
         result = cursor.fetchone()
         
@@ -315,189 +1729,216 @@ def update_participant_leave_time_db(meeting_id, participant_id):
             duration = int((leave_time_dt - join_time).total_seconds())
             
             # Update record
-            cursor.execute('''
-            UPDATE engagement_data
-            SET leave_time = ?, duration = ?
-            WHERE meeting_id = ? AND participant_id = ?
-            ''', (leave_time, duration, meeting_id, participant_id))
+            _update_engagement(cursor, "leave_time = ?, duration = ?", (leave_time, duration), meeting_key, participant_id)
             
-            conn.commit()
             print(f"Updated leave time for participant {participant_id} in meeting {meeting_id}")
             return True
         else:
             logger.warning(f"Participant {participant_id} not found in meeting {meeting_id}")
             return False
-    except Exception as e:
-        print(f"Error updating participant leave time: {str(e)}")
-        return False
-    finally:
-        conn.close()
+
+    return submit_write(_op, False, "Error updating participant leave time", shard=meeting_shard(meeting_id))
 
 def update_participant_talk_time_db(meeting_id, participant_id, talk_time):
-    """Update the talk time for a participant"""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
+    """
+    Queue a talk time update on the writer
+    Returns a Future resolving to True on success, False otherwise
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id, create=True)
+
         # Update record
-        cursor.execute('''
-        UPDATE engagement_data
-        SET talk_time = ?
-        WHERE meeting_id = ? AND participant_id = ?
-        ''', (talk_time, meeting_id, participant_id))
+        _update_engagement(cursor, "talk_time = ?", (talk_time,), meeting_key, participant_id)
         
-        conn.commit()
         print(f"Updated talk time for participant {participant_id} in meeting {meeting_id}: {talk_time}s")
         return True
-    except Exception as e:
-        print(f"Error updating participant talk time: {str(e)}")
-        return False
-    finally:
-        conn.close()
+
+    return submit_write(_op, False, "Error updating participant talk time", shard=meeting_shard(meeting_id))
 
 def update_participant_status_db(meeting_id, participant_id, is_active, browser_id):
-    """Update the active status of a participant in the database"""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
+    """
+    Queue an active status update on the writer
+    Returns a Future resolving to True on success, False otherwise
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id, create=True)
+        _participant_key(cursor, meeting_key, participant_id, browser_id=browser_id)
+
         # Check if participant exists in engagement_data
         cursor.execute(
-            "SELECT participant_id FROM engagement_data WHERE meeting_id = ? AND participant_id = ?",
-            (meeting_id, participant_id)
+            f"SELECT participant_id FROM {ENGAGEMENT_ROWS} e WHERE meeting_key = ? AND participant_id = ?",
+            (meeting_key, participant_id)
         )
         existing = cursor.fetchone()
         
         if existing:
             # We don't have an is_active field in the database schema,
             # so we'll update other fields as a way to track activity
-            cursor.execute(
-                "UPDATE engagement_data SET leave_time = ? WHERE meeting_id = ? AND participant_id = ?",
-                (None if is_active else datetime.now().isoformat(), meeting_id, participant_id)
+            _update_engagement(
+                cursor, "leave_time = ?", (None if is_active else datetime.now().isoformat(),),
+                meeting_key, participant_id
             )
         else:
             # Insert new participant with an active status
             cursor.execute(
-                "INSERT INTO engagement_data (meeting_id, participant_id, participant_name, join_time) VALUES (?, ?, ?, ?)",
-                (meeting_id, participant_id, f"Participant {participant_id}", datetime.now().isoformat())
+                "INSERT INTO live.engagement_data (meeting_key, participant_id, participant_name, join_time) VALUES (?, ?, ?, ?)",
+                (meeting_key, participant_id, f"Participant {participant_id}", datetime.now().isoformat())
             )
             
-        conn.commit()
         return True
-        
-    except Exception as e:
-        print(f"Database error in update_participant_status_db: {str(e)}")
-        return False
-    finally:
-        conn.close()
 
-def get_meeting_participants_db(meeting_id):
-    """Get all participants for a specific meeting"""
+    return submit_write(_op, False, "Database error in update_participant_status_db", shard=meeting_shard(meeting_id))
+
+def get_meeting_participants_db(meeting_id, fields=None):
+    """
+    Get all participants for a specific meeting
+    fields projects the returned keys (see PARTICIPANT_FIELDS); raises ValueError for unknown fields
+    """
+    columns = _select_list(PARTICIPANT_FIELDS, fields)
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM engagement_data
-        WHERE meeting_id = ?
-        ORDER BY talk_time DESC
-        ''', (meeting_id,))
-        
-        rows = cursor.fetchall()
-        participants = []
-        
-        for row in rows:
-            participants.append({
-                'id': row['participant_id'],
-                'name': row['participant_name'],
-                'join_time': row['join_time'],
-                'leave_time': row['leave_time'],
-                'duration': row['duration'],
-                'talk_time': row['talk_time']
-            })
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            cursor = conn.cursor()
+            meeting_key = _meeting_key(cursor, meeting_id)
+            if meeting_key is None:
+                return []
+            
+            cursor.execute(f'''
+            SELECT {columns} FROM {ENGAGEMENT_ROWS} e
+            WHERE meeting_key = ?
+            ORDER BY talk_time DESC
+            ''', (meeting_key,))
+            
+            rows = cursor.fetchall()
+
+        participants = [dict(row) for row in rows]
         
         return participants
     except Exception as e:
         print(f"Error fetching meeting participants: {str(e)}")
         return []
-    finally:
-        conn.close()
 
 ########################################################################################################################
 # Database Meeting End Operations
 ########################################################################################################################
 
-def get_final_transcript_db(meeting_id):
+def get_all_transcripts_db(fields=None):
     """
-    Retrieve the final transcript for a meeting
-    Returns the transcript data or None if not found
+    Retrieve summary info for every archived meeting, newest first
+    fields projects the returned keys (see TRANSCRIPT_LIST_FIELDS); raises ValueError for unknown fields
+    Returns a list of dicts, or None on error
     """
+    # Topic and participant count are extracted in SQL, so the blobs are never decoded in Python
+    columns = _select_list(TRANSCRIPT_LIST_FIELDS, fields)
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        # Query to get all final transcripts with basic info, from every shard
+        shard_rows = _read_shards(f'''
+        SELECT {columns}, final_meeting_transcripts.created_at AS sort_key
+        FROM final_meeting_transcripts JOIN meetings USING (meeting_key)
+        ORDER BY sort_key DESC
+        ''')
 
-        cursor.execute('''
-        SELECT * FROM final_meeting_transcripts
-        WHERE meeting_id = ?
-        ''', (meeting_id,))
+        return _merge_sorted_shards(shard_rows, reverse=True)
 
-        result = cursor.fetchone()
+    except Exception as e:
+        print(f"Error retrieving transcript list: {str(e)}")
+        return None
 
-        if result:
-            # Parse the JSON data
-            transcript_data_json = result['transcript_data']
-            participant_data_json = result['participant_data']
+def get_final_transcript_db(meeting_id, fields=None):
+    """
+    Retrieve the final transcript for a meeting
+    fields projects the returned keys (see FINAL_TRANSCRIPT_FIELDS); unrequested blobs are never read or decoded
+    Returns the transcript data or None if not found
+    """
+    columns = _select_list(FINAL_TRANSCRIPT_FIELDS, fields)
+    try:
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            cursor = conn.cursor()
+            meeting_key = _meeting_key(cursor, meeting_id)
+            if meeting_key is None:
+                return None
 
-            transcript_data = json.loads(transcript_data_json)
-            participant_data = json.loads(participant_data_json)
+            cursor.execute(f'''
+            SELECT {columns} FROM final_meeting_transcripts JOIN meetings USING (meeting_key)
+            WHERE meeting_key = ?
+            ''', (meeting_key,))
 
+            result = cursor.fetchone()
 
-            # Try to get meeting_topic from transcript data.  Adjust this if your structure is different.
-            meeting_topic = transcript_data[0].get('meeting_topic', 'Untitled Meeting') if transcript_data else 'Untitled Meeting'
+            if result:
+                final_transcript = dict(result)
 
-            final_transcript = {
-                'meeting_id': result['meeting_id'],
-                'meeting_date': result['meeting_date'],
-                'created_at': result['created_at'],
-                'transcript_data': transcript_data,
-                'participant_data': participant_data,
-                'meeting_topic': meeting_topic  # Add meeting topic
-            }
-            return final_transcript
-        else:
-            return None
+                # Parse the JSON data; utterances are reassembled from the archive chunks
+                if 'participant_data' in final_transcript:
+                    final_transcript['participant_data'] = json.loads(final_transcript['participant_data'])
+                if 'transcript_data' in final_transcript:
+                    final_transcript['transcript_data'] = _archived_transcript(cursor, meeting_key)
+
+                return final_transcript
+            else:
+                return None
 
     except Exception as e:
         print(f"Error retrieving final transcript: {str(e)}")
         return None
-    finally:
-        conn.close()
+
+def delete_final_transcript_db(meeting_id):
+    """
+    Queue deletion of a permanent transcript record on the writer
+    Returns a Future resolving to True if a record was deleted, False otherwise
+    """
+    meeting_id = normalize_meeting_id(meeting_id)
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id)
+        if meeting_key is None:
+            return False
+
+        # Delete the final transcript
+        cursor.execute('''
+        DELETE FROM final_meeting_transcripts
+        WHERE meeting_key = ?
+        ''', (meeting_key,))
+
+        if cursor.rowcount > 0:
+            cursor.execute("DELETE FROM final_transcript_chunks WHERE meeting_key = ?", (meeting_key,))
+            cursor.execute("DELETE FROM meeting_reports WHERE meeting_key = ?", (meeting_key,))
+            cursor.execute("DELETE FROM meeting_terms WHERE meeting_key = ?", (meeting_key,))
+            _delete_rollups(cursor, meeting_id)
+            print(f"Deleted permanent transcript for meeting {meeting_id}")
+            return True
+        return False
+
+    return submit_write(_op, False, "Error deleting permanent transcript", shard=meeting_shard(meeting_id))
 
 def save_and_archive_meeting_data_db(meeting_id):
     """
     Archive meeting data to permanent storage
     This is called when a meeting ends
+    Returns a Future resolving to True once the archive has committed, False otherwise
     """
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row # Enable column access by name
-        cursor = conn.cursor()
+    meeting_id = normalize_meeting_id(meeting_id)
+
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id, create=True)
 
         # Get meeting transcriptions
-        cursor.execute('''
-        SELECT * FROM transcriptions
-        WHERE meeting_id = ?
-        ORDER BY timestamp ASC
-        ''', (meeting_id,))
+        cursor.execute(f'''
+        SELECT p.participant_id, p.participant_name, t.transcript, t.sentiment_score, t.timestamp
+        FROM {TRANSCRIPTION_ROWS} t JOIN participants p ON p.participant_key = t.participant_key
+        WHERE t.meeting_key = ?
+        ORDER BY t.timestamp ASC
+        ''', (meeting_key,))
         transcriptions = cursor.fetchall()
 
         # Get meeting engagement data
-        cursor.execute('''
-        SELECT * FROM engagement_data
-        WHERE meeting_id = ?
-        ''', (meeting_id,))
+        cursor.execute(f'''
+        SELECT * FROM {ENGAGEMENT_ROWS} e
+        WHERE meeting_key = ?
+        ''', (meeting_key,))
         engagement = cursor.fetchall()
 
         # Prepare transcript data for archive
@@ -523,8 +1964,8 @@ def save_and_archive_meeting_data_db(meeting_id):
                 'talk_time': e['talk_time']
             })
 
-        # Get meeting info
-        meeting_info = get_meeting_info_db(meeting_id)
+        # Get meeting info from within the same transaction
+        meeting_info = _meeting_info(cursor, meeting_id)
 
         # Create archive data structure
         archive_data = {
@@ -541,20 +1982,825 @@ def save_and_archive_meeting_data_db(meeting_id):
         # Save to permanent storage
         cursor.execute('''
         INSERT OR REPLACE INTO final_meeting_transcripts
-        (meeting_id, meeting_date, transcript_data, participant_data, full_text)
+        (meeting_key, meeting_date, transcript_data, participant_data, full_text)
         VALUES (?, ?, ?, ?, ?)
         ''', (
-            meeting_id,
+            meeting_key,
             archive_data['start_time'],
-            json.dumps(archive_data['transcript_data']),
+            '[]',   # utterances are stored in final_transcript_chunks
             json.dumps(archive_data['participant_data']),
             full_text
         ))
-        conn.commit()
+        _write_transcript_chunks(cursor, meeting_key, archive_data['transcript_data'])
+
+        # Keep the analytics rollups in step with the archive
+        _update_rollups(cursor, meeting_id, archive_data['start_time'], transcript_data, participant_data)
+
+        # The meeting is over, so its rows leave the live tier
+        _move_to_cold(cursor, meeting_key)
         print(f"Meeting data archived for meeting {meeting_id}")
         return True
+
+    return submit_write(_op, False, "Error archiving meeting data", shard=meeting_shard(meeting_id))
+
+########################################################################################################################
+# Database Archive Chunk Operations
+########################################################################################################################
+
+ARCHIVE_CHUNK_SIZE = int(os.getenv('ARCHIVE_CHUNK_SIZE', 200))
+TRANSCRIPT_MAX_PAGE_SIZE = int(os.getenv('TRANSCRIPT_MAX_PAGE_SIZE', 1000))   # utterances per transcript page
+
+def _write_transcript_chunks(cursor, meeting_key, transcript_data):
+    """Replace a meeting's archived utterances with fixed-size chunks tagged with their time range"""
+    cursor.execute("DELETE FROM final_transcript_chunks WHERE meeting_key = ?", (meeting_key,))
+    rows = []
+    for chunk_index, first in enumerate(range(0, len(transcript_data), ARCHIVE_CHUNK_SIZE)):
+        chunk = transcript_data[first:first + ARCHIVE_CHUNK_SIZE]
+        timestamps = [t['timestamp'] for t in chunk if t.get('timestamp')]
+        rows.append((
+            meeting_key,
+            chunk_index,
+            first,
+            len(chunk),
+            min(timestamps, default=None),
+            max(timestamps, default=None),
+            json.dumps(chunk)
+        ))
+    cursor.executemany('''
+    INSERT INTO final_transcript_chunks
+    (meeting_key, chunk_index, first_utterance, utterance_count, start_time, end_time, chunk_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+def _archived_transcript(cursor, meeting_key):
+    """Reassemble a meeting's full archived utterance list from its chunks"""
+    cursor.execute(
+        "SELECT chunk_data FROM final_transcript_chunks WHERE meeting_key = ? ORDER BY chunk_index",
+        (meeting_key,)
+    )
+    transcript_data = []
+    for (chunk_data,) in cursor.fetchall():
+        transcript_data.extend(json.loads(chunk_data))
+    return transcript_data
+
+def _migrate_transcript_chunks(cursor):
+    """Split archives still holding a single transcript blob into chunks, one meeting at a time"""
+    cursor.execute('''
+    SELECT meeting_key, meeting_id FROM final_meeting_transcripts f JOIN meetings USING (meeting_key)
+    WHERE transcript_data != '[]'
+    AND NOT EXISTS (SELECT 1 FROM final_transcript_chunks c WHERE c.meeting_key = f.meeting_key)
+    ''')
+    for meeting_key, meeting_id in cursor.fetchall():
+        cursor.execute("SELECT transcript_data FROM final_meeting_transcripts WHERE meeting_key = ?", (meeting_key,))
+        _write_transcript_chunks(cursor, meeting_key, json.loads(cursor.fetchone()[0]))
+        cursor.execute("UPDATE final_meeting_transcripts SET transcript_data = '[]' WHERE meeting_key = ?", (meeting_key,))
+        print(f"Split archived transcript into chunks for meeting {meeting_id}")
+
+def get_final_transcript_page_db(meeting_id, offset=0, limit=None, start_time=None, end_time=None):
+    """
+    Retrieve one page of a meeting's archived utterances, decoding only the chunks it overlaps
+    Pages are selected by utterance offset/limit, or by a timestamp window (start_time/end_time, inclusive)
+    in which case limit caps the number of utterances returned from the start of the window
+    Returns a dict with the page and paging info, or None if the meeting has no archive
+    """
+    offset = max(0, offset or 0)
+    try:
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            cursor = conn.cursor()
+            meeting_key = _meeting_key(cursor, meeting_id)
+            if meeting_key is None:
+                return None
+
+            cursor.execute(f'''
+            SELECT meeting_id, meeting_date, created_at, {MEETING_TOPIC_SQL} AS meeting_topic
+            FROM final_meeting_transcripts JOIN meetings USING (meeting_key)
+            WHERE meeting_key = ?
+            ''', (meeting_key,))
+            meeting = cursor.fetchone()
+            if not meeting:
+                return None
+
+            cursor.execute(
+                "SELECT COALESCE(SUM(utterance_count), 0) FROM final_transcript_chunks WHERE meeting_key = ?",
+                (meeting_key,)
+            )
+            total = cursor.fetchone()[0]
+
+            windowed = start_time is not None or end_time is not None
+            if windowed:
+                clauses = ["meeting_key = ?"]
+                params = [meeting_key]
+                if start_time:
+                    clauses.append("end_time >= ?")
+                    params.append(start_time)
+                if end_time:
+                    clauses.append("start_time <= ?")
+                    params.append(end_time)
+            else:
+                clauses = ["meeting_key = ?", "first_utterance + utterance_count > ?"]
+                params = [meeting_key, offset]
+                if limit is not None:
+                    clauses.append("first_utterance < ?")
+                    params.append(offset + limit)
+
+            cursor.execute(f'''
+            SELECT first_utterance, chunk_data FROM final_transcript_chunks
+            WHERE {' AND '.join(clauses)}
+            ORDER BY chunk_index
+            ''', params)
+
+            utterances = []
+            first_index = None
+            has_more = False
+            for row in cursor:
+                for position, entry in enumerate(json.loads(row['chunk_data']), row['first_utterance']):
+                    if windowed:
+                        timestamp = entry.get('timestamp') or ''
+                        if (start_time and timestamp < start_time) or (end_time and timestamp > end_time):
+                            continue
+                    elif position < offset:
+                        continue
+                    if limit is not None and len(utterances) >= limit:
+                        has_more = True
+                        break
+                    if first_index is None:
+                        first_index = position
+                    utterances.append(entry)
+                if has_more:
+                    break
+
+            if not windowed:
+                has_more = offset + len(utterances) < total
+
+        return {
+            'meeting_id': meeting['meeting_id'],
+            'meeting_date': meeting['meeting_date'],
+            'created_at': meeting['created_at'],
+            'meeting_topic': meeting['meeting_topic'],
+            'offset': first_index if first_index is not None else offset,
+            'limit': limit,
+            'total_utterances': total,
+            'has_more': has_more,
+            'transcript_data': utterances
+        }
+
+    except Exception as e:
+        print(f"Error retrieving final transcript page: {str(e)}")
+        return None
+
+########################################################################################################################
+# Database Export Operations
+########################################################################################################################
+
+def _archive_filter(start_date=None, end_date=None, meeting_ids=None, alias='final_meeting_transcripts'):
+    """
+    Build the WHERE clause selecting archived meetings by date range (inclusive, YYYY-MM-DD)
+    and/or an explicit list of meeting ids (matched against the joined meetings table)
+    """
+    clauses = []
+    params = []
+    if start_date:
+        clauses.append(f"{alias}.meeting_date >= ?")
+        params.append(start_date)
+    if end_date:
+        # meeting_date is an ISO timestamp, so compare against the start of the following day
+        clauses.append(f"{alias}.meeting_date < date(?, '+1 day')")
+        params.append(end_date)
+    if meeting_ids:
+        clauses.append(f"meetings.meeting_id IN ({', '.join('?' for _ in meeting_ids)})")
+        params.extend(normalize_meeting_id(i) for i in meeting_ids)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+def iter_archived_utterances_db(start_date=None, end_date=None, meeting_ids=None):
+    """
+    Yield one dict per archived utterance for the selected meetings
+    Utterances are streamed chunk by chunk, so only one archive chunk is decoded at a time
+    """
+    where, params = _archive_filter(start_date, end_date, meeting_ids, alias='f')
+    rows = _iter_shards(f'''
+    SELECT meetings.meeting_id, f.meeting_date, f.meeting_key, c.chunk_index, c.first_utterance, c.chunk_data
+    FROM final_meeting_transcripts f
+    JOIN meetings ON meetings.meeting_key = f.meeting_key
+    JOIN final_transcript_chunks c ON c.meeting_key = f.meeting_key
+    {where}
+    ORDER BY f.meeting_date, f.meeting_key, c.chunk_index
+    ''', params, key=lambda row: (row['meeting_date'], row['meeting_key'], row['chunk_index']), shards=_shards_for(meeting_ids))
+
+    for row in rows:
+        for index, entry in enumerate(json.loads(row['chunk_data']), row['first_utterance']):
+            sentiment_score = entry.get('sentiment_score')
+            yield {
+                'meeting_id': row['meeting_id'],
+                'meeting_date': row['meeting_date'],
+                'utterance_index': index,
+                'participant_id': entry.get('participant_id'),
+                'participant_name': entry.get('participant_name'),
+                'timestamp': entry.get('timestamp'),
+                'sentiment_score': float(sentiment_score) if sentiment_score is not None else None,
+                'transcript': entry.get('transcript')
+            }
+
+def iter_archived_participants_db(start_date=None, end_date=None, meeting_ids=None):
+    """Yield one dict per participant of the selected archived meetings, streamed from engagement_data"""
+    where, params = _archive_filter(start_date, end_date, meeting_ids, alias='f')
+    rows = _iter_shards(f'''
+    SELECT
+        meetings.meeting_id,
+        f.meeting_date,
+        f.meeting_key,
+        e.participant_id,
+        e.participant_name,
+        e.join_time,
+        e.leave_time,
+        e.duration,
+        e.talk_time,
+        e.engagement_score
+    FROM final_meeting_transcripts f
+    JOIN meetings ON meetings.meeting_key = f.meeting_key
+    JOIN {ENGAGEMENT_ROWS} e ON e.meeting_key = f.meeting_key
+    {where}
+    ORDER BY f.meeting_date, f.meeting_key, e.participant_id
+    ''', params, key=lambda row: (row['meeting_date'], row['meeting_key'], row['participant_id']), shards=_shards_for(meeting_ids))
+
+    for row in rows:
+        participant = dict(row)
+        del participant['meeting_key']
+        yield participant
+
+########################################################################################################################
+# Database Report Operations
+########################################################################################################################
+
+def has_final_transcript_db(meeting_id):
+    """Whether a meeting has been archived"""
+    try:
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            cursor = conn.cursor()
+            meeting_key = _meeting_key(cursor, meeting_id)
+            if meeting_key is None:
+                return False
+            cursor.execute("SELECT 1 FROM final_meeting_transcripts WHERE meeting_key = ?", (meeting_key,))
+            return cursor.fetchone() is not None
+
     except Exception as e:
-        print(f"Error archiving meeting data: {str(e)}")
+        print(f"Error checking final transcript: {str(e)}")
         return False
+
+def get_report_source_db(meeting_id):
+    """
+    Read what a meeting's report is built from: start time, archived utterances and participants
+    Returns a dict of build_report arguments, or None if the meeting has no archive
+    """
+    with read_connection(meeting_shard(meeting_id)) as conn:
+        cursor = conn.cursor()
+        meeting_key = _meeting_key(cursor, meeting_id)
+        if meeting_key is None:
+            return None
+
+        cursor.execute(
+            "SELECT meeting_date, participant_data FROM final_meeting_transcripts WHERE meeting_key = ?",
+            (meeting_key,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        return {
+            'meeting_id': meeting_id,
+            'start_time': row['meeting_date'],
+            'transcript_data': _archived_transcript(cursor, meeting_key),
+            'participant_data': json.loads(row['participant_data'])
+        }
+
+def save_meeting_report_db(meeting_id, report):
+    """
+    Queue storing a meeting's report on the writer (skipped if the archive was deleted meanwhile)
+    Returns a Future resolving to True if the report was stored, False otherwise
+    """
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id)
+        if meeting_key is None:
+            return False
+        cursor.execute('''
+        INSERT OR REPLACE INTO meeting_reports (meeting_key, report)
+        SELECT ?, ? WHERE EXISTS (SELECT 1 FROM final_meeting_transcripts WHERE meeting_key = ?)
+        ''', (meeting_key, json.dumps(report), meeting_key))
+        return cursor.rowcount > 0
+
+    return submit_write(_op, False, "Error saving meeting report", shard=meeting_shard(meeting_id))
+
+def get_meeting_report_db(meeting_id):
+    """Retrieve a meeting's precomputed report (one row), or None if there is none yet"""
+    try:
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            cursor = conn.cursor()
+            meeting_key = _meeting_key(cursor, meeting_id)
+            if meeting_key is None:
+                return None
+            cursor.execute("SELECT report, generated_at FROM meeting_reports WHERE meeting_key = ?", (meeting_key,))
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        report = json.loads(row['report'])
+        report['generated_at'] = row['generated_at']
+        return report
+
+    except Exception as e:
+        print(f"Error retrieving meeting report: {str(e)}")
+        return None
+
+def save_meeting_terms_db(meeting_id, terms):
+    """
+    Queue storing an archived meeting's final term counts on the writer
+    Returns a Future resolving to True if they were stored, False otherwise
+    """
+    def _op(cursor):
+        meeting_key = _meeting_key(cursor, meeting_id)
+        if meeting_key is None:
+            return False
+        cursor.execute('''
+        INSERT OR REPLACE INTO meeting_terms (meeting_key, terms)
+        SELECT ?, ? WHERE EXISTS (SELECT 1 FROM final_meeting_transcripts WHERE meeting_key = ?)
+        ''', (meeting_key, json.dumps(terms), meeting_key))
+        return cursor.rowcount > 0
+
+    return submit_write(_op, False, "Error saving meeting terms", shard=meeting_shard(meeting_id))
+
+def get_meeting_terms_db(meeting_id):
+    """Retrieve an archived meeting's final term counts, or None if none were stored"""
+    try:
+        with read_connection(meeting_shard(meeting_id)) as conn:
+            cursor = conn.cursor()
+            meeting_key = _meeting_key(cursor, meeting_id)
+            if meeting_key is None:
+                return None
+            cursor.execute("SELECT terms FROM meeting_terms WHERE meeting_key = ?", (meeting_key,))
+            row = cursor.fetchone()
+
+        return json.loads(row['terms']) if row else None
+
+    except Exception as e:
+        print(f"Error retrieving meeting terms: {str(e)}")
+        return None
+
+########################################################################################################################
+# Database Analytics Operations
+########################################################################################################################
+
+SENTIMENT_POSITIVE_THRESHOLD = 0.1
+SENTIMENT_NEGATIVE_THRESHOLD = -0.1
+ANALYTICS_GROUPINGS = ('participant', 'meeting', 'day')
+
+def _sentiment_bucket(score):
+    """Classify a sentiment score the same way the dashboard does"""
+    score = score or 0
+    if score > SENTIMENT_POSITIVE_THRESHOLD:
+        return 'positive_count'
+    if score < SENTIMENT_NEGATIVE_THRESHOLD:
+        return 'negative_count'
+    return 'neutral_count'
+
+def _refresh_daily_rollup(cursor, meeting_day):
+    """Recompute one day's rollup from its meeting rollups"""
+    cursor.execute("DELETE FROM daily_rollups WHERE meeting_day = ?", (meeting_day,))
+    cursor.execute('''
+    INSERT INTO daily_rollups (
+        meeting_day, meeting_count, participant_count, utterance_count, total_talk_time,
+        sentiment_sum, positive_count, neutral_count, negative_count
+    )
+    SELECT
+        meeting_day, COUNT(*), SUM(participant_count), SUM(utterance_count), SUM(total_talk_time),
+        SUM(sentiment_sum), SUM(positive_count), SUM(neutral_count), SUM(negative_count)
+    FROM meeting_rollups
+    WHERE meeting_day = ?
+    GROUP BY meeting_day
+    ''', (meeting_day,))
+
+def _delete_rollups(cursor, meeting_id):
+    """Remove a meeting from the rollups, refreshing the day it was counted in"""
+    cursor.execute("SELECT meeting_day FROM meeting_rollups WHERE meeting_id = ?", (meeting_id,))
+    row = cursor.fetchone()
+    cursor.execute("DELETE FROM participant_rollups WHERE meeting_id = ?", (meeting_id,))
+    cursor.execute("DELETE FROM meeting_rollups WHERE meeting_id = ?", (meeting_id,))
+    if row:
+        _refresh_daily_rollup(cursor, row[0])
+
+def _update_rollups(cursor, meeting_id, meeting_date, transcript_data, participant_data):
+    """
+    Replace the meeting's per-meeting and per-participant rollups and refresh its day
+    transcript_data and participant_data use the archive's JSON structure
+    """
+    meeting_day = (meeting_date or datetime.now().isoformat())[:10]
+    _delete_rollups(cursor, meeting_id)
+
+    # Per-participant totals, seeded from engagement so silent participants are counted too;
+    # a participant who rejoined has one engagement entry per session, whose talk times add up
+    participants = {}
+    for p in participant_data:
+        stats = participants.setdefault(p['id'], {
+            'participant_name': p.get('name'),
+            'talk_time': 0,
+            'utterance_count': 0,
+            'sentiment_sum': 0.0,
+            'positive_count': 0,
+            'neutral_count': 0,
+            'negative_count': 0
+        })
+        stats['participant_name'] = stats['participant_name'] or p.get('name')
+        stats['talk_time'] += p.get('talk_time') or 0
+    for t in transcript_data:
+        stats = participants.setdefault(t['participant_id'], {
+            'participant_name': t.get('participant_name'),
+            'talk_time': 0,
+            'utterance_count': 0,
+            'sentiment_sum': 0.0,
+            'positive_count': 0,
+            'neutral_count': 0,
+            'negative_count': 0
+        })
+        stats['utterance_count'] += 1
+        stats['sentiment_sum'] += t.get('sentiment_score') or 0
+        stats[_sentiment_bucket(t.get('sentiment_score'))] += 1
+
+    total_talk_time = sum(stats['talk_time'] for stats in participants.values())
+    cursor.executemany('''
+    INSERT INTO participant_rollups (
+        meeting_id, participant_id, meeting_day, participant_name, talk_time, talk_share,
+        utterance_count, sentiment_sum, positive_count, neutral_count, negative_count
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(
+        meeting_id,
+        participant_id,
+        meeting_day,
+        stats['participant_name'],
+        stats['talk_time'],
+        stats['talk_time'] / total_talk_time if total_talk_time else 0,
+        stats['utterance_count'],
+        stats['sentiment_sum'],
+        stats['positive_count'],
+        stats['neutral_count'],
+        stats['negative_count']
+    ) for participant_id, stats in participants.items()])
+
+    cursor.execute('''
+    INSERT INTO meeting_rollups (
+        meeting_id, meeting_day, participant_count, utterance_count, total_talk_time,
+        sentiment_sum, positive_count, neutral_count, negative_count
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        meeting_id,
+        meeting_day,
+        len(participants),
+        sum(stats['utterance_count'] for stats in participants.values()),
+        total_talk_time,
+        sum(stats['sentiment_sum'] for stats in participants.values()),
+        sum(stats['positive_count'] for stats in participants.values()),
+        sum(stats['neutral_count'] for stats in participants.values()),
+        sum(stats['negative_count'] for stats in participants.values())
+    ))
+
+    _refresh_daily_rollup(cursor, meeting_day)
+
+def _backfill_rollups(cursor):
+    """Roll up archived meetings that have no rollup yet, one meeting at a time"""
+    cursor.execute('''
+    SELECT meeting_key, meeting_id FROM final_meeting_transcripts JOIN meetings USING (meeting_key)
+    WHERE meeting_id NOT IN (SELECT meeting_id FROM meeting_rollups)
+    ''')
+    for meeting_key, meeting_id in cursor.fetchall():
+        cursor.execute(
+            "SELECT meeting_date, participant_data FROM final_meeting_transcripts WHERE meeting_key = ?",
+            (meeting_key,)
+        )
+        meeting_date, participant_data = cursor.fetchone()
+        transcript_data = _archived_transcript(cursor, meeting_key)
+        _update_rollups(cursor, meeting_id, meeting_date, transcript_data, json.loads(participant_data))
+        print(f"Backfilled analytics rollups for meeting {meeting_id}")
+
+def get_analytics_db(group_by='participant', start_date=None, end_date=None, participant_ids=None, meeting_ids=None):
+    """
+    Aggregate archived meeting analytics from the rollup tables
+    group_by is one of 'participant', 'meeting' or 'day'; dates are inclusive YYYY-MM-DD
+    A day's participant_count counts participant-meetings (someone in two meetings that day counts twice)
+    Returns a list of dicts, or None on error
+    """
+    if group_by not in ANALYTICS_GROUPINGS:
+        raise ValueError(f"Unknown grouping '{group_by}', expected one of {', '.join(ANALYTICS_GROUPINGS)}")
+
+    def _filters(alias, include_participants=True):
+        clauses = []
+        params = []
+        if start_date:
+            clauses.append(f"{alias}.meeting_day >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append(f"{alias}.meeting_day <= ?")
+            params.append(end_date)
+        if meeting_ids:
+            clauses.append(f"{alias}.meeting_id IN ({', '.join('?' for _ in meeting_ids)})")
+            params.extend(meeting_ids)
+        if participant_ids and include_participants:
+            clauses.append(f"{alias}.participant_id IN ({', '.join('?' for _ in participant_ids)})")
+            params.extend(participant_ids)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    if group_by == 'participant':
+        where, params = _filters('p')
+        query = f'''
+        SELECT
+            p.participant_id,
+            MAX(p.participant_name) AS participant_name,
+            COUNT(*) AS meeting_count,
+            SUM(p.talk_time) AS total_talk_time,
+            SUM(p.talk_share) AS talk_share_sum,
+            SUM(p.utterance_count) AS utterance_count,
+            SUM(p.sentiment_sum) AS sentiment_sum,
+            SUM(p.positive_count) AS positive_count,
+            SUM(p.neutral_count) AS neutral_count,
+            SUM(p.negative_count) AS negative_count
+        FROM participant_rollups p
+        {where}
+        GROUP BY p.participant_id
+        ORDER BY total_talk_time DESC
+        '''
+    elif group_by == 'meeting':
+        where, params = _filters('m', include_participants=False)
+        if participant_ids:
+            where += (" AND " if where else "WHERE ") + f'''m.meeting_id IN (
+                SELECT meeting_id FROM participant_rollups
+                WHERE participant_id IN ({', '.join('?' for _ in participant_ids)})
+            )'''
+            params.extend(participant_ids)
+        query = f'''
+        SELECT
+            m.meeting_id,
+            m.meeting_day,
+            m.participant_count,
+            m.utterance_count,
+            m.total_talk_time,
+            m.sentiment_sum,
+            m.positive_count,
+            m.neutral_count,
+            m.negative_count
+        FROM meeting_rollups m
+        {where}
+        ORDER BY m.meeting_day DESC, m.meeting_id
+        '''
+    elif participant_ids or meeting_ids:
+        # Per-day figures restricted to some participants/meetings come from the participant rollups
+        where, params = _filters('p')
+        query = f'''
+        SELECT
+            p.meeting_day,
+            COUNT(DISTINCT p.meeting_id) AS meeting_count,
+            COUNT(*) AS participant_count,      -- participant-meetings, as in daily_rollups
+            SUM(p.utterance_count) AS utterance_count,
+            SUM(p.talk_time) AS total_talk_time,
+            SUM(p.sentiment_sum) AS sentiment_sum,
+            SUM(p.positive_count) AS positive_count,
+            SUM(p.neutral_count) AS neutral_count,
+            SUM(p.negative_count) AS negative_count
+        FROM participant_rollups p
+        {where}
+        GROUP BY p.meeting_day
+        ORDER BY p.meeting_day
+        '''
+    else:
+        where, params = _filters('d', include_participants=False)
+        query = f'''
+        SELECT
+            d.meeting_day,
+            d.meeting_count,
+            d.participant_count,
+            d.utterance_count,
+            d.total_talk_time,
+            d.sentiment_sum,
+            d.positive_count,
+            d.neutral_count,
+            d.negative_count
+        FROM daily_rollups d
+        {where}
+        ORDER BY d.meeting_day
+        '''
+
+    try:
+        shard_rows = _read_shards(query, params, _shards_for(meeting_ids))
+    except Exception as e:
+        print(f"Database error in get_analytics_db: {str(e)}")
+        return None
+
+    # Shards hold disjoint meetings, so per-meeting rows only need ordering; the others are added up
+    if group_by == 'meeting':
+        rows = sorted((row for rows in shard_rows for row in rows), key=lambda row: row['meeting_id'])
+        rows.sort(key=lambda row: row['meeting_day'], reverse=True)
+    else:
+        group_key = 'participant_id' if group_by == 'participant' else 'meeting_day'
+        rows = _sum_shard_rows(shard_rows, group_key)
+        if group_by == 'participant':
+            rows.sort(key=lambda row: row['total_talk_time'] or 0, reverse=True)
+        else:
+            rows.sort(key=lambda row: row['meeting_day'])
+    return [_finish_analytics_row(row) for row in rows]
+
+def _sum_shard_rows(shard_rows, group_key):
+    """Add up the analytics rows of every shard that share a group key (names are taken from any shard)"""
+    totals = {}
+    for rows in shard_rows:
+        for row in rows:
+            total = totals.get(row[group_key])
+            if total is None:
+                totals[row[group_key]] = dict(row)
+                continue
+            for name, value in row.items():
+                if name == 'participant_name':
+                    total[name] = max(filter(None, (total[name], value)), default=None)
+                elif name != group_key and value is not None:
+                    total[name] = (total[name] or 0) + value
+    return list(totals.values())
+
+def _finish_analytics_row(row):
+    """Replace the summed columns of an analytics row with the averages the API returns"""
+    finished = {}
+    for name, value in row.items():
+        if name == 'sentiment_sum':
+            finished['avg_sentiment'] = value / row['utterance_count'] if row['utterance_count'] else None
+        elif name == 'talk_share_sum':
+            finished['avg_talk_share'] = value / row['meeting_count'] if row['meeting_count'] else None
+        else:
+            finished[name] = value
+    return finished
+
+########################################################################################################################
+# Database Shard Rebalancing
+########################################################################################################################
+
+# Per-meeting tables copied between shards unchanged (their rows are keyed by meeting_key alone)
+SHARD_MEETING_TABLES = ['final_transcript_chunks', 'meeting_reports', 'meeting_terms']
+
+def shard_files(shard):
+    """Every file of a shard: its database, live tier and live tier backup, with their WAL files"""
+    files = []
+    for path in (shard_path(shard), _shard_file(LIVE_DATABASE_PATH, shard)):
+        files.extend([path, f"{path}-wal", f"{path}-shm"])
+    files.append(_shard_file(LIVE_BACKUP_PATH, shard))
+    return files
+
+def _open_shard(shard):
+    """Read-write connection to a shard with its live tier attached, for offline maintenance"""
+    conn = sqlite3.connect(shard_path(shard), isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    _attach_live(conn, shard)
+    return conn
+
+def get_shard_layout_db(shard):
+    """The shard count a shard's file was laid out for, or None if it does not record one"""
+    if not os.path.exists(shard_path(shard)):
+        return None
+    conn = sqlite3.connect(shard_path(shard))
+    try:
+        row = conn.execute("SELECT shard_count FROM shard_layout").fetchone()
+        return row[0] if row else None
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+def set_shard_layout_db(shard, shards):
+    """Record that a shard's file is laid out for the given shard count"""
+    conn = sqlite3.connect(shard_path(shard))
+    try:
+        with conn:
+            conn.execute("DELETE FROM shard_layout")
+            conn.execute("INSERT INTO shard_layout (shard, shard_count) VALUES (?, ?)", (shard, shards))
+    finally:
+        conn.close()
+
+def list_shard_meetings_db(shard):
+    """Ids of every meeting stored in a shard"""
+    conn = sqlite3.connect(shard_path(shard))
+    try:
+        return [row[0] for row in conn.execute("SELECT meeting_id FROM meetings ORDER BY meeting_key")]
+    finally:
+        conn.close()
+
+def _copy_rows(conn, source, target, where, params, transform=None):
+    """Insert the rows of source matching where into target by column name, passing each through transform"""
+    rows = conn.execute(f"SELECT * FROM {source} WHERE {where}", params).fetchall()
+    for row in rows:
+        values = dict(row)
+        if transform is not None:
+            values = transform(values)
+        conn.execute(
+            f"INSERT INTO {target} ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+            list(values.values())
+        )
+    return len(rows)
+
+def _delete_meeting_rows(cursor, meeting_key, meeting_id):
+    """Delete every row of a meeting from a shard (main and live schemas of the connection)"""
+    for schema in ('live', 'main'):
+        for table in TIERED_TABLES:
+            cursor.execute(f"DELETE FROM {schema}.{table} WHERE meeting_key = ?", (meeting_key,))
+    for table in SHARD_MEETING_TABLES + ['final_meeting_transcripts', 'live.meeting_summary', 'participants', 'meetings']:
+        cursor.execute(f"DELETE FROM {table} WHERE meeting_key = ?", (meeting_key,))
+    _delete_rollups(cursor, meeting_id)
+
+def move_meeting_db(meeting_id, source, target):
+    """
+    Move every row of a meeting from one shard to another, keeping its meeting_key (server stopped)
+    The copy commits before the source rows are deleted, so an interrupted move leaves the meeting in both
+    shards and moving it again replaces the partial copy
+    Returns the number of rows moved
+    """
+    conn = _open_shard(target)
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (shard_path(source),))
+        conn.execute("ATTACH DATABASE ? AS src_live", (_shard_file(LIVE_DATABASE_PATH, source),))
+        cursor = conn.cursor()
+
+        meeting = conn.execute("SELECT meeting_key FROM src.meetings WHERE meeting_id = ?", (meeting_id,)).fetchone()
+        if meeting is None:
+            return 0
+        meeting_key = meeting['meeting_key']
+
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            existing = conn.execute("SELECT meeting_id FROM main.meetings WHERE meeting_key = ?", (meeting_key,)).fetchone()
+            if existing is not None and existing['meeting_id'] != meeting_id:
+                raise ValueError(f"Meeting key {meeting_key} of meeting {meeting_id} is taken by meeting {existing['meeting_id']}")
+            if existing is not None:
+                # Left behind by an interrupted move
+                _delete_meeting_rows(cursor, meeting_key, meeting_id)
+
+            where = "meeting_key = ?"
+            moved = _copy_rows(conn, 'src.meetings', 'main.meetings', where, (meeting_key,))
+
+            # Participant and row ids are only unique within a shard, so they are handed out anew
+            participant_keys = {}
+            for row in conn.execute("SELECT * FROM src.participants WHERE meeting_key = ?", (meeting_key,)).fetchall():
+                values = dict(row)
+                old_key = values.pop('participant_key')
+                cursor.execute(
+                    f"INSERT INTO main.participants ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+                    list(values.values())
+                )
+                participant_keys[old_key] = cursor.lastrowid
+                moved += 1
+
+            for table in TIERED_TABLES:
+                # Above every id of both tiers, so live rows still never collide with cold ones
+                next_id = [1 + max(
+                    conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {schema}.{table}").fetchone()[0]
+                    for schema in ('main', 'live')
+                )]
+
+                def _renumber(values):
+                    values['id'] = next_id[0]
+                    next_id[0] += 1
+                    if 'participant_key' in values:
+                        values['participant_key'] = participant_keys[values['participant_key']]
+                    return values
+
+                moved += _copy_rows(conn, f'src.{table}', f'main.{table}', where, (meeting_key,), _renumber)
+                moved += _copy_rows(conn, f'src_live.{table}', f'live.{table}', where, (meeting_key,), _renumber)
+            _seed_live_ids(conn)
+
+            moved += _copy_rows(
+                conn, 'src.final_meeting_transcripts', 'main.final_meeting_transcripts', where, (meeting_key,),
+                lambda values: {name: value for name, value in values.items() if name != 'id'}
+            )
+            for table in SHARD_MEETING_TABLES:
+                moved += _copy_rows(conn, f'src.{table}', f'main.{table}', where, (meeting_key,))
+            moved += _copy_rows(conn, 'src_live.meeting_summary', 'live.meeting_summary', where, (meeting_key,))
+
+            # Rollups are keyed by meeting id; the day's totals are recomputed on both sides
+            moved += _copy_rows(conn, 'src.meeting_rollups', 'main.meeting_rollups', "meeting_id = ?", (meeting_id,))
+            moved += _copy_rows(conn, 'src.participant_rollups', 'main.participant_rollups', "meeting_id = ?", (meeting_id,))
+            day = conn.execute("SELECT meeting_day FROM main.meeting_rollups WHERE meeting_id = ?", (meeting_id,)).fetchone()
+            if day:
+                _refresh_daily_rollup(cursor, day[0])
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    conn = _open_shard(source)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            _delete_meeting_rows(cursor, meeting_key, meeting_id)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
     finally:
         conn.close()
+    return moved
@@ -0,0 +1,90 @@
+"""
+Per-meeting coalescing of high-frequency participant updates into meeting_delta socket events
+
+Talk-time, status and engagement changes arrive many times per second in a busy meeting. Instead
+of emitting one event per POST, changes are merged per meeting and participant and flushed on a
+fixed tick, so every dashboard recomputes at most once per interval and only for participants
+that actually changed. Meeting-wide fields (such as the rolling sentiment) ride along on the same
+tick, latest value only.
+"""
+import os
+import threading
+
+from payloads import ENCODING_JSON, ENCODING_BINARY
+
+MEETING_DELTA_INTERVAL = float(os.getenv('MEETING_DELTA_INTERVAL', 0.5))   # seconds between flushes (2 Hz)
+
+# Socket.IO room each client joins at connect time, by the meeting_delta encoding it asked for
+DELTA_ROOMS = {
+    ENCODING_JSON: 'meeting_delta_json',
+    ENCODING_BINARY: 'meeting_delta_binary',
+}
+
+
+class MeetingDeltas:
+    """Collects participant changes per meeting and emits them as one meeting_delta per tick"""
+
+    def __init__(self, socketio, interval=MEETING_DELTA_INTERVAL, event='meeting_delta', encoder=None, sync=None):
+        self.socketio = socketio
+        self.interval = interval
+        self.event = event
+        # Optional DeltaEncoder; binary frames go only to clients that opted in
+        self.encoder = encoder
+        # Optional MeetingSync that versions and buffers each emitted delta
+        self.sync = sync
+        # meeting id -> participant id -> latest changed fields
+        self._pending = {}
+        # meeting id -> latest meeting-wide fields
+        self._meeting_fields = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def record(self, meeting_id, participant_id, meeting_fields=None, **changes):
+        """
+        Merge changed fields for a participant (and meeting_fields for the whole meeting);
+        later values for the same field replace earlier ones
+        """
+        with self._lock:
+            participants = self._pending.setdefault(meeting_id, {})
+            participants.setdefault(participant_id, {}).update(changes)
+            if meeting_fields:
+                self._meeting_fields.setdefault(meeting_id, {}).update(meeting_fields)
+            if not self._started:
+                self._started = True
+                self.socketio.start_background_task(self._run)
+
+    def flush(self):
+        """Take every pending change, returning a list of (meeting_id, participants payload, meeting fields)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            meeting_fields, self._meeting_fields = self._meeting_fields, {}
+        return [
+            (
+                meeting_id,
+                [dict(changes, participant_id=participant_id) for participant_id, changes in participants.items()],
+                meeting_fields.get(meeting_id, {})
+            )
+            for meeting_id, participants in pending.items()
+        ]
+
+    @staticmethod
+    def room(encoding):
+        """Room to join for the given encoding (unknown encodings get JSON)"""
+        return DELTA_ROOMS.get(encoding, DELTA_ROOMS[ENCODING_JSON])
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            for meeting_id, participants, fields in self.flush():
+                try:
+                    payload = dict(fields, meeting_id=meeting_id, participants=participants)
+                    version = self.sync.record(meeting_id, self.event, payload) if self.sync is not None else 0
+                    self.socketio.emit(self.event, dict(payload, version=version), to=DELTA_ROOMS[ENCODING_JSON])
+                    if self.encoder is not None:
+                        self.socketio.emit(
+                            self.event,
+                            self.encoder.encode(meeting_id, participants, version, fields),
+                            to=DELTA_ROOMS[ENCODING_BINARY]
+                        )
+                except Exception as e:
+                    print(f"Error emitting {self.event} for meeting {meeting_id}: {str(e)}")
@@ -0,0 +1,209 @@
+"""
+Bulk export of archived meetings into CSV or columnar (Parquet / Arrow IPC) files
+
+Utterances and participants are exported as separate tables. Rows are pulled from the
+database as a stream and written out in fixed-size chunks, so memory use is bounded by the
+chunk size rather than by the size of the selection.
+
+Usage:
+    python export.py --out exports/ --format parquet --start 2024-01-01 --end 2024-01-31
+    python export.py --out exports/ --format csv --ids 123456789,987654321
+"""
+import argparse
+import csv
+import io
+import os
+import time
+
+from database import init_db, iter_archived_utterances_db, iter_archived_participants_db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # columnar formats are optional
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_ROWS = 5000
+
+# Column name and arrow type for each exported table
+UTTERANCE_COLUMNS = [
+    ('meeting_id', 'string'),
+    ('meeting_date', 'string'),
+    ('utterance_index', 'int64'),
+    ('participant_id', 'string'),
+    ('participant_name', 'string'),
+    ('timestamp', 'string'),
+    ('sentiment_score', 'float64'),
+    ('transcript', 'string'),
+]
+
+PARTICIPANT_COLUMNS = [
+    ('meeting_id', 'string'),
+    ('meeting_date', 'string'),
+    ('participant_id', 'string'),
+    ('participant_name', 'string'),
+    ('join_time', 'string'),
+    ('leave_time', 'string'),
+    ('duration', 'int64'),
+    ('talk_time', 'int64'),
+    ('engagement_score', 'int64'),
+]
+
+EXPORT_TABLES = {
+    'utterances': (UTTERANCE_COLUMNS, iter_archived_utterances_db),
+    'participants': (PARTICIPANT_COLUMNS, iter_archived_participants_db),
+}
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+########################################################################################################################
+# Chunked Writers
+########################################################################################################################
+
+class _DrainSink(io.RawIOBase):
+    """Write-only file object that buffers bytes until drained, so pyarrow writers can be streamed"""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _chunks(rows, columns, chunk_rows):
+    """Group a row stream into column-oriented dicts of at most chunk_rows rows"""
+    names = [name for name, _ in columns]
+    chunk = {name: [] for name in names}
+    count = 0
+    for row in rows:
+        for name in names:
+            chunk[name].append(row.get(name))
+        count += 1
+        if count == chunk_rows:
+            yield chunk, count
+            chunk = {name: [] for name in names}
+            count = 0
+    if count:
+        yield chunk, count
+
+
+def _stream_csv(rows, columns, chunk_rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for chunk, count in _chunks(rows, columns, chunk_rows):
+        writer.writerows(zip(*(chunk[name] for name, _ in columns)))
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when the selection was empty
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _stream_columnar(rows, columns, chunk_rows, fmt):
+    schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+    sink = _DrainSink()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+        write = writer.write_table
+        to_block = lambda chunk: pa.Table.from_pydict(chunk, schema=schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+        write = writer.write_batch
+        to_block = lambda chunk: pa.RecordBatch.from_pydict(chunk, schema=schema)
+
+    for chunk, count in _chunks(rows, columns, chunk_rows):
+        write(to_block(chunk))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+########################################################################################################################
+# Export Entry Points
+########################################################################################################################
+
+def stream_export(table, fmt, start_date=None, end_date=None, meeting_ids=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Stream one exported table as bytes
+    Raises ValueError for an unknown table/format, or a columnar format without pyarrow installed
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table '{table}', expected one of {', '.join(EXPORT_TABLES)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    if fmt != 'csv' and pa is None:
+        raise ValueError(f"pyarrow is required for {fmt} export")
+
+    columns, iter_rows = EXPORT_TABLES[table]
+    rows = iter_rows(start_date, end_date, meeting_ids)
+    if fmt == 'csv':
+        return _stream_csv(rows, columns, chunk_rows)
+    return _stream_columnar(rows, columns, chunk_rows, fmt)
+
+
+def export_content_type(fmt):
+    """Return (mimetype, file extension) for an export format"""
+    return EXPORT_FORMATS[fmt]
+
+
+def export_meetings(out_dir, fmt='csv', start_date=None, end_date=None, meeting_ids=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write every export table for the selected meetings into out_dir
+    Returns a dict of table name to written file path
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    _, extension = export_content_type(fmt)
+    written = {}
+    for table in EXPORT_TABLES:
+        path = os.path.join(out_dir, f"{table}.{extension}")
+        with open(path, 'wb') as f:
+            for data in stream_export(table, fmt, start_date, end_date, meeting_ids, chunk_rows):
+                f.write(data)
+        written[table] = path
+    return written
+
+########################################################################################################################
+# Main - Run the export
+########################################################################################################################
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export archived meetings as utterance and participant tables")
+    parser.add_argument('--out', required=True, help="Directory to write the exported tables into")
+    parser.add_argument('--format', default='csv', choices=list(EXPORT_FORMATS))
+    parser.add_argument('--start', help="First meeting date to include (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last meeting date to include (YYYY-MM-DD)")
+    parser.add_argument('--ids', help="Comma separated meeting ids to include")
+    parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    init_db()
+    meeting_ids = [i.strip() for i in args.ids.split(',') if i.strip()] if args.ids else None
+
+    started = time.time()
+    written = export_meetings(args.out, args.format, args.start, args.end, meeting_ids, args.chunk_rows)
+    for table, path in written.items():
+        print(f"Exported {table} to {path} ({os.path.getsize(path)} bytes)")
+    print(f"Export finished in {time.time() - started:.2f}s")
@@ -0,0 +1,173 @@
+"""
+Bulk import of recorded Zoom webhook payloads and transcript logs
+
+Each input is a JSONL file (gzip-compressed ones are detected and decompressed on the fly), read as a
+stream with one event per line: a webhook body ({"event": "meeting.participant_joined", "payload": ...})
+or a /api/transcription body ({"meeting_id": ..., "participant_id": ..., "transcript": ...}). Inputs are
+merged by event time, so webhook and transcript logs of the same meetings can be given side by side
+(each file is expected in time order).
+
+Events are stored through the same ingest functions as the webhook and transcription routes (ingest.py),
+without socket events, live indexes or report generation (reports and term counts of imported meetings
+are built when first requested). Transcriptions are deduplicated only on the ids they were logged with
+(client_id, browser sequence number), so retried POSTs collapse but every distinct utterance is kept
+as logged. Writes are committed in batches of --batch-size, and indexes only the API reads are built
+once at the end.
+
+Usage:
+    python import_logs.py webhooks-2024-01.jsonl.gz transcripts-2024-01.jsonl.gz
+    python import_logs.py --batch-size 20000 logs/*.jsonl.gz
+"""
+import argparse
+import contextlib
+import gzip
+import heapq
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from database import init_db, bulk_load, BULK_BATCH_SIZE
+from ingest import (
+    ingest_participant_joined, ingest_participant_left, ingest_meeting_started, ingest_meeting_ended,
+    ingest_transcription, transcription_is_complete
+)
+
+IMPORT_PROGRESS_EVENTS = 10000     # events between progress lines
+
+# Webhook event type -> ingest function
+WEBHOOK_INGEST = {
+    'meeting.started': ingest_meeting_started,
+    'meeting.ended': ingest_meeting_ended,
+    'meeting.participant_joined': ingest_participant_joined,
+    'meeting.participant_left': ingest_participant_left,
+}
+
+########################################################################################################################
+# Reading Logs
+########################################################################################################################
+
+def _open_log(path):
+    """Open a log as text, decompressing it if it starts with the gzip magic number"""
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == b'\x1f\x8b'
+    if compressed:
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def _event_time(record):
+    """Epoch seconds of an event: a webhook's event_ts (milliseconds) or a transcription's timestamp"""
+    if record.get('event_ts') is not None:
+        try:
+            return float(record['event_ts']) / 1000
+        except (TypeError, ValueError):
+            return None
+    try:
+        parsed = datetime.fromisoformat(str(record.get('timestamp')).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed.astimezone(timezone.utc).timestamp()
+
+def read_log(path, stats):
+    """
+    Yield (event time, line number, record) for each event of a log, in file order
+    Events without a time take the previous one's, so they stay in place when logs are merged
+    """
+    last_time = 0.0
+    with _open_log(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"Skipping invalid JSON at {path}:{line_number}", file=sys.stderr)
+                stats['invalid'] += 1
+                continue
+            if not isinstance(record, dict):
+                stats['invalid'] += 1
+                continue
+            event_time = _event_time(record)
+            if event_time is not None:
+                last_time = event_time
+            yield last_time, line_number, record
+
+########################################################################################################################
+# Importing Events
+########################################################################################################################
+
+def import_event(record):
+    """Store one recorded event; returns 'stored', 'duplicate', 'failed' or 'skipped'"""
+    if 'event' in record:
+        ingest = WEBHOOK_INGEST.get(record.get('event'))
+        if ingest is None:
+            return 'skipped'
+        return 'stored' if ingest(record) is not None else 'skipped'
+
+    if not transcription_is_complete(record):
+        return 'skipped'
+    saved = ingest_transcription(record)
+    if saved is None:
+        return 'failed'
+    return 'duplicate' if saved['duplicate'] else 'stored'
+
+def import_logs(paths, batch_size=BULK_BATCH_SIZE, verbose=False):
+    """
+    Import every event of the given logs, merged by event time
+    Returns a dict of counts (stored, duplicate, failed, skipped, invalid, lost) plus events and seconds
+    """
+    # Create or migrate the schema, as the server does at startup
+    init_db()
+    stats = {'stored': 0, 'duplicate': 0, 'failed': 0, 'skipped': 0, 'invalid': 0, 'lost': 0}
+    events = heapq.merge(*[read_log(path, stats) for path in paths], key=lambda event: event[0])
+    started = time.time()
+    count = 0
+
+    # The ingest functions print a line per write, which would dominate the import time
+    with open(os.devnull, 'w') as devnull, contextlib.ExitStack() as stack:
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        writers = stack.enter_context(bulk_load(batch_size))
+        for _, _, record in events:
+            try:
+                outcome = import_event(record)
+            except Exception as e:
+                print(f"Error importing event: {str(e)}", file=sys.stderr)
+                outcome = 'failed'
+            stats[outcome] += 1
+            count += 1
+            if count % IMPORT_PROGRESS_EVENTS == 0:
+                elapsed = time.time() - started
+                print(f"Imported {count} events ({count / elapsed:.0f} events/s)", file=sys.stderr)
+        for writer in writers:
+            writer.commit()
+        stats['lost'] = sum(writer.lost for writer in writers)
+
+    stats['events'] = count
+    stats['seconds'] = time.time() - started
+    return stats
+
+########################################################################################################################
+# Main - Run the import
+########################################################################################################################
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import recorded webhook and transcript JSONL logs (optionally gzipped)")
+    parser.add_argument('paths', nargs='+', help="JSONL log files, each in time order")
+    parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE, help="Writes committed per transaction")
+    parser.add_argument('--verbose', action='store_true', help="Keep the per-event output of the ingest functions")
+    args = parser.parse_args()
+
+    stats = import_logs(args.paths, args.batch_size, args.verbose)
+    seconds = stats['seconds']
+    print(
+        f"Imported {stats['events']} events in {seconds:.2f}s ({stats['events'] / max(seconds, 1e-9):.0f} events/s): "
+        f"{stats['stored']} stored, {stats['duplicate']} duplicate, {stats['skipped']} skipped, "
+        f"{stats['failed']} failed, {stats['invalid']} invalid lines"
+    )
+    if stats['lost']:
+        print(f"{stats['lost']} writes were lost to batches that failed to commit", file=sys.stderr)
@@ -0,0 +1,163 @@
+"""
+Storage side of webhook events and transcriptions, shared by the routes (app.py) and the bulk importer
+(import_logs.py)
+
+Each ingest function stores one event and returns what it stored, or None if the event is not of its
+type; publishing socket events, the live term and sentiment indexes and report generation are left to
+the caller. Importing this module has no side effects, unlike importing app.py.
+"""
+from datetime import datetime
+
+from database import (
+    normalize_meeting_id, save_engagement_data_db, update_participant_leave_time_db,
+    save_and_archive_meeting_data_db, save_transcription_db
+)
+
+def event_time(value):
+    """A timestamp from an event payload as naive local time (like datetime.now()), or now if missing/invalid"""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.now().isoformat()
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+########################################################################################################################
+# Webhook Events
+########################################################################################################################
+
+def ingest_participant_joined(data):
+    """Store a participant joined webhook event; returns (meeting id, participant info), or None if it is not one"""
+    if data.get('event') != 'meeting.participant_joined':
+        return None
+
+    meeting_id = normalize_meeting_id(data.get('payload', {}).get('object', {}).get('id'))
+    participant = data.get('payload', {}).get('object', {}).get('participant', {})
+    
+    participant_info = {
+        'id': participant.get('id'),
+        'name': participant.get('user_name'),
+        'user_id': participant.get('user_id'),
+        'join_time': event_time(participant.get('join_time')),
+        'leave_time': None,
+        'duration': 0,
+        'talk_time': 0
+    }
+    
+    # Save participant data to database
+    save_engagement_data_db(meeting_id, participant_info).result()
+    return meeting_id, participant_info
+
+def ingest_participant_left(data):
+    """Store a participant left webhook event; returns (meeting id, participant id), or None if it is not one"""
+    if data.get('event') != 'meeting.participant_left':
+        return None
+
+    meeting_id = normalize_meeting_id(data.get('payload', {}).get('object', {}).get('id'))
+    participant = data.get('payload', {}).get('object', {}).get('participant', {})
+    participant_id = participant.get('id')
+    
+    # Update the participant leave time
+    update_participant_leave_time_db(meeting_id, participant_id, event_time(participant.get('leave_time'))).result()
+    return meeting_id, participant_id
+
+def ingest_meeting_started(data):
+    """
+    Read a meeting started webhook event (nothing is stored until participants join)
+    Returns (meeting id, topic), or None if it is not one
+    """
+    if data.get('event') != 'meeting.started':
+        return None
+
+    meeting_id = normalize_meeting_id(data.get('payload', {}).get('object', {}).get('id'))
+    topic = data.get('payload', {}).get('object', {}).get('topic', 'Untitled Meeting')
+    return meeting_id, topic
+
+def ingest_meeting_ended(data):
+    """Archive the meeting of a meeting ended webhook event; returns (meeting id, whether it was archived), or None if it is not one"""
+    if data.get('event') != 'meeting.ended':
+        return None
+
+    meeting_id = normalize_meeting_id(data.get('payload', {}).get('object', {}).get('id'))
+
+    # Archive transcripts to final storage and clear interim data
+    archived = save_and_archive_meeting_data_db(meeting_id).result()
+    return meeting_id, archived
+
+########################################################################################################################
+# Transcriptions
+########################################################################################################################
+
+def transcription_is_complete(data):
+    """Whether a transcription has every required field"""
+    return all([
+        normalize_meeting_id(data.get('meeting_id')),
+        data.get('participant_id'),
+        data.get('participant_name'),
+        data.get('transcript')
+    ])
+
+def ingest_transcription(data):
+    """
+    Score and store a complete transcription (see transcription_is_complete); a retry of one already
+    stored, by client_id or browser sequence number, is not stored again
+    Returns the save_transcription_db result ({id, duplicate, transcript, sentiment_score}), or None if it failed
+    """
+    sequence = data.get('sequence')
+
+    # Process the transcription (sentiment analysis, etc.)
+    sentiment_score = analyze_sentiment(data.get('transcript'))
+    
+    return save_transcription_db(
+        normalize_meeting_id(data.get('meeting_id')),
+        data.get('participant_id'),
+        data.get('participant_name'),
+        data.get('transcript'),
+        sentiment_score,
+        data.get('timestamp'),
+        data.get('browser_id'),
+        # Idempotency key of this utterance, and the sending browser's sequence number for it
+        client_id=data.get('client_id'),
+        sequence=sequence if isinstance(sequence, int) else None
+    ).result()
+
+########################################################################################################################
+# Sentiment Analysis
+########################################################################################################################
+
+def analyze_sentiment(text):
+    """
+    Analyze the sentiment of the given text
+    Returns a score between -1 (negative) and 1 (positive)
+    """
+    try:
+        # Simple dictionary of positive and negative words
+        positive_words = [
+            'good', 'great', 'excellent', 'amazing', 'happy', 'like', 'love', 
+            'best', 'better', 'yes', 'agree', 'thanks', 'thank', 'appreciate'
+        ]
+        
+        negative_words = [
+            'bad', 'terrible', 'awful', 'hate', 'dislike', 'worst', 'worse',
+            'no', 'not', 'disagree', 'difficult', 'problem', 'issue', 'sorry'
+        ]
+        
+        # Convert to lowercase and split into words
+        words = text.lower().split()
+        
+        # Count positive and negative words
+        positive_count = sum(1 for word in words if word in positive_words)
+        negative_count = sum(1 for word in words if word in negative_words)
+        
+        # Calculate sentiment score between -1 and 1
+        total = positive_count + negative_count
+        if total == 0:
+            return 0  # Neutral
+        
+        score = (positive_count - negative_count) / total
+        return score
+        
+    except Exception as e:
+        print(f"Error in sentiment analysis: {str(e)}")
+        return 0  # Return neutral on error
@@ -0,0 +1,197 @@
+"""
+Compact binary encoding of meeting_delta socket events
+
+Clients opt in at connect time (socket auth {"encoding": "binary"}); everyone else keeps receiving
+JSON. Participants are referred to by a small per-meeting integer index instead of their id, and
+field names become bit flags. An index is announced inline the first time it is used; a client that
+joined later asks for the whole table with the delta_index event.
+
+Frame layout (little endian):
+    u8   FRAME_VERSION
+    u32  meeting sync version of this delta (see sync.py)
+    u8   meeting id length, then the UTF-8 meeting id
+    u16  number of newly indexed participants, then for each: u16 index, u8 id length, UTF-8 id
+    u16  number of changed participants, then for each:
+         u16  participant index
+         u8   flags (FLAG_* below)
+         u32  talk time in seconds              if FLAG_TALK_TIME
+         f64  timestamp in epoch milliseconds   if FLAG_TIMESTAMP
+         2 sentiment aggregates                 if FLAG_SENTIMENT (overall, then recent window)
+    u8   meeting flags (MEETING_FLAG_* below)
+         2 sentiment aggregates                 if MEETING_FLAG_SENTIMENT (overall, then recent window)
+
+A sentiment aggregate is u32 positive, u32 neutral, u32 negative counts and the f64 score sum
+(see sentiment.py).
+
+Usage (benchmark against the JSON encoding):
+    python payloads.py --iterations 20000
+"""
+import argparse
+import json
+import struct
+import threading
+import timeit
+from datetime import datetime
+
+FRAME_VERSION = 3
+
+FLAG_TALK_TIME = 0x01
+FLAG_HAS_ACTIVE = 0x02
+FLAG_ACTIVE = 0x04
+FLAG_HAS_ENGAGED = 0x08
+FLAG_ENGAGED = 0x10
+FLAG_TIMESTAMP = 0x20
+FLAG_SENTIMENT = 0x40
+
+MEETING_FLAG_SENTIMENT = 0x01
+
+ENCODING_JSON = 'json'
+ENCODING_BINARY = 'binary'
+
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_SENTIMENT = struct.Struct('<IIIdIIId')
+
+# One precompiled entry layout per combination of optional fields
+_ENTRY_STRUCTS = {}
+
+
+def _entry_struct(flags):
+    layout = _ENTRY_STRUCTS.get(flags & (FLAG_TALK_TIME | FLAG_TIMESTAMP))
+    if layout is None:
+        fmt = '<HB' + ('I' if flags & FLAG_TALK_TIME else '') + ('d' if flags & FLAG_TIMESTAMP else '')
+        layout = _ENTRY_STRUCTS[flags & (FLAG_TALK_TIME | FLAG_TIMESTAMP)] = struct.Struct(fmt)
+    return layout
+
+
+def _short_string(value):
+    data = str(value).encode('utf-8')[:255]
+    return _U8.pack(len(data)) + data
+
+
+def _sentiment(aggregates):
+    """Pack {'overall': totals, 'recent': totals} as two sentiment aggregates"""
+    overall, recent = aggregates['overall'], aggregates['recent']
+    return _SENTIMENT.pack(
+        overall['positive'], overall['neutral'], overall['negative'], overall['score_sum'],
+        recent['positive'], recent['neutral'], recent['negative'], recent['score_sum']
+    )
+
+
+def _epoch_ms(timestamp):
+    """Epoch milliseconds of an ISO timestamp, or None if it cannot be parsed"""
+    try:
+        return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00')).timestamp() * 1000
+    except ValueError:
+        return None
+
+
+class DeltaEncoder:
+    """Encodes meeting_delta payloads as binary frames, keeping the per-meeting participant index"""
+
+    def __init__(self):
+        # meeting id -> (participant id -> index, participant ids in index order)
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def participant_ids(self, meeting_id):
+        """Participant ids of a meeting in index order, for clients that missed earlier announcements"""
+        with self._lock:
+            _, ids = self._indexes.get(meeting_id, ({}, []))
+            return list(ids)
+
+    def forget(self, meeting_id):
+        """Drop a meeting's index once it has ended"""
+        with self._lock:
+            self._indexes.pop(meeting_id, None)
+
+    def encode(self, meeting_id, participants, version=0, meeting_fields=None):
+        """Encode one meeting_delta payload (meeting id, changed participants, sync version, meeting fields) as bytes"""
+        with self._lock:
+            positions, ids = self._indexes.setdefault(meeting_id, ({}, []))
+            announced = []
+            indexes = []
+            for changes in participants:
+                participant_id = changes['participant_id']
+                index = positions.get(participant_id)
+                if index is None:
+                    index = positions[participant_id] = len(ids)
+                    ids.append(participant_id)
+                    announced.append((index, participant_id))
+                indexes.append(index)
+
+        parts = [_U8.pack(FRAME_VERSION), _U32.pack(version), _short_string(meeting_id), _U16.pack(len(announced))]
+        for index, participant_id in announced:
+            parts.append(_U16.pack(index))
+            parts.append(_short_string(participant_id))
+
+        parts.append(_U16.pack(len(participants)))
+        for index, changes in zip(indexes, participants):
+            flags = 0
+            values = [index, 0]
+            if changes.get('talk_time') is not None:
+                flags |= FLAG_TALK_TIME
+                values.append(max(0, int(changes['talk_time'])))
+            if 'is_active' in changes:
+                flags |= FLAG_HAS_ACTIVE | (FLAG_ACTIVE if changes['is_active'] else 0)
+            if 'is_engaged' in changes:
+                flags |= FLAG_HAS_ENGAGED | (FLAG_ENGAGED if changes['is_engaged'] else 0)
+            epoch_ms = _epoch_ms(changes['timestamp']) if changes.get('timestamp') else None
+            if epoch_ms is not None:
+                flags |= FLAG_TIMESTAMP
+                values.append(epoch_ms)
+            if changes.get('sentiment') is not None:
+                flags |= FLAG_SENTIMENT
+            values[1] = flags
+            parts.append(_entry_struct(flags).pack(*values))
+            if flags & FLAG_SENTIMENT:
+                parts.append(_sentiment(changes['sentiment']))
+
+        sentiment = (meeting_fields or {}).get('sentiment')
+        parts.append(_U8.pack(MEETING_FLAG_SENTIMENT if sentiment is not None else 0))
+        if sentiment is not None:
+            parts.append(_sentiment(sentiment))
+
+        return b''.join(parts)
+
+########################################################################################################################
+# Main - Run the benchmark
+########################################################################################################################
+
+def _sample_delta(participant_count):
+    """A realistic meeting_delta payload: Zoom-style ids, every field changed"""
+    return '81234567890', [{
+        'participant_id': str(16778240 + i),
+        'talk_time': 120 + i,
+        'is_active': True,
+        'is_engaged': i % 2 == 0,
+        'timestamp': '2024-05-01T10:00:00.000Z',
+        'sentiment': {
+            'overall': {'positive': 12, 'neutral': 30, 'negative': 4, 'score_sum': 6.5},
+            'recent': {'positive': 2, 'neutral': 5, 'negative': 1, 'score_sum': 1.25}
+        }
+    } for i in range(participant_count)]
+
+
+def benchmark(iterations):
+    print(f"{'participants':>12} {'json bytes':>11} {'binary bytes':>13} {'json us/emit':>13} {'binary us/emit':>15}")
+    for participant_count in (1, 5, 20):
+        meeting_id, participants = _sample_delta(participant_count)
+        payload = {'meeting_id': meeting_id, 'participants': participants}
+        encoder = DeltaEncoder()
+        encoder.encode(meeting_id, participants)   # steady state: indexes already announced
+
+        # Socket.IO serializes an event as a JSON array of [event name, payload]
+        encode_json = lambda: json.dumps(['meeting_delta', payload])
+        encode_binary = lambda: encoder.encode(meeting_id, participants)
+        json_us = timeit.timeit(encode_json, number=iterations) / iterations * 1e6
+        binary_us = timeit.timeit(encode_binary, number=iterations) / iterations * 1e6
+        print(f"{participant_count:>12} {len(encode_json()):>11} {len(encode_binary()):>13} {json_us:>13.2f} {binary_us:>15.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare JSON and binary meeting_delta payload size and encode time")
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    benchmark(args.iterations)
@@ -0,0 +1,158 @@
+"""
+Opt-in per-request profiling
+
+A request is profiled when it carries PROFILE_HEADER with the value of PROFILE_TOKEN, or when it is
+picked at random at PROFILE_SAMPLE_RATE. It then runs under cProfile with every SQL statement traced
+(see database.QueryTrace), and two files are written to PROFILE_DIR: a JSON summary (route, meeting
+id, duration, SQL timings, top functions) and the raw .prof stats for snakeviz/pstats.
+With no token and a zero sample rate, deciding not to profile is a single attribute check.
+
+cProfile hooks the OS thread, and under gevent every request runs on the same one, so only one request
+is profiled at a time (one picked while another is being profiled simply is not). Other requests'
+greenlets that run while the profiled one waits on I/O are still counted in its function stats; the
+SQL timings are per request.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from datetime import datetime
+
+PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile-Token')
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')                              # header value that turns profiling on
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))        # fraction of requests profiled anyway
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 200))                      # newest profiles kept on disk
+PROFILE_TOP_FUNCTIONS = 25
+PROFILE_TOP_STATEMENTS = 25
+
+
+def _profile_name(started_at, method, route):
+    """File name stem for a profile, sortable by time: 20240501T100000000000_GET_api_meetings_meeting_id"""
+    slug = ''.join(c if c.isalnum() else '_' for c in route.strip('/')).strip('_') or 'root'
+    return f"{started_at.strftime('%Y%m%dT%H%M%S%f')}_{method}_{slug}"
+
+
+class RequestProfile:
+    """Profiler and start time of one request"""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.running = False
+
+
+class RequestProfiler:
+    """Decides which requests to profile and writes/lists the resulting profiles"""
+
+    def __init__(self, directory=PROFILE_DIR, header=PROFILE_HEADER, token=PROFILE_TOKEN,
+                 sample_rate=PROFILE_SAMPLE_RATE, keep=PROFILE_KEEP):
+        self.directory = directory
+        self.header = header
+        self.token = token
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._active = threading.Lock()       # held while a request is being profiled
+
+    @property
+    def enabled(self):
+        return bool(self.token) or self.sample_rate > 0
+
+    def authorized(self, headers):
+        """Whether a request carries the profiling token"""
+        return bool(self.token) and headers.get(self.header) == self.token
+
+    def should_profile(self, headers):
+        return self.authorized(headers) or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self):
+        """Start profiling the current request, or return None while another request is being profiled"""
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = RequestProfile()
+        profile.profiler.enable()
+        profile.running = True
+        return profile
+
+    def stop(self, profile):
+        """Stop a request's profiler if it is still running, letting the next request be profiled"""
+        if profile.running:
+            profile.profiler.disable()
+            profile.running = False
+            self._active.release()
+
+    def finish(self, profile, trace, route, method, path, meeting_id, status):
+        """Stop profiling and write the request's summary and stats (SQL from its QueryTrace); returns the summary"""
+        self.stop(profile)
+        duration_ms = (time.perf_counter() - profile.start) * 1000
+
+        stats_text = io.StringIO()
+        stats = pstats.Stats(profile.profiler, stream=stats_text)
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+
+        name = _profile_name(profile.started_at, method, route or path)
+        summary = {
+            'name': name,
+            'route': route,
+            'method': method,
+            'path': path,
+            'meeting_id': meeting_id,
+            'status': status,
+            'started_at': profile.started_at.isoformat(),
+            'duration_ms': round(duration_ms, 3),
+            'sql': {
+                'count': trace.count,
+                'total_ms': round(trace.total_seconds * 1000, 3),
+                'statements': [
+                    {'sql': entry['sql'], 'count': entry['count'], 'rows': entry['rows'], 'total_ms': round(entry['seconds'] * 1000, 3)}
+                    for entry in trace.by_statement()[:PROFILE_TOP_STATEMENTS]
+                ],
+                'repeated': trace.repeated()
+            },
+            'functions': stats_text.getvalue()
+        }
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            stats.dump_stats(os.path.join(self.directory, f"{name}.prof"))
+            with open(os.path.join(self.directory, f"{name}.json"), 'w') as f:
+                json.dump(summary, f, indent=2)
+            self._prune()
+        return summary
+
+    def slowest(self, limit=20):
+        """Summaries of the slowest profiles still on disk, slowest first (without function listings)"""
+        summaries = []
+        for file_name in self._profile_files():
+            try:
+                with open(os.path.join(self.directory, file_name)) as f:
+                    summary = json.load(f)
+            except (OSError, ValueError):
+                continue
+            summary.pop('functions', None)
+            summaries.append(summary)
+        summaries.sort(key=lambda summary: summary.get('duration_ms', 0), reverse=True)
+        return summaries[:limit]
+
+    def _profile_files(self):
+        try:
+            return sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+        except FileNotFoundError:
+            return []
+
+    def _prune(self):
+        """Delete the oldest profiles beyond the configured number to keep"""
+        files = self._profile_files()
+        for file_name in files[:max(0, len(files) - self.keep)]:
+            base = os.path.join(self.directory, file_name[:-len('.json')])
+            for path in (f"{base}.json", f"{base}.prof"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
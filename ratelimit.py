@@ -0,0 +1,119 @@
+"""
+Per-client rate limiting and write backpressure for the ingest endpoints
+
+Each client key (browser, participant, meeting) gets an in-memory token bucket. Independently,
+when the database writer falls behind, telemetry is shed by priority: low-priority updates
+(interim talk-time) go first, normal updates only once the pressure is much higher, and
+high-priority data (transcriptions) is never shed. Shed and rate-limited requests both get a 429
+with Retry-After.
+"""
+import os
+import math
+import threading
+import time
+from collections import OrderedDict
+
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+
+# (tokens per second, burst capacity) per key scope
+RATE_LIMITS = {
+    'browser': (float(os.getenv('RATE_LIMIT_BROWSER_PER_SEC', 10)), float(os.getenv('RATE_LIMIT_BROWSER_BURST', 20))),
+    'participant': (float(os.getenv('RATE_LIMIT_PARTICIPANT_PER_SEC', 10)), float(os.getenv('RATE_LIMIT_PARTICIPANT_BURST', 20))),
+    'meeting': (float(os.getenv('RATE_LIMIT_MEETING_PER_SEC', 200)), float(os.getenv('RATE_LIMIT_MEETING_BURST', 400))),
+}
+MAX_BUCKETS = int(os.getenv('RATE_LIMIT_MAX_BUCKETS', 10000))
+
+# Shedding starts for low priority at these thresholds, and for normal priority at SHED_NORMAL_FACTOR times them
+BACKPRESSURE_QUEUE_DEPTH = int(os.getenv('BACKPRESSURE_QUEUE_DEPTH', 64))        # one full write batch
+BACKPRESSURE_WAIT_SECONDS = float(os.getenv('BACKPRESSURE_WAIT_SECONDS', 0.5))
+SHED_NORMAL_FACTOR = 4
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now, cost=1):
+        """Seconds until `cost` tokens are available (0 if they are now)"""
+        self._refill(now)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def take(self, cost=1):
+        self.tokens -= cost
+
+
+class RateLimiter:
+    """Token buckets keyed by (scope, key), kept in a bounded LRU so idle clients are forgotten"""
+
+    def __init__(self, limits=RATE_LIMITS, max_buckets=MAX_BUCKETS):
+        self.limits = limits
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, scope, key):
+        bucket_key = (scope, key)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            rate, capacity = self.limits[scope]
+            bucket = self._buckets[bucket_key] = TokenBucket(rate, capacity)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(bucket_key)
+        return bucket
+
+    def check(self, keys):
+        """
+        Charge one request against every (scope, key) given; keys with a None value are skipped
+        Returns 0 when allowed, otherwise the seconds to wait before retrying (nothing is charged)
+        """
+        with self._lock:
+            now = time.monotonic()
+            buckets = [self._bucket(scope, key) for scope, key in keys if key]
+            retry_after = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+            if retry_after > 0:
+                return retry_after
+            for bucket in buckets:
+                bucket.take()
+            return 0.0
+
+
+class Backpressure:
+    """Decides whether to shed a request given the writer's queue depth and wait time"""
+
+    def __init__(self, pressure_fn, queue_depth=BACKPRESSURE_QUEUE_DEPTH, wait_seconds=BACKPRESSURE_WAIT_SECONDS):
+        self.pressure_fn = pressure_fn
+        self.queue_depth = queue_depth
+        self.wait_seconds = wait_seconds
+
+    def should_shed(self, priority):
+        """
+        Returns 0 when a request of this priority may proceed, otherwise the seconds to wait before
+        retrying (how long writes are currently waiting)
+        """
+        if priority >= PRIORITY_HIGH:
+            return 0.0
+        factor = 1 if priority == PRIORITY_LOW else SHED_NORMAL_FACTOR
+        depth, wait = self.pressure_fn()
+        if depth > self.queue_depth * factor or wait > self.wait_seconds * factor:
+            return max(wait, 1.0)
+        return 0.0
+
+
+def retry_after_header(seconds):
+    """Retry-After takes whole seconds; always ask for at least one"""
+    return str(max(1, math.ceil(seconds)))
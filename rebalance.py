@@ -0,0 +1,82 @@
+"""
+Offline rebalancing of meetings across database shards
+
+Each meeting lives in the shard its id hashes to for the configured DATABASE_SHARDS, so changing the
+shard count means moving meetings. With the server stopped, this creates any new shard files, moves
+every meeting to its shard under the new count, records the new layout and removes the shard files
+(with their live tiers) that are no longer used. An interrupted run can simply be started again.
+
+Usage:
+    python rebalance.py --shards 4
+    DATABASE_SHARDS=4 python app.py
+"""
+import argparse
+import os
+import time
+
+from database import (
+    init_shard_db, shard_path, shard_files, meeting_shard, get_shard_layout_db, set_shard_layout_db,
+    list_shard_meetings_db, move_meeting_db, checkpoint_live_tier
+)
+
+def current_shard_count():
+    """The shard count the files on disk are laid out for (files past the recorded count are included)"""
+    shards = get_shard_layout_db(0) or 1
+    while os.path.exists(shard_path(shards)):
+        shards += 1
+    return shards
+
+def rebalance(shards):
+    """
+    Move every meeting to its shard for the given shard count
+    Returns a dict with the previous shard count and the number of meetings and rows moved
+    """
+    previous = current_shard_count()
+    # Bring the existing files' schemas up to date and create the new shards; files that hold meetings keep
+    # their recorded layout until the move is done, so an interrupted run is detected by init_db
+    for shard in range(max(previous, shards)):
+        init_shard_db(shard, shards)
+
+    meetings = 0
+    rows = 0
+    for source in range(previous):
+        for meeting_id in list_shard_meetings_db(source):
+            target = meeting_shard(meeting_id, shards)
+            if target != source:
+                rows += move_meeting_db(meeting_id, source, target)
+                meetings += 1
+        print(f"Rebalanced shard {source} ({meetings} meetings moved so far)")
+
+    for shard in range(shards):
+        set_shard_layout_db(shard, shards)
+        # Backups taken before the move would bring moved meetings back if tmpfs were emptied
+        checkpoint_live_tier(shard)
+    for shard in range(shards, previous):
+        if list_shard_meetings_db(shard):
+            print(f"Shard {shard} still holds meetings, keeping {shard_path(shard)}")
+            continue
+        for path in shard_files(shard):
+            if os.path.exists(path):
+                os.remove(path)
+        print(f"Removed unused shard {shard_path(shard)}")
+
+    return {'previous': previous, 'meetings': meetings, 'rows': rows}
+
+########################################################################################################################
+# Main - Run the rebalance
+########################################################################################################################
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Move meetings between database shards for a new shard count (server stopped)")
+    parser.add_argument('--shards', type=int, required=True, help="New number of shards (DATABASE_SHARDS)")
+    args = parser.parse_args()
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+
+    started = time.time()
+    result = rebalance(args.shards)
+    print(
+        f"Rebalanced from {result['previous']} to {args.shards} shards in {time.time() - started:.2f}s: "
+        f"{result['meetings']} meetings ({result['rows']} rows) moved"
+    )
+    print(f"Start the server with DATABASE_SHARDS={args.shards}")
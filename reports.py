@@ -0,0 +1,252 @@
+"""
+Post-meeting reports, generated in a process pool once a meeting is archived
+
+A report is a small precomputed summary of the archive (speaker talk-time shares, turn counts,
+longest monologues, a sentiment timeline in REPORT_BUCKET_MINUTES buckets and top keywords),
+stored as one row per meeting so the transcript pages never rederive statistics from the raw
+utterances. Workers read the archive themselves and hand back only the finished report, which
+the parent process stores through the database writer.
+"""
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from database import get_report_source_db, save_meeting_report_db, SENTIMENT_POSITIVE_THRESHOLD, SENTIMENT_NEGATIVE_THRESHOLD
+from terms import tokenize
+
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', 2))
+REPORT_BUCKET_MINUTES = int(os.getenv('REPORT_BUCKET_MINUTES', 5))
+REPORT_TOP_MONOLOGUES = 5
+REPORT_TOP_KEYWORDS = 15
+REPORT_EXCERPT_CHARS = 120
+
+########################################################################################################################
+# Report Building
+########################################################################################################################
+
+def _parse_time(timestamp):
+    """Naive UTC datetime of an ISO timestamp, or None if it cannot be parsed"""
+    try:
+        parsed = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _sentiment_bucket(score):
+    score = score or 0
+    if score > SENTIMENT_POSITIVE_THRESHOLD:
+        return 'positive'
+    if score < SENTIMENT_NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+def _turns(transcript_data):
+    """Group consecutive utterances by the same speaker into turns"""
+    turns = []
+    for index, utterance in enumerate(transcript_data):
+        if turns and turns[-1]['participant_id'] == utterance['participant_id']:
+            turn = turns[-1]
+        else:
+            turn = {
+                'participant_id': utterance['participant_id'],
+                'participant_name': utterance.get('participant_name'),
+                'first_utterance': index,
+                'start': utterance.get('timestamp'),
+                'utterances': 0,
+                'words': 0,
+                'text': []
+            }
+            turns.append(turn)
+        turn['utterances'] += 1
+        turn['words'] += len((utterance.get('transcript') or '').split())
+        turn['text'].append(utterance.get('transcript') or '')
+    # A turn lasts until the next speaker starts
+    for turn, next_turn in zip(turns, turns[1:] + [None]):
+        turn['end'] = next_turn['start'] if next_turn else transcript_data[-1].get('timestamp')
+    return turns
+
+def build_report(meeting_id, start_time, transcript_data, participant_data):
+    """Compute a meeting's report from its archived utterances and participants"""
+    speakers = {}
+    for p in participant_data:
+        speakers[p['id']] = {
+            'participant_id': p['id'],
+            'participant_name': p.get('name'),
+            'talk_time': p.get('talk_time') or 0,
+            'utterances': 0,
+            'turns': 0,
+            'words': 0,
+            'sentiment_sum': 0.0
+        }
+    for utterance in transcript_data:
+        speaker = speakers.setdefault(utterance['participant_id'], {
+            'participant_id': utterance['participant_id'],
+            'participant_name': utterance.get('participant_name'),
+            'talk_time': 0,
+            'utterances': 0,
+            'turns': 0,
+            'words': 0,
+            'sentiment_sum': 0.0
+        })
+        speaker['utterances'] += 1
+        speaker['words'] += len((utterance.get('transcript') or '').split())
+        speaker['sentiment_sum'] += utterance.get('sentiment_score') or 0
+
+    turns = _turns(transcript_data) if transcript_data else []
+    for turn in turns:
+        speakers[turn['participant_id']]['turns'] += 1
+
+    # Talk-time shares, falling back to word shares when no talk time was tracked
+    total_talk_time = sum(s['talk_time'] for s in speakers.values())
+    total_words = sum(s['words'] for s in speakers.values())
+    speaker_list = []
+    for s in sorted(speakers.values(), key=lambda s: (s['talk_time'], s['words']), reverse=True):
+        speaker_list.append({
+            'participant_id': s['participant_id'],
+            'participant_name': s['participant_name'],
+            'talk_time': s['talk_time'],
+            'talk_share': round(s['talk_time'] / total_talk_time, 4) if total_talk_time else 0,
+            'word_share': round(s['words'] / total_words, 4) if total_words else 0,
+            'utterances': s['utterances'],
+            'turns': s['turns'],
+            'words': s['words'],
+            'average_sentiment': round(s['sentiment_sum'] / s['utterances'], 4) if s['utterances'] else None
+        })
+
+    monologues = []
+    for turn in sorted(turns, key=lambda t: t['words'], reverse=True)[:REPORT_TOP_MONOLOGUES]:
+        start, end = _parse_time(turn['start']), _parse_time(turn['end'])
+        excerpt = ' '.join(turn['text'])
+        monologues.append({
+            'participant_id': turn['participant_id'],
+            'participant_name': turn['participant_name'],
+            'first_utterance': turn['first_utterance'],
+            'start': turn['start'],
+            'end': turn['end'],
+            'duration_seconds': round((end - start).total_seconds()) if start and end else None,
+            'utterances': turn['utterances'],
+            'words': turn['words'],
+            'excerpt': excerpt[:REPORT_EXCERPT_CHARS]
+        })
+
+    # Sentiment timeline in fixed buckets from the first utterance (or the meeting start)
+    times = [_parse_time(u.get('timestamp')) for u in transcript_data]
+    origin = min((t for t in times if t), default=None) or _parse_time(start_time)
+    bucket_seconds = REPORT_BUCKET_MINUTES * 60
+    buckets = {}
+    for utterance, at in zip(transcript_data, times):
+        if at is None or origin is None:
+            continue
+        index = int((at - origin).total_seconds() // bucket_seconds)
+        bucket = buckets.setdefault(index, {'utterances': 0, 'sentiment_sum': 0.0, 'positive': 0, 'neutral': 0, 'negative': 0})
+        bucket['utterances'] += 1
+        bucket['sentiment_sum'] += utterance.get('sentiment_score') or 0
+        bucket[_sentiment_bucket(utterance.get('sentiment_score'))] += 1
+    timeline = [{
+        'bucket_start': (origin + timedelta(seconds=index * bucket_seconds)).isoformat(),
+        'utterances': bucket['utterances'],
+        'average_sentiment': round(bucket['sentiment_sum'] / bucket['utterances'], 4),
+        'positive': bucket['positive'],
+        'neutral': bucket['neutral'],
+        'negative': bucket['negative']
+    } for index, bucket in sorted(buckets.items())]
+
+    keywords = Counter(word for utterance in transcript_data for word in tokenize(utterance.get('transcript')))
+
+    return {
+        'meeting_id': meeting_id,
+        'start_time': start_time,
+        'utterance_count': len(transcript_data),
+        'turn_count': len(turns),
+        'total_talk_time': total_talk_time,
+        'speakers': speaker_list,
+        'longest_monologues': monologues,
+        'bucket_minutes': REPORT_BUCKET_MINUTES,
+        'sentiment_timeline': timeline,
+        'top_keywords': [{'word': word, 'count': count} for word, count in keywords.most_common(REPORT_TOP_KEYWORDS)]
+    }
+
+########################################################################################################################
+# Worker Pool
+########################################################################################################################
+
+def generate_report(meeting_id):
+    """Worker entry point: build a meeting's report from its archive, or None if it has none"""
+    source = get_report_source_db(meeting_id)
+    if source is None:
+        return None
+    return build_report(**source)
+
+
+class ReportGenerator:
+    """
+    Runs report generation in a process pool and stores the results, one job per meeting at a time
+    A meeting whose report failed is not queued again until it is archived again (see submit)
+    """
+
+    def __init__(self, workers=REPORT_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self._pending = set()
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def submit(self, meeting_id, retry=False):
+        """
+        Queue a report for an archived meeting; returns False if one is already being generated,
+        or if the last attempt failed and retry is not set
+        """
+        with self._lock:
+            if meeting_id in self._pending:
+                return False
+            if meeting_id in self._failed and not retry:
+                return False
+            self._failed.pop(meeting_id, None)
+            if self._pool is None:
+                # Workers are spawned rather than forked: by now the writer and checkpoint threads
+                # are running, and a forked child could inherit one of their locks held forever
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            self._pending.add(meeting_id)
+            try:
+                future = self._pool.submit(generate_report, meeting_id)
+            except Exception as e:
+                # A broken pool is replaced on the next submission
+                print(f"Error queueing report for meeting {meeting_id}: {str(e)}")
+                self._pending.discard(meeting_id)
+                self._pool = None
+                return False
+        future.add_done_callback(lambda f: self._store(meeting_id, f))
+        return True
+
+    def pending(self, meeting_id):
+        with self._lock:
+            return meeting_id in self._pending
+
+    def failure(self, meeting_id):
+        """Why the meeting's last report attempt failed, or None"""
+        with self._lock:
+            return self._failed.get(meeting_id)
+
+    def _store(self, meeting_id, future):
+        error = None
+        try:
+            report = future.result()
+            if report is None:
+                error = "no archive to build it from"
+            elif not save_meeting_report_db(meeting_id, report).result():
+                error = "the report could not be saved"
+            else:
+                print(f"Report generated for meeting {meeting_id}")
+        except Exception as e:
+            error = str(e)
+        if error is not None:
+            print(f"Error generating report for meeting {meeting_id}: {error}")
+        with self._lock:
+            if error is not None:
+                self._failed[meeting_id] = error
+            self._pending.discard(meeting_id)
@@ -0,0 +1,54 @@
+"""
+JSON response layer shared by every API route
+
+Bodies are encoded with orjson when it is installed (stdlib json otherwise), and compressed
+with gzip when the client accepts it and the body is large enough to be worth it.
+"""
+import gzip
+import json
+import os
+from flask import request, Response
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+GZIP_MIN_BYTES = int(os.getenv('GZIP_MIN_BYTES', 1024))
+GZIP_LEVEL = 6
+
+def dumps(data):
+    """Encode data as compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+def requested_fields():
+    """
+    Parse the ?fields= projection of the current request
+    Returns a list of field names, or None when no projection was requested
+    """
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(',') if f.strip()]
+
+def project(data, fields):
+    """Apply a field projection to a dict or a list of dicts already in memory"""
+    if not fields or data is None:
+        return data
+    if isinstance(data, list):
+        return [{k: row[k] for k in fields if k in row} for row in data]
+    return {k: data[k] for k in fields if k in data}
+
+def json_response(payload, status=200):
+    """Build a JSON response, gzip-compressed when accepted and above GZIP_MIN_BYTES"""
+    body = dumps(payload)
+    response = Response(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+
+    if len(body) >= GZIP_MIN_BYTES and request.accept_encodings['gzip']:
+        response.set_data(gzip.compress(body, GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+
+    return response
@@ -0,0 +1,209 @@
+"""
+Rolling sentiment aggregates per meeting and participant, maintained as scores are assigned
+
+Every scored transcription updates running totals (positive/neutral/negative counts and the score
+sum) for its meeting and its speaker, and the same totals over the last SENTIMENT_WINDOW_SECONDS of
+utterance time, kept as one ring of SENTIMENT_BUCKET_SECONDS buckets per meeting that are subtracted
+as the window moves on. Each update is O(1) however many participants there are, and a speaker's
+recent totals are summed from the (fixed number of) buckets when read, so dashboards get the
+aggregates from the meeting API and meeting_delta events instead of recounting every transcription.
+The window moves only with utterance timestamps. A meeting in progress is read with the window
+ending at the current time, without moving it, so "recent" is the same span for every speaker and
+late utterances from a client clock behind the server still count.
+"""
+import os
+import threading
+from datetime import datetime, timezone
+
+from database import SENTIMENT_POSITIVE_THRESHOLD, SENTIMENT_NEGATIVE_THRESHOLD
+
+SENTIMENT_WINDOW_SECONDS = int(os.getenv('SENTIMENT_WINDOW_SECONDS', 300))
+SENTIMENT_BUCKET_SECONDS = int(os.getenv('SENTIMENT_BUCKET_SECONDS', 30))
+
+def _bucket(timestamp=None):
+    """Bucket number of an ISO timestamp (naive times are taken as UTC), or of now without a parseable one"""
+    try:
+        parsed = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    except ValueError:
+        parsed = datetime.now(timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() // SENTIMENT_BUCKET_SECONDS)
+
+
+class SentimentTotals:
+    """Counts per sentiment class and the sum of scores"""
+
+    __slots__ = ('positive', 'neutral', 'negative', 'score_sum')
+
+    def __init__(self):
+        self.positive = 0
+        self.neutral = 0
+        self.negative = 0
+        self.score_sum = 0.0
+
+    def add(self, score, sign=1):
+        score = score or 0
+        if score > SENTIMENT_POSITIVE_THRESHOLD:
+            self.positive += sign
+        elif score < SENTIMENT_NEGATIVE_THRESHOLD:
+            self.negative += sign
+        else:
+            self.neutral += sign
+        self.score_sum += sign * score
+
+    def merge(self, other, sign=1):
+        self.positive += sign * other.positive
+        self.neutral += sign * other.neutral
+        self.negative += sign * other.negative
+        self.score_sum += sign * other.score_sum
+
+    def as_dict(self):
+        return {
+            'positive': self.positive,
+            'neutral': self.neutral,
+            'negative': self.negative,
+            'score_sum': round(self.score_sum, 4)
+        }
+
+
+class MeetingSentiment:
+    """
+    Rolling sentiment of one meeting and of each of its participants
+    The window is one ring of buckets for the whole meeting, each holding the meeting's totals and
+    those of whoever spoke in it; a participant's recent totals are summed from it when read
+    """
+
+    window_buckets = max(1, SENTIMENT_WINDOW_SECONDS // SENTIMENT_BUCKET_SECONDS)
+
+    def __init__(self):
+        self.overall = SentimentTotals()
+        self.recent = SentimentTotals()
+        self.participants = {}
+        # bucket -> (meeting totals, participant id -> totals), for the buckets in the window
+        self.buckets = {}
+        self.latest = None
+        self._ids = set()
+
+    def add(self, transcription_id, participant_id, score, timestamp):
+        """Count a scored utterance; returns False if this transcription was counted already"""
+        if transcription_id is not None:
+            if transcription_id in self._ids:
+                return False
+            self._ids.add(transcription_id)
+        self.overall.add(score)
+        participant = self.participants.get(participant_id)
+        if participant is None:
+            participant = self.participants[participant_id] = SentimentTotals()
+        participant.add(score)
+
+        bucket = _bucket(timestamp)
+        if self.latest is None or bucket > self.latest:
+            self._advance(bucket)
+        if bucket > self.latest - self.window_buckets:
+            entry = self.buckets.get(bucket)
+            if entry is None:
+                entry = self.buckets[bucket] = (SentimentTotals(), {})
+            totals, speakers = entry
+            totals.add(score)
+            speaker = speakers.get(participant_id)
+            if speaker is None:
+                speaker = speakers[participant_id] = SentimentTotals()
+            speaker.add(score)
+            self.recent.add(score)
+        return True
+
+    def _advance(self, latest):
+        """Move the window forward to end at bucket latest (the latest utterance), dropping the buckets it leaves behind"""
+        self.latest = latest
+        for bucket in [b for b in self.buckets if b <= latest - self.window_buckets]:
+            self.recent.merge(self.buckets.pop(bucket)[0], -1)
+
+    def _end(self, now):
+        """Last bucket of the window as read: the latest utterance's, or now if that is later"""
+        if now is None or (self.latest is not None and self.latest >= now):
+            return self.latest
+        return now
+
+    def meeting_totals(self, now=None):
+        """{'overall', 'recent'} of the whole meeting, with the window ending at bucket now when that is later"""
+        end = self._end(now)
+        recent = self.recent
+        expired = [b for b in self.buckets if end is not None and b <= end - self.window_buckets]
+        if expired:
+            recent = SentimentTotals()
+            recent.merge(self.recent)
+            for bucket in expired:
+                recent.merge(self.buckets[bucket][0], -1)
+        return {'overall': self.overall.as_dict(), 'recent': recent.as_dict()}
+
+    def participant_totals(self, participant_id, now=None):
+        """{'overall', 'recent'} of one participant, summed from the buckets in the window"""
+        end = self._end(now)
+        recent = SentimentTotals()
+        for bucket, (_, speakers) in self.buckets.items():
+            if bucket > end - self.window_buckets and participant_id in speakers:
+                recent.merge(speakers[participant_id])
+        overall = self.participants.get(participant_id) or SentimentTotals()
+        return {'overall': overall.as_dict(), 'recent': recent.as_dict()}
+
+    def as_dict(self, now=None):
+        """Aggregates, with every window ending at bucket now when that is later than the latest utterance"""
+        return dict(
+            self.meeting_totals(now),
+            window_seconds=SENTIMENT_WINDOW_SECONDS,
+            participants={participant_id: self.participant_totals(participant_id, now) for participant_id in self.participants}
+        )
+
+
+def build_meeting_sentiment(transcriptions):
+    """Aggregate stored transcriptions (dicts with id, participant_id, sentiment_score and timestamp)"""
+    index = MeetingSentiment()
+    for t in transcriptions or []:
+        index.add(t['id'], t['participant_id'], t['sentiment_score'], t['timestamp'])
+    return index
+
+
+class SentimentIndex:
+    """
+    Rolling sentiment of the meetings in progress
+    loader(meeting_id) returns a meeting's stored transcriptions, used to rebuild aggregates that are
+    not in memory; only meetings still receiving transcriptions are kept
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._meetings = {}
+        self._lock = threading.Lock()
+
+    def add(self, meeting_id, transcription_id, participant_id, score, timestamp):
+        """
+        Count a stored, scored transcription (one a rebuild already loaded is not counted twice)
+        Returns (meeting aggregates, the participant's aggregates) after the update
+        """
+        with self._lock:
+            index = self._meetings.get(meeting_id)
+        if index is None:
+            index = build_meeting_sentiment(self.loader(meeting_id))
+            with self._lock:
+                # Another request may have rebuilt it meanwhile
+                index = self._meetings.setdefault(meeting_id, index)
+        with self._lock:
+            index.add(transcription_id, participant_id, score, timestamp)
+            return index.meeting_totals(), index.participant_totals(participant_id)
+
+    def summary(self, meeting_id):
+        """
+        A meeting's aggregates, overall and per participant, with the window ending now
+        (rebuilt, not kept, for meetings not in memory)
+        """
+        with self._lock:
+            index = self._meetings.get(meeting_id)
+            if index is not None:
+                return index.as_dict(now=_bucket())
+        return build_meeting_sentiment(self.loader(meeting_id)).as_dict(now=_bucket())
+
+    def forget(self, meeting_id):
+        """Drop an ended meeting's aggregates"""
+        with self._lock:
+            self._meetings.pop(meeting_id, None)
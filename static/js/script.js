@@ -1,8 +1,15 @@
-// Connect to WebSocket server
-const socket = io();
+// Connect to WebSocket server, asking for meeting_delta events as compact binary frames
+const socket = io({ auth: { encoding: 'binary' } });
 let currentMeetingId = '';
 let meetingParticipants = [];
 
+// Participant ids by binary delta index, per meeting (see payloads.py for the frame layout)
+const deltaParticipantIds = {};
+
+// Server epoch and last applied version of the current meeting (see sync.py)
+let syncEpoch = null;
+let syncVersion = 0;
+
 // Initialize engagement metrics tracking
 const metricsData = {
     sentiment: {
@@ -88,53 +95,103 @@ $(document).ready(function() {
         }
     });
     
-    // Listen for new transcriptions
-    socket.on('new_transcription', function(data) {
-        // Only process if this is for the current meeting
-        if (currentMeetingId === '' || data.meeting_id === currentMeetingId) {
-            addTranscription(data);
-            updateSentimentMetrics(data.sentiment_score);
-            calculateOverallMetrics();
+    // Handlers for events about a meeting; each carries the meeting's sync version
+    const meetingEventHandlers = {
+        new_transcription: function(data) {
+            // Only process if this is for the current meeting
+            if (currentMeetingId === '' || data.meeting_id === currentMeetingId) {
+                addTranscription(data);
+                calculateOverallMetrics();
+            }
+        },
+        participant_joined: function(data) {
+            if (currentMeetingId === data.meeting_id) {
+                console.log('Participant joined:', data);
+                fetchParticipants();
+            }
+        },
+        participant_left: function(data) {
+            if (currentMeetingId === data.meeting_id) {
+                console.log('Participant left:', data);
+                fetchParticipants();
+            }
+        },
+        meeting_started: function(data) {
+            if (currentMeetingId === data.meeting_id) {
+                $('#meeting-status').html(`<div class="alert alert-success">Meeting ${data.topic} (ID: ${data.meeting_id}) is active</div>`);
+                meetingStarted = true;
+                fetchParticipants();
+            }
+        },
+        meeting_ended: function() {
+            meetingStarted = false;
+        },
+        // Talk time, status and engagement changes arrive coalesced, at most once per server tick
+        meeting_delta: function(data) {
+            if (currentMeetingId === data.meeting_id) {
+                console.log('Meeting delta:', data);
+                if (data.sentiment) {
+                    applySentimentAggregates(data.sentiment);
+                }
+                applyParticipantChanges(data.participants || []);
+                calculateEngagementMetrics();
+                calculateOverallMetrics();
+            }
         }
-    });
+    };
 
-    // Listen for participant data updates
-    socket.on('participant_joined', function(data) {
-        if (currentMeetingId === data.meeting_id) {
-            console.log('Participant joined:', data);
-            fetchParticipants();
+    // Apply events of the current meeting once and in version order; a gap means we missed some
+    function applyMeetingEvent(event, data) {
+        if (currentMeetingId && data.meeting_id === currentMeetingId && data.version) {
+            if (syncEpoch === null || data.version <= syncVersion) {
+                return; // covered by the snapshot being loaded, or already applied
+            }
+            if (data.version > syncVersion + 1) {
+                requestMeetingSync(); // the replay includes this event
+                return;
+            }
+            syncVersion = data.version;
         }
-    });
+        meetingEventHandlers[event](data);
+    }
 
-    socket.on('participant_left', function(data) {
-        if (currentMeetingId === data.meeting_id) {
-            console.log('Participant left:', data);
-            fetchParticipants();
-        }
+    Object.keys(meetingEventHandlers).forEach(function(event) {
+        socket.on(event, function(data) {
+            if (data instanceof ArrayBuffer) {
+                data = decodeMeetingDelta(data);
+            }
+            applyMeetingEvent(event, data);
+        });
     });
 
-    socket.on('meeting_started', function(data) {
-        if (currentMeetingId === data.meeting_id) {
-            $('#meeting-status').html(`<div class="alert alert-success">Meeting ${data.topic} (ID: ${data.meeting_id}) is active</div>`);
-            meetingStarted = true;
-            fetchParticipants();
-        }
+    // Full state of the meeting as of a version, sent on load or when a resume is not possible
+    socket.on('sync_snapshot', function(snapshot) {
+        if (snapshot.meeting_id !== currentMeetingId) return;
+        syncEpoch = snapshot.epoch;
+        syncVersion = snapshot.version;
+        applyMeetingSnapshot(snapshot);
     });
 
-    socket.on('meeting_ended', function() {
-        meetingStarted = false;
+    // Only the events missed while disconnected
+    socket.on('sync_replay', function(replay) {
+        if (replay.meeting_id !== currentMeetingId) return;
+        replay.events.forEach(function(entry) {
+            applyMeetingEvent(entry.event, Object.assign({}, entry.data, { version: entry.version }));
+        });
     });
-    
-    // Listen for talk time updates
-    socket.on('talk_time_updated', function(data) {
-        if (currentMeetingId === data.meeting_id) {
-            console.log('Talk time updated:', data);
-            updateParticipantsList();
-            calculateEngagementMetrics();
-            calculateOverallMetrics();
+
+    // Resume the current meeting after a reconnect
+    socket.on('connect', function() {
+        if (currentMeetingId) {
+            requestMeetingSync();
         }
     });
 
+    // Full participant index for binary deltas, requested when joining a meeting already in progress
+    socket.on('delta_index', function(data) {
+        deltaParticipantIds[data.meeting_id] = data.participants;
+    });
+
     // Set update interval for metrics, engagement data, and talk time
 
     setInterval(function() {
@@ -148,6 +205,83 @@ $(document).ready(function() {
     setInterval(periodicTalkTimeUpdate, 1000); // Update every second
 });
 
+// Decode a binary meeting_delta frame into the same shape as the JSON event
+function decodeMeetingDelta(buffer) {
+    const view = new DataView(buffer);
+    const decoder = new TextDecoder();
+    const version = view.getUint32(1, true);
+    let offset = 5; // after the frame version and sync version
+
+    function readString() {
+        const length = view.getUint8(offset);
+        const value = decoder.decode(new Uint8Array(buffer, offset + 1, length));
+        offset += 1 + length;
+        return value;
+    }
+
+    // Overall and recent-window sentiment aggregates: three u32 counts and an f64 score sum each
+    function readSentiment() {
+        const aggregates = {};
+        ['overall', 'recent'].forEach(function(key) {
+            aggregates[key] = {
+                positive: view.getUint32(offset, true),
+                neutral: view.getUint32(offset + 4, true),
+                negative: view.getUint32(offset + 8, true),
+                score_sum: view.getFloat64(offset + 12, true)
+            };
+            offset += 20;
+        });
+        return aggregates;
+    }
+
+    const meetingId = readString();
+    const ids = deltaParticipantIds[meetingId] = deltaParticipantIds[meetingId] || [];
+
+    const announced = view.getUint16(offset, true);
+    offset += 2;
+    for (let i = 0; i < announced; i++) {
+        const index = view.getUint16(offset, true);
+        offset += 2;
+        ids[index] = readString();
+    }
+
+    const participants = [];
+    let missingIndex = false;
+    const count = view.getUint16(offset, true);
+    offset += 2;
+    for (let i = 0; i < count; i++) {
+        const index = view.getUint16(offset, true);
+        const flags = view.getUint8(offset + 2);
+        offset += 3;
+        const change = { participant_id: ids[index] };
+        missingIndex = missingIndex || change.participant_id === undefined;
+        if (flags & 0x01) {
+            change.talk_time = view.getUint32(offset, true);
+            offset += 4;
+        }
+        if (flags & 0x02) change.is_active = Boolean(flags & 0x04);
+        if (flags & 0x08) change.is_engaged = Boolean(flags & 0x10);
+        if (flags & 0x20) {
+            change.timestamp = new Date(view.getFloat64(offset, true)).toISOString();
+            offset += 8;
+        }
+        if (flags & 0x40) change.sentiment = readSentiment();
+        participants.push(change);
+    }
+
+    const delta = { meeting_id: meetingId, version: version, participants: participants };
+    const meetingFlags = view.getUint8(offset);
+    offset += 1;
+    if (meetingFlags & 0x01) delta.sentiment = readSentiment();
+
+    // Indexes announced before we joined are unknown until the full index arrives
+    if (missingIndex) {
+        socket.emit('delta_index', { meeting_id: meetingId });
+    }
+
+    return delta;
+}
+
 // redirects to the transcripts page
 function viewTranscripts() {
     window.location.href = `/transcript-list`;
@@ -359,29 +493,52 @@ function updateRecognitionStatus(status) {
     }
 }
 
+// Next number in this browser's transcription sequence (kept across reloads, so the server can spot replays)
+function nextTranscriptSequence() {
+    const sequence = parseInt(localStorage.getItem('transcript_sequence') || '0', 10) + 1;
+    localStorage.setItem('transcript_sequence', sequence);
+    return sequence;
+}
+
 // In sendTranscriptionToServer function
 function sendTranscriptionToServer(transcript) {
     if (!transcript || !transcript.trim()) return;
     
+    // Retries reuse the same client id and sequence number, so the server stores the line once
+    const payload = JSON.stringify({
+        meeting_id: currentMeetingId,
+        participant_id: participantId,
+        participant_name: participantName,
+        transcript: transcript.trim(),
+        timestamp: new Date().toISOString(),
+        browser_id: localStorage.getItem('browser_id'),
+        client_id: window.crypto && crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).substring(2)}`,
+        sequence: nextTranscriptSequence()
+    });
+    postTranscription(payload, 0);
+}
+
+function postTranscription(payload, attempt) {
     $.ajax({
         url: '/api/transcription',
         type: 'POST',
         contentType: 'application/json',
-        data: JSON.stringify({
-            meeting_id: currentMeetingId,
-            participant_id: participantId,
-            participant_name: participantName,
-            transcript: transcript.trim(),
-            timestamp: new Date().toISOString(),
-            browser_id: localStorage.getItem('browser_id')
-        }),
+        data: payload,
         success: function(response) {
             console.log('Transcription sent successfully:', response);
             // Track this activity for engagement metrics
-            trackParticipantActivity(participantId, 'transcription');
+            if (!response.duplicate) {
+                trackParticipantActivity(participantId, 'transcription');
+            }
         },
         error: function(xhr, status, error) {
             console.error('Error sending transcription:', error);
+            // Network errors, overload and server errors are retried a few times
+            if (attempt < 3 && (xhr.status === 0 || xhr.status === 429 || xhr.status >= 500)) {
+                const retryAfter = parseInt(xhr.getResponseHeader('Retry-After') || '0', 10);
+                const delay = retryAfter > 0 ? retryAfter * 1000 : 1000 * Math.pow(2, attempt);
+                setTimeout(function() { postTranscription(payload, attempt + 1); }, delay);
+            }
         }
     });
 }
@@ -419,8 +576,8 @@ function sendTalkTimeToServer() {
                 browser_id: localStorage.getItem('browser_id')
             }),
             success: function(response) {
+                // The change comes back to every dashboard with the next meeting_delta
                 console.log('Talk time sent successfully:', response);
-                updateParticipantsList();
             },
             error: function(xhr, status, error) {
                 console.error('Error sending talk time:', error);
@@ -484,40 +641,48 @@ function loadMeetingData() {
     currentMeetingId = meetingId.replace(/\s+/g, '');
     console.log(`Loading data for meeting ID: ${meetingId}`);
     
-    // Check if meeting exists and get status
-    $.ajax({
-        url: `/api/meetings/${meetingId}`,  // no type specification needed - default "info"
-        type: 'GET',
-        success: function(response) {
-            console.log('Meeting data loaded:', response);
-            
-            if (response.success) {
-                const meetingStatus = response.data.status;
-                if (meetingStatus === 'active') {
-                    $('#meeting-status').html(`<div class="alert alert-success">Meeting is active</div>`);
-                } else if (meetingStatus === 'ended') {
-                    $('#meeting-status').html(`<div class="alert alert-warning">Meeting has ended</div>`);
-                } else {
-                    $('#meeting-status').html(`<div class="alert alert-info">Meeting status: ${meetingStatus}</div>`);
-                }
-                
-                // Fetch participants
-                fetchParticipants();
-                
-                // Get transcriptions
-                fetchTranscriptions();
-                
-                // Reset engagement metrics
-                resetMetrics();
-            } else {
-                $('#meeting-status').html(`<div class="alert alert-danger">Error: ${response.message}</div>`);
-            }
-        },
-        error: function(xhr, status, error) {
-            console.error('Error loading meeting data:', error);
-            $('#meeting-status').html(`<div class="alert alert-danger">Meeting not found or server error</div>`);
-        }
+    // Ask for a fresh snapshot; events then apply on top of its version
+    syncEpoch = null;
+    syncVersion = 0;
+    requestMeetingSync();
+}
+
+function requestMeetingSync() {
+    socket.emit('sync_meeting', {
+        meeting_id: currentMeetingId,
+        epoch: syncEpoch,
+        version: syncVersion
     });
+    socket.emit('delta_index', { meeting_id: currentMeetingId });
+}
+
+function applyMeetingSnapshot(snapshot) {
+    console.log('Meeting snapshot loaded:', snapshot);
+    
+    const meetingStatus = snapshot.info ? snapshot.info.status : 'offline';
+    if (meetingStatus === 'active') {
+        $('#meeting-status').html(`<div class="alert alert-success">Meeting is active</div>`);
+    } else if (meetingStatus === 'ended') {
+        $('#meeting-status').html(`<div class="alert alert-warning">Meeting has ended</div>`);
+    } else {
+        $('#meeting-status').html(`<div class="alert alert-info">Meeting status: ${meetingStatus}</div>`);
+    }
+    meetingStarted = meetingStatus === 'active';
+    
+    // Reset engagement metrics
+    resetMetrics();
+    
+    // Participants
+    meetingParticipants = snapshot.participants;
+    populateParticipantsDropdown(snapshot.participants);
+    displayParticipantsGrid(snapshot.participants);
+    displayParticipantsTable(snapshot.participants);
+    calculateEngagementMetrics();
+    
+    // Transcriptions
+    $('#transcription-container').empty();
+    displayTranscriptions(snapshot.transcriptions);
+    applySentimentAggregates(snapshot.sentiment);
 }
 
 function fetchParticipants() {
@@ -668,7 +833,6 @@ function fetchTranscriptions() {
             console.log('Transcriptions loaded:', response);
             if (response.success) {
                 displayTranscriptions(response.data);
-                calculateSentimentFromTranscriptions(response.data);
             } else {
                 console.error('Error in transcriptions response:', response.message);
             }
@@ -846,62 +1010,19 @@ function saveEngagementSnapshot() {
     });
 }
 
-function calculateSentimentFromTranscriptions(transcriptions) {
-    if (!transcriptions || transcriptions.length === 0) return;
-    
-    // Reset sentiment data
-    metricsData.sentiment.positive = 0;
-    metricsData.sentiment.neutral = 0;
-    metricsData.sentiment.negative = 0;
-    
-    // Calculate sentiment distribution
-    transcriptions.forEach(transcription => {
-        if (transcription.sentiment_score > 0.1) {
-            metricsData.sentiment.positive++;
-        } else if (transcription.sentiment_score < -0.1) {
-            metricsData.sentiment.negative++;
-        } else {
-            metricsData.sentiment.neutral++;
-        }
-    });
-    
-    // Calculate overall sentiment score (-100 to 100)
-    const total = metricsData.sentiment.positive + metricsData.sentiment.neutral + metricsData.sentiment.negative;
-    if (total > 0) {
-        // Weight: positive +1, neutral 0, negative -1
-        const weightedSum = metricsData.sentiment.positive - metricsData.sentiment.negative;
-        const sentimentScore = Math.round((weightedSum / total) * 100);
-        
-        // Update sentiment metrics
-        metricsData.sentiment.previous = metricsData.sentiment.current;
-        metricsData.sentiment.current = sentimentScore;
-        metricsData.sentiment.values.push(sentimentScore);
-        
-        // Limit history to last 10 values
-        if (metricsData.sentiment.values.length > 10) {
-            metricsData.sentiment.values.shift();
-        }
-    }
-    
-    // Update sentiment chart
-    updateSentimentUI();
-}
-
-function updateSentimentMetrics(score) {
-    // Add sentiment to appropriate category
-    if (score > 0.1) {
-        metricsData.sentiment.positive++;
-    } else if (score < -0.1) {
-        metricsData.sentiment.negative++;
-    } else {
-        metricsData.sentiment.neutral++;
-    }
+// Sentiment counts are maintained by the server (see sentiment.py) and arrive with snapshots and meeting_delta events
+function applySentimentAggregates(aggregates) {
+    if (!aggregates) return;
+    const overall = aggregates.overall;
+    metricsData.sentiment.positive = overall.positive;
+    metricsData.sentiment.neutral = overall.neutral;
+    metricsData.sentiment.negative = overall.negative;
     
     // Calculate overall sentiment score (-100 to 100)
-    const total = metricsData.sentiment.positive + metricsData.sentiment.neutral + metricsData.sentiment.negative;
+    const total = overall.positive + overall.neutral + overall.negative;
     if (total > 0) {
         // Weight: positive +1, neutral 0, negative -1
-        const weightedSum = metricsData.sentiment.positive - metricsData.sentiment.negative;
+        const weightedSum = overall.positive - overall.negative;
         const sentimentScore = Math.round((weightedSum / total) * 100);
         
         // Update sentiment metrics
@@ -1068,7 +1189,31 @@ function addTranscription(transcription) {
     }
 }
 
-function updateParticipantsList() {
-    // Update the participants table and video grid
-    fetchParticipants();
+// Apply the participant changes of a meeting_delta to the loaded participants and redraw them, without refetching
+function applyParticipantChanges(changes) {
+    let unknownParticipant = false;
+    changes.forEach(function(change) {
+        if (change.participant_id === undefined) {
+            return; // binary index not known yet, a delta_index request is on its way
+        }
+        const participant = meetingParticipants.find(p => p.id === change.participant_id);
+        if (!participant) {
+            unknownParticipant = true;
+            return;
+        }
+        if (change.talk_time !== undefined) participant.talk_time = change.talk_time;
+        if (change.is_active !== undefined) participant.is_active = change.is_active;
+        if (change.is_engaged !== undefined) participant.is_engaged = change.is_engaged;
+        if (change.sentiment) participant.sentiment = change.sentiment;
+    });
+
+    if (unknownParticipant) {
+        // Someone we have not loaded yet (their join event raced the list); load the list once
+        fetchParticipants();
+        return;
+    }
+    if (changes.length > 0) {
+        displayParticipantsGrid(meetingParticipants);
+        displayParticipantsTable(meetingParticipants);
+    }
 }
@@ -0,0 +1,78 @@
+"""
+Versioned event log per meeting, so dashboards can resume after a reconnect
+
+Every event published for a meeting gets the next version number of that meeting and is kept in
+a bounded ring buffer. A client that knows the last version it applied gets back only the events
+it missed; a client that is new, restarted, or too far behind (the buffer rolled over) is told to
+load a fresh snapshot instead. Versions are only meaningful within one server process, which is
+identified by SYNC_EPOCH.
+"""
+import os
+import threading
+import uuid
+from collections import deque
+
+SYNC_BUFFER_SIZE = int(os.getenv('SYNC_BUFFER_SIZE', 500))   # events kept per meeting
+
+# Changes whenever the server restarts, invalidating versions clients remember
+SYNC_EPOCH = uuid.uuid4().hex
+
+
+class MeetingSync:
+    """Per-meeting monotonically increasing versions with a ring buffer of recent events"""
+
+    def __init__(self, buffer_size=SYNC_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.epoch = SYNC_EPOCH
+        self._versions = {}
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def record(self, meeting_id, event, payload):
+        """Assign the meeting's next version to an event, buffer it, and return the version"""
+        with self._lock:
+            version = self._versions.get(meeting_id, 0) + 1
+            self._versions[meeting_id] = version
+            buffer = self._buffers.get(meeting_id)
+            if buffer is None:
+                buffer = self._buffers[meeting_id] = deque(maxlen=self.buffer_size)
+            buffer.append((version, event, payload))
+            return version
+
+    def version(self, meeting_id):
+        """Latest version published for a meeting (0 if none)"""
+        with self._lock:
+            return self._versions.get(meeting_id, 0)
+
+    def events_since(self, meeting_id, epoch, version):
+        """
+        Events a client at (epoch, version) missed, as a list of {version, event, data}
+        Returns None when the client has to load a snapshot instead, including when version is not
+        a non-negative integer (it comes straight from the client)
+        """
+        if epoch != self.epoch or version is None or isinstance(version, bool):
+            return None
+        try:
+            version = int(version)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        if version < 0:
+            return None
+        with self._lock:
+            current = self._versions.get(meeting_id, 0)
+            if version > current:
+                return None
+            if version == current:
+                return []
+            buffer = self._buffers.get(meeting_id) or ()
+            if not buffer or buffer[0][0] > version + 1:
+                return None
+            return [
+                {'version': v, 'event': event, 'data': payload}
+                for v, event, payload in buffer if v > version
+            ]
+
+    def forget(self, meeting_id):
+        """Drop a finished meeting's buffered events (its version keeps counting if it resumes)"""
+        with self._lock:
+            self._buffers.pop(meeting_id, None)
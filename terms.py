@@ -0,0 +1,263 @@
+"""
+Live term index per meeting, answering "what is this meeting about right now"
+
+Each transcription is tokenized once as it arrives (stopwords removed) and its terms are counted
+per meeting, per participant and per TERM_BUCKET_SECONDS bucket of the utterance timestamp. The
+meeting-wide counts and the counts of the last TERM_WINDOW_SECONDS each keep a lazily cleaned
+max-heap, so the top k terms are read in O(k log n) instead of rescanning every transcription.
+The recent window of a meeting in progress ends at the current time when read, so terms from before
+a lull drop out even if nobody has spoken since; reading never moves the window itself, which only
+follows the utterance timestamps, so late utterances from a client clock behind the server still count.
+An index lost to a restart is rebuilt from the stored transcriptions the first time it is needed,
+and a meeting's final counts are stored with its archive when it ends.
+"""
+import heapq
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+TERM_BUCKET_SECONDS = int(os.getenv('TERM_BUCKET_SECONDS', 60))
+TERM_WINDOW_SECONDS = int(os.getenv('TERM_WINDOW_SECONDS', 300))    # "recent" terms cover the last 5 minutes
+TERM_TOP_K = 10
+TERM_MAX_K = 100
+
+WORD_PATTERN = re.compile(r"[a-z][a-z']+")
+STOPWORDS = frozenset('''
+    a about above after again all also am an and any are as at be because been before being below between both but
+    by can could did do does doing down during each few for from further get got had has have having he her here
+    hers him his how i if in into is it its itself just know like me more most my no nor not now of off on once
+    only or other our ours out over own really right same she should so some such than that the their them then
+    there these they this those through to too under until up us very was we were what when where which while who
+    whom why will with would yeah yes you your yours okay ok um uh oh going think want well thing things lot
+'''.split())
+
+def tokenize(text):
+    """Lowercase terms of a transcript, without stopwords and words of fewer than three letters"""
+    return [
+        word for word in WORD_PATTERN.findall((text or '').lower())
+        if len(word) > 2 and word not in STOPWORDS
+    ]
+
+def _bucket(timestamp=None):
+    """Bucket number of an ISO timestamp (naive times are taken as UTC), or of now without a parseable one"""
+    try:
+        parsed = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    except ValueError:
+        parsed = datetime.now(timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() // TERM_BUCKET_SECONDS)
+
+def _bucket_start(bucket):
+    return datetime.fromtimestamp(bucket * TERM_BUCKET_SECONDS, timezone.utc).isoformat()
+
+
+class TopTerms:
+    """Term counts with a max-heap of (count, term) entries; entries left stale by later changes are dropped when met"""
+
+    def __init__(self):
+        self.counts = {}
+        self._heap = []
+
+    def add(self, term, delta=1):
+        count = self.counts.get(term, 0) + delta
+        if count > 0:
+            self.counts[term] = count
+            heapq.heappush(self._heap, (-count, term))
+        else:
+            self.counts.pop(term, None)
+        # Stale entries are bounded by rebuilding once they outnumber the live ones
+        if len(self._heap) > 2 * len(self.counts) + 64:
+            self._heap = [(-c, t) for t, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, k):
+        """The k most frequent terms as (term, count), most frequent first"""
+        result = []
+        kept = []
+        while self._heap and len(result) < k:
+            entry = heapq.heappop(self._heap)
+            term, count = entry[1], -entry[0]
+            if self.counts.get(term) != count or (kept and kept[-1] == entry):
+                continue
+            result.append((term, count))
+            kept.append(entry)
+        for entry in kept:
+            heapq.heappush(self._heap, entry)
+        return result
+
+
+class MeetingTerms:
+    """Term counts of one meeting: overall, per participant, per time bucket and over the recent window"""
+
+    window_buckets = max(1, TERM_WINDOW_SECONDS // TERM_BUCKET_SECONDS)
+
+    def __init__(self):
+        self.overall = TopTerms()
+        self.recent = TopTerms()
+        self.participants = {}
+        self.buckets = {}
+        self.utterances = 0
+        self._ids = set()
+        self._window = set()
+        self._latest = None
+
+    def add(self, transcription_id, participant_id, text, timestamp):
+        """Count an utterance's terms; returns False if this transcription was counted already"""
+        if transcription_id is not None:
+            if transcription_id in self._ids:
+                return False
+            self._ids.add(transcription_id)
+        self.utterances += 1
+        terms = tokenize(text)
+        if terms:
+            self._count(_bucket(timestamp), participant_id, terms)
+        return True
+
+    def _count(self, bucket, participant_id, terms):
+        if self._latest is None or bucket > self._latest:
+            self._advance(bucket)
+        in_window = bucket > self._latest - self.window_buckets
+        if in_window:
+            self._window.add(bucket)
+        counts = self.buckets.setdefault(bucket, {})
+        participant = self.participants.setdefault(participant_id, {})
+        for term in terms:
+            self.overall.add(term)
+            counts[term] = counts.get(term, 0) + 1
+            participant[term] = participant.get(term, 0) + 1
+            if in_window:
+                self.recent.add(term)
+
+    def _advance(self, latest):
+        """Move the recent window forward to end at bucket latest, subtracting the buckets it leaves behind"""
+        self._latest = latest
+        for bucket in [b for b in self._window if b <= latest - self.window_buckets]:
+            self._window.discard(bucket)
+            for term, count in self.buckets[bucket].items():
+                self.recent.add(term, -count)
+
+    def _recent_top(self, k, end):
+        """Top k recent terms for a window ending at bucket end, without moving the window"""
+        expired = [b for b in self._window if b <= end - self.window_buckets]
+        if not expired:
+            return self.recent.top(k)
+        counts = dict(self.recent.counts)
+        for bucket in expired:
+            for term, count in self.buckets[bucket].items():
+                counts[term] -= count
+        return heapq.nsmallest(k, ((t, c) for t, c in counts.items() if c > 0), key=lambda i: (-i[1], i[0]))
+
+    def top(self, k, participant_id=None, now=None):
+        """
+        Top k terms overall and in the recent window, or overall for one participant
+        With now (a bucket number), the recent window ends there if that is later than the latest utterance
+        """
+        if participant_id is not None:
+            counts = self.participants.get(participant_id, {})
+            return {
+                'participant_id': participant_id,
+                'terms': [{'term': t, 'count': c} for t, c in heapq.nlargest(k, counts.items(), key=lambda i: i[1])]
+            }
+        end = self._latest if now is None or (self._latest is not None and self._latest >= now) else now
+        return {
+            'terms': [{'term': t, 'count': c} for t, c in self.overall.top(k)],
+            'recent': [{'term': t, 'count': c} for t, c in self._recent_top(k, end)] if self._latest is not None else [],
+            'window_start': _bucket_start(end - self.window_buckets + 1) if end is not None else None,
+            'window_seconds': TERM_WINDOW_SECONDS
+        }
+
+    def snapshot(self):
+        """Final counts as stored with the archive"""
+        return {
+            'utterances': self.utterances,
+            'bucket_seconds': TERM_BUCKET_SECONDS,
+            'overall': dict(self.overall.counts),
+            'participants': {participant_id: dict(counts) for participant_id, counts in self.participants.items()},
+            'buckets': [
+                {'bucket_start': _bucket_start(bucket), 'terms': dict(self.buckets[bucket])}
+                for bucket in sorted(self.buckets)
+            ]
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Rebuild an index from counts stored with an archive"""
+        index = cls()
+        for bucket in snapshot.get('buckets', []):
+            key = _bucket(bucket['bucket_start'])
+            index._advance(key)
+            index._window.add(key)
+            index.buckets[key] = dict(bucket['terms'])
+            for term, count in bucket['terms'].items():
+                index.overall.add(term, count)
+                index.recent.add(term, count)
+        index.participants = snapshot.get('participants', {})
+        index.utterances = snapshot.get('utterances', 0)
+        return index
+
+
+def build_meeting_terms(transcriptions):
+    """Index stored transcriptions (dicts with id, participant_id, transcript and timestamp); None if there are none"""
+    if not transcriptions:
+        return None
+    index = MeetingTerms()
+    for t in transcriptions:
+        index.add(t['id'], t['participant_id'], t['transcript'], t['timestamp'])
+    return index
+
+
+class TermIndex:
+    """
+    Term indexes of the meetings in progress
+    loader(meeting_id) returns a meeting's stored transcriptions, used to rebuild an index that is not in memory
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._meetings = {}
+        self._lock = threading.Lock()
+
+    def _get(self, meeting_id):
+        """The meeting's index, rebuilt from its stored transcriptions if needed (None if it has none)"""
+        with self._lock:
+            index = self._meetings.get(meeting_id)
+        if index is not None:
+            return index
+
+        index = build_meeting_terms(self.loader(meeting_id))
+        if index is None:
+            return None
+        with self._lock:
+            # Another request may have rebuilt it meanwhile
+            return self._meetings.setdefault(meeting_id, index)
+
+    def add(self, meeting_id, transcription_id, participant_id, text, timestamp):
+        """Count a stored transcription (one the rebuild already loaded is not counted twice)"""
+        index = self._get(meeting_id)
+        with self._lock:
+            if index is None:
+                index = self._meetings.setdefault(meeting_id, MeetingTerms())
+            index.add(transcription_id, participant_id, text, timestamp)
+
+    def top(self, meeting_id, k=TERM_TOP_K, participant_id=None):
+        """Top terms of a meeting (see MeetingTerms.top), or None if it has no transcriptions"""
+        index = self._get(meeting_id)
+        if index is None:
+            return None
+        with self._lock:
+            return dict(index.top(k, participant_id, now=_bucket()), utterances=index.utterances)
+
+    def snapshot(self, meeting_id):
+        """A meeting's final counts (see MeetingTerms.snapshot), or None if it has no transcriptions"""
+        index = self._get(meeting_id)
+        if index is None:
+            return None
+        with self._lock:
+            return index.snapshot()
+
+    def forget(self, meeting_id):
+        """Drop an ended meeting's index"""
+        with self._lock:
+            self._meetings.pop(meeting_id, None)
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Every test session gets its own database files, set before database.py reads its configuration
+_data_dir = tempfile.mkdtemp(prefix='zoom-engagement-tests-')
+os.environ['DATABASE_PATH'] = os.path.join(_data_dir, 'zoom_engagement.db')
+os.environ['LIVE_DATABASE_PATH'] = os.path.join(_data_dir, 'zoom_engagement.db-live')
+os.environ['LIVE_BACKUP_PATH'] = os.path.join(_data_dir, 'zoom_engagement.db.live-backup')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
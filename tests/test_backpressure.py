@@ -0,0 +1,73 @@
+import time
+
+import gevent
+import pytest
+
+import app as dashboard
+from database import submit_write, meeting_shard
+from ratelimit import Backpressure, PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH
+
+MEETING_ID = '555000111'
+
+
+@pytest.fixture
+def client():
+    return dashboard.app.test_client()
+
+
+def test_backpressure_sheds_by_priority():
+    backpressure = Backpressure(lambda: (10, 0.0), queue_depth=5, wait_seconds=0.5)
+    assert backpressure.should_shed(PRIORITY_LOW) >= 1
+    assert backpressure.should_shed(PRIORITY_NORMAL) == 0
+    assert backpressure.should_shed(PRIORITY_HIGH) == 0
+
+
+def test_backpressure_retry_after_follows_wait():
+    backpressure = Backpressure(lambda: (0, 3.0), queue_depth=5, wait_seconds=0.5)
+    assert backpressure.should_shed(PRIORITY_LOW) == 3.0
+
+
+def test_concurrent_interim_updates_are_shed_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(dashboard.backpressure, 'queue_depth', 5)
+    monkeypatch.setattr(dashboard.backpressure, 'wait_seconds', 60)
+
+    # Hold the writer so the requests' writes pile up behind it
+    stalled = submit_write(lambda cursor: time.sleep(1.0), shard=meeting_shard(MEETING_ID))
+
+    def post(i):
+        return client.post('/api/talk-time', json={
+            'meeting_id': MEETING_ID,
+            'participant_id': f'p{i}',
+            'talk_time': i,
+            'browser_id': f'b{i}',
+            'is_interim': True,
+        })
+
+    started = time.monotonic()
+    greenlets = [gevent.spawn(post, i) for i in range(20)]
+    gevent.joinall(greenlets, timeout=10)
+    stalled.result()
+
+    responses = [g.value for g in greenlets]
+    shed = [r for r in responses if r.status_code == 429]
+    assert shed, [r.status_code for r in responses]
+    assert all(int(r.headers['Retry-After']) >= 1 for r in shed)
+    # The shed requests were answered while the writer was still busy
+    assert time.monotonic() - started < 5
+
+
+def test_writes_yield_to_other_greenlets():
+    ticks = []
+
+    def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            gevent.sleep(0.02)
+
+    def slow_write():
+        return submit_write(lambda cursor: time.sleep(0.3) or 'done').result()
+
+    writer = gevent.spawn(slow_write)
+    gevent.joinall([gevent.spawn(ticker), writer])
+    assert writer.value == 'done'
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.2
@@ -0,0 +1,70 @@
+import pytest
+
+import database
+from database import init_db, save_transcription_db, get_transcriptions_db, forget_cached_keys, meeting_shard, _recent_segments
+
+
+@pytest.fixture(scope='module', autouse=True)
+def schema():
+    init_db()
+
+
+def save(meeting_id, transcript, participant_id='p1', browser_id='b1', client_id=None, sequence=None):
+    return save_transcription_db(
+        meeting_id, participant_id, 'Alice', transcript, 0.0, '2024-05-01T10:00:00', browser_id,
+        client_id=client_id, sequence=sequence
+    ).result()
+
+
+def stored(meeting_id):
+    return [t['transcript'] for t in get_transcriptions_db(meeting_id)]
+
+
+def test_retry_with_same_client_id_is_stored_once():
+    first = save('dd-1', 'hello there', client_id='c1', sequence=1)
+    retry = save('dd-1', 'hello there', client_id='c1', sequence=1)
+    assert not first['duplicate']
+    assert retry == {'id': first['id'], 'duplicate': True, 'transcript': None, 'sentiment_score': None}
+    assert stored('dd-1') == ['hello there']
+
+
+def test_replayed_sequence_from_same_browser_is_a_repeat():
+    first = save('dd-2', 'first line', sequence=7)
+    save('dd-2', 'second line', sequence=8)
+    replay = save('dd-2', 'first line', sequence=7)
+    assert replay['duplicate'] and replay['id'] == first['id']
+    # Another browser's sequence numbers are its own
+    assert not save('dd-2', 'first line', browser_id='b2', sequence=7)['duplicate']
+    assert stored('dd-2') == ['first line', 'second line', 'first line']
+
+
+def test_segments_without_ids_are_stored_as_sent():
+    for text in ['yes', 'yes', 'no', 'no problem']:
+        assert not save('dd-3', text)['duplicate']
+    assert stored('dd-3') == ['yes', 'yes', 'no', 'no problem']
+
+
+def test_new_sequence_with_repeated_words_is_stored():
+    save('dd-4', 'agreed', sequence=1)
+    assert not save('dd-4', 'agreed', sequence=2)['duplicate']
+    assert stored('dd-4') == ['agreed', 'agreed']
+
+
+def test_window_holds_the_last_segments_only(monkeypatch):
+    monkeypatch.setattr(database, 'DEDUP_WINDOW_SIZE', 2)
+    save('dd-5', 'one', sequence=1, participant_id='p5')
+    save('dd-5', 'two', sequence=2, participant_id='p5')
+    save('dd-5', 'three', sequence=3, participant_id='p5')
+    assert save('dd-5', 'two', sequence=2, participant_id='p5')['duplicate']
+    assert not save('dd-5', 'one', sequence=1, participant_id='p5')['duplicate']
+
+
+def test_rollback_clears_only_its_shard():
+    save('dd-6', 'kept', sequence=1)
+    shard = meeting_shard('dd-6')
+    _recent_segments.setdefault(shard + 1, {})[(1, 1)] = ['other shard']
+    forget_cached_keys(shard + 1)
+    assert shard + 1 not in _recent_segments
+    assert _recent_segments[shard]
+    forget_cached_keys(shard)
+    assert shard not in _recent_segments
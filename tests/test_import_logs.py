@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+
+import database
+from database import init_db, get_writer, get_final_transcript_db
+from import_logs import import_logs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_log(path, records):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    return str(path)
+
+
+def webhook(event, meeting_id, event_ts, **obj):
+    return {'event': event, 'event_ts': event_ts, 'payload': {'object': dict(obj, id=meeting_id)}}
+
+
+def utterance(text, second, **fields):
+    return dict({
+        'meeting_id': 'imp-1', 'participant_id': 'p1', 'participant_name': 'Alice',
+        'transcript': text, 'timestamp': f'2024-05-01T10:00:{second:02d}Z', 'browser_id': 'b1'
+    }, **fields)
+
+
+def test_import_keeps_every_utterance_and_collapses_retries(tmp_path):
+    init_db()
+    webhooks = write_log(tmp_path / 'webhooks.jsonl', [
+        webhook('meeting.participant_joined', 'imp-1', 1714557600000, participant={'id': 'p1', 'user_name': 'Alice'}),
+        webhook('meeting.ended', 'imp-1', 1714557660000),
+    ])
+    transcripts = write_log(tmp_path / 'transcripts.jsonl', [
+        utterance('no', 1),
+        utterance('no problem', 2),
+        utterance('yes', 3, client_id='c1', sequence=1),
+        utterance('yes', 4, client_id='c1', sequence=1),
+        utterance('yes', 5),
+    ])
+
+    stats = import_logs([webhooks, transcripts])
+
+    assert stats['stored'] == 6 and stats['duplicate'] == 1 and stats['failed'] == 0
+    archive = get_final_transcript_db('imp-1')
+    assert [t['transcript'] for t in archive['transcript_data']] == ['no', 'no problem', 'yes', 'yes']
+
+
+def test_bulk_load_stops_live_checkpointers(tmp_path):
+    init_db()
+    get_writer(0)
+    checkpointer = database._checkpointers[0]
+
+    import_logs([write_log(tmp_path / 'empty.jsonl', [])])
+
+    assert not database._checkpointers
+    assert not checkpointer._thread.is_alive()
+    # The next writer resumes them
+    get_writer(0)
+    assert 0 in database._checkpointers
+
+
+def test_importer_does_not_load_the_app():
+    loaded = subprocess.run(
+        [sys.executable, '-c', "import sys, import_logs; print('app' in sys.modules)"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert loaded.stdout.strip() == 'False'
@@ -0,0 +1,111 @@
+import json
+import struct
+from datetime import datetime, timezone
+
+from payloads import DeltaEncoder, FRAME_VERSION, _sample_delta
+
+
+def decode_meeting_delta(frame, known_ids=None):
+    """Python port of decodeMeetingDelta in static/js/script.js, offsets and flag bits included"""
+    offset = 0
+
+    def read(fmt):
+        nonlocal offset
+        values = struct.unpack_from('<' + fmt, frame, offset)
+        offset += struct.calcsize('<' + fmt)
+        return values if len(values) > 1 else values[0]
+
+    def read_string():
+        nonlocal offset
+        length = read('B')
+        value = frame[offset:offset + length].decode('utf-8')
+        offset += length
+        return value
+
+    def read_sentiment():
+        aggregates = {}
+        for key in ('overall', 'recent'):
+            positive, neutral, negative, score_sum = read('IIId')
+            aggregates[key] = {'positive': positive, 'neutral': neutral, 'negative': negative, 'score_sum': score_sum}
+        return aggregates
+
+    frame_version = read('B')
+    version = read('I')
+    meeting_id = read_string()
+    ids = dict(known_ids or {})
+    for _ in range(read('H')):
+        index = read('H')
+        ids[index] = read_string()
+
+    participants = []
+    for _ in range(read('H')):
+        index, flags = read('HB')
+        change = {'participant_id': ids.get(index)}
+        if flags & 0x01:
+            change['talk_time'] = read('I')
+        if flags & 0x02:
+            change['is_active'] = bool(flags & 0x04)
+        if flags & 0x08:
+            change['is_engaged'] = bool(flags & 0x10)
+        if flags & 0x20:
+            change['timestamp'] = read('d')
+        if flags & 0x40:
+            change['sentiment'] = read_sentiment()
+        participants.append(change)
+
+    delta = {'frame_version': frame_version, 'meeting_id': meeting_id, 'version': version, 'participants': participants}
+    if read('B') & 0x01:
+        delta['sentiment'] = read_sentiment()
+    assert offset == len(frame), 'trailing bytes in frame'
+    return delta, ids
+
+
+def test_round_trip_every_field():
+    meeting_id, participants = _sample_delta(3)
+    meeting_sentiment = {
+        'overall': {'positive': 40, 'neutral': 90, 'negative': 12, 'score_sum': 19.5},
+        'recent': {'positive': 6, 'neutral': 15, 'negative': 3, 'score_sum': 3.75},
+    }
+    frame = DeltaEncoder().encode(meeting_id, participants, version=42, meeting_fields={'sentiment': meeting_sentiment})
+    delta, _ = decode_meeting_delta(frame)
+
+    assert delta['frame_version'] == FRAME_VERSION
+    assert delta['version'] == 42
+    assert delta['meeting_id'] == meeting_id
+    assert delta['sentiment'] == meeting_sentiment
+    expected_ms = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc).timestamp() * 1000
+    for sent, received in zip(participants, delta['participants']):
+        assert received['participant_id'] == sent['participant_id']
+        assert received['talk_time'] == sent['talk_time']
+        assert received['is_active'] is sent['is_active']
+        assert received['is_engaged'] is sent['is_engaged']
+        assert received['timestamp'] == expected_ms
+        assert received['sentiment'] == sent['sentiment']
+
+
+def test_optional_fields_are_omitted():
+    frame = DeltaEncoder().encode('m1', [{'participant_id': 'p1', 'is_active': False}])
+    delta, _ = decode_meeting_delta(frame)
+    assert delta['participants'] == [{'participant_id': 'p1', 'is_active': False}]
+    assert 'sentiment' not in delta
+
+
+def test_indexes_are_announced_once():
+    encoder = DeltaEncoder()
+    first, ids = decode_meeting_delta(encoder.encode('m1', [{'participant_id': 'p1', 'talk_time': 5}]))
+    second_frame = encoder.encode('m1', [{'participant_id': 'p1', 'talk_time': 6}, {'participant_id': 'p2', 'talk_time': 1}])
+    second, ids = decode_meeting_delta(second_frame, ids)
+
+    assert [p['participant_id'] for p in second['participants']] == ['p1', 'p2']
+    assert encoder.participant_ids('m1') == ['p1', 'p2']
+    # A client that missed the first frame cannot name p1 until it fetches the index
+    late, _ = decode_meeting_delta(second_frame)
+    assert late['participants'][0]['participant_id'] is None
+
+
+def test_binary_is_smaller_than_json():
+    meeting_id, participants = _sample_delta(20)
+    encoder = DeltaEncoder()
+    encoder.encode(meeting_id, participants)
+    payload = json.dumps(['meeting_delta', {'meeting_id': meeting_id, 'participants': participants}])
+    assert len(encoder.encode(meeting_id, participants)) < len(payload)
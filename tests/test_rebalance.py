@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEETINGS = [f'rebalance-{i}' for i in range(12)]
+
+# Each step runs in its own process, as the server and rebalance.py would, against its own database files
+WRITE = '''
+from database import init_db, save_engagement_data_db, save_transcription_db, save_and_archive_meeting_data_db
+init_db()
+for i, meeting_id in enumerate(MEETINGS):
+    save_engagement_data_db(meeting_id, {'id': 'p1', 'name': 'Alice', 'join_time': '2024-05-01T10:00:00'}).result()
+    save_transcription_db(meeting_id, 'p1', 'Alice', 'said in ' + meeting_id, 0.0, '2024-05-01T10:00:00', 'b1').result()
+    if i % 2 == 0:
+        save_and_archive_meeting_data_db(meeting_id).result()
+'''
+
+READ = '''
+import json
+from database import (init_db, get_transcriptions_db, get_final_transcript_db, list_shard_meetings_db,
+                      meeting_shard, DATABASE_SHARDS)
+init_db()
+result = {'misplaced': [], 'transcripts': {}}
+for shard in range(DATABASE_SHARDS):
+    result['misplaced'] += [m for m in list_shard_meetings_db(shard) if meeting_shard(m) != shard]
+for i, meeting_id in enumerate(MEETINGS):
+    if i % 2 == 0:
+        rows = get_final_transcript_db(meeting_id)['transcript_data']
+    else:
+        rows = get_transcriptions_db(meeting_id)
+    result['transcripts'][meeting_id] = [row['transcript'] for row in rows]
+print(json.dumps(result))
+'''
+
+
+def run(tmp_path, *args, shards=1, script=None):
+    env = dict(
+        os.environ,
+        DATABASE_PATH=str(tmp_path / 'zoom_engagement.db'),
+        LIVE_DATABASE_PATH=str(tmp_path / 'zoom_engagement.db-live'),
+        LIVE_BACKUP_PATH=str(tmp_path / 'zoom_engagement.db.live-backup'),
+        DATABASE_SHARDS=str(shards),
+    )
+    command = [sys.executable, '-c', f'MEETINGS = {MEETINGS!r}\n' + script] if script else [sys.executable, *args]
+    done = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    assert done.returncode == 0 and 'Error' not in done.stdout, done.stdout + done.stderr
+    return done.stdout
+
+
+def read(tmp_path, shards):
+    return json.loads(run(tmp_path, shards=shards, script=READ).strip().splitlines()[-1])
+
+
+def test_rebalance_moves_every_meeting_and_back(tmp_path):
+    run(tmp_path, script=WRITE)
+    expected = {meeting_id: [f'said in {meeting_id}'] for meeting_id in MEETINGS}
+
+    run(tmp_path, 'rebalance.py', '--shards', '3')
+    spread = read(tmp_path, 3)
+    assert spread == {'misplaced': [], 'transcripts': expected}
+    assert os.path.exists(tmp_path / 'zoom_engagement.shard2.db')
+
+    run(tmp_path, 'rebalance.py', '--shards', '1')
+    assert read(tmp_path, 1) == {'misplaced': [], 'transcripts': expected}
+    assert not os.path.exists(tmp_path / 'zoom_engagement.shard1.db')
+
+
+def test_server_refuses_a_mismatched_layout(tmp_path):
+    run(tmp_path, script=WRITE)
+    run(tmp_path, 'rebalance.py', '--shards', '2')
+    env = dict(os.environ, DATABASE_PATH=str(tmp_path / 'zoom_engagement.db'),
+               LIVE_DATABASE_PATH=str(tmp_path / 'zoom_engagement.db-live'), DATABASE_SHARDS='1')
+    done = subprocess.run([sys.executable, '-c', 'from database import init_db; init_db()'],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    assert 'rebalance.py' in done.stderr
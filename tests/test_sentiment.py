@@ -0,0 +1,81 @@
+from sentiment import MeetingSentiment, SentimentIndex, SENTIMENT_BUCKET_SECONDS, _bucket
+
+WINDOW = MeetingSentiment.window_buckets
+
+
+def at(seconds):
+    """ISO timestamp seconds after 10:00"""
+    return f'2024-05-01T10:{seconds // 60:02d}:{seconds % 60:02d}Z'
+
+
+def counts(totals):
+    return totals['positive'], totals['neutral'], totals['negative']
+
+
+def test_overall_and_recent_per_speaker():
+    index = MeetingSentiment()
+    index.add(1, 'p1', 0.8, at(0))
+    index.add(2, 'p2', -0.6, at(WINDOW * SENTIMENT_BUCKET_SECONDS))
+    index.add(3, 'p1', 0.0, at(WINDOW * SENTIMENT_BUCKET_SECONDS + 1))
+    summary = index.as_dict()
+
+    assert counts(summary['overall']) == (1, 1, 1)
+    # The first utterance has left the window
+    assert counts(summary['recent']) == (0, 1, 1)
+    assert counts(summary['participants']['p1']['overall']) == (1, 1, 0)
+    assert counts(summary['participants']['p1']['recent']) == (0, 1, 0)
+    assert counts(summary['participants']['p2']['recent']) == (0, 0, 1)
+
+
+def test_transcriptions_are_counted_once():
+    index = MeetingSentiment()
+    assert index.add(1, 'p1', 0.8, at(0))
+    assert not index.add(1, 'p1', 0.8, at(0))
+    assert counts(index.meeting_totals()['overall']) == (1, 0, 0)
+
+
+def test_read_at_now_does_not_move_the_window():
+    index = MeetingSentiment()
+    index.add(1, 'p1', 0.8, at(0))
+    later = _bucket(at(0)) + WINDOW + 3
+    summary = index.as_dict(now=later)
+    assert counts(summary['recent']) == (0, 0, 0)
+    assert counts(summary['participants']['p1']['recent']) == (0, 0, 0)
+
+    # A late utterance from a client clock behind the server is still recent by utterance time
+    index.add(2, 'p2', -0.9, at(10))
+    summary = index.as_dict()
+    assert counts(summary['recent']) == (1, 0, 1)
+    assert counts(summary['participants']['p2']['recent']) == (0, 0, 1)
+
+
+def test_new_speaker_shares_the_meeting_window():
+    index = MeetingSentiment()
+    index.add(1, 'p1', 0.8, at(0))
+    index.add(2, 'p1', 0.8, at(WINDOW * SENTIMENT_BUCKET_SECONDS * 2))
+    # Older than the meeting's window: counted overall but never recent, for anyone
+    index.add(3, 'p2', 0.8, at(0))
+    summary = index.as_dict()
+    assert counts(summary['participants']['p2']['recent']) == (0, 0, 0)
+    assert counts(summary['recent']) == (1, 0, 0)
+
+
+def test_window_keeps_a_bounded_number_of_buckets():
+    index = MeetingSentiment()
+    for i in range(200):
+        index.add(i, f'p{i % 7}', 0.5, at(i * SENTIMENT_BUCKET_SECONDS // 4))
+    assert len(index.buckets) <= WINDOW
+    assert index.as_dict()['recent']['positive'] == sum(
+        totals.positive for totals, _ in index.buckets.values())
+
+
+def test_index_rebuilds_from_stored_transcriptions():
+    stored = [
+        {'id': 1, 'participant_id': 'p1', 'sentiment_score': 0.7, 'timestamp': at(0)},
+        {'id': 2, 'participant_id': 'p2', 'sentiment_score': -0.7, 'timestamp': at(5)},
+    ]
+    sentiment_index = SentimentIndex(loader=lambda meeting_id: stored)
+    meeting, participant = sentiment_index.add('m1', 2, 'p2', -0.7, at(5))
+    assert counts(meeting['overall']) == (1, 0, 1)
+    assert counts(participant['overall']) == (0, 0, 1)
+    assert counts(sentiment_index.summary('m1')['overall']) == (1, 0, 1)
@@ -0,0 +1,59 @@
+import pytest
+
+import app as dashboard
+from sync import MeetingSync
+
+
+@pytest.fixture
+def sync():
+    meeting_sync = MeetingSync(buffer_size=3)
+    for i in range(5):
+        meeting_sync.record('m1', 'meeting_delta', {'n': i + 1})
+    return meeting_sync
+
+
+def test_replays_only_missed_events(sync):
+    missed = sync.events_since('m1', sync.epoch, 3)
+    assert [event['version'] for event in missed] == [4, 5]
+    assert missed[0] == {'version': 4, 'event': 'meeting_delta', 'data': {'n': 4}}
+
+
+def test_up_to_date_client_gets_nothing(sync):
+    assert sync.events_since('m1', sync.epoch, 5) == []
+
+
+def test_snapshot_when_buffer_rolled_over(sync):
+    # Versions 3..5 are buffered, so a client at 1 missed version 2 for good
+    assert sync.events_since('m1', sync.epoch, 1) is None
+    assert [event['version'] for event in sync.events_since('m1', sync.epoch, 2)] == [3, 4, 5]
+
+
+def test_snapshot_for_other_epoch_or_future_version(sync):
+    assert sync.events_since('m1', 'old-epoch', 4) is None
+    assert sync.events_since('m1', sync.epoch, 6) is None
+    assert sync.events_since('other', sync.epoch, 0) == []
+
+
+def test_version_is_coerced(sync):
+    assert [event['version'] for event in sync.events_since('m1', sync.epoch, '4')] == [5]
+
+
+@pytest.mark.parametrize('version', [None, 'abc', '', [], {}, 1.5e400, -1, True])
+def test_invalid_version_asks_for_snapshot(sync, version):
+    assert sync.events_since('m1', sync.epoch, version) is None
+
+
+@pytest.mark.parametrize('version', ['abc', None, [1]])
+def test_sync_meeting_answers_invalid_versions_with_snapshot(monkeypatch, version):
+    emitted = []
+    monkeypatch.setattr(dashboard, 'emit', lambda event, data: emitted.append((event, data)))
+    dashboard.handle_sync_meeting({'meeting_id': '123', 'epoch': dashboard.meeting_sync.epoch, 'version': version})
+    assert [event for event, _ in emitted] == ['sync_snapshot']
+    assert emitted[0][1]['version'] == dashboard.meeting_sync.version('123')
+
+
+def test_sync_meeting_ignores_malformed_payload(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(dashboard, 'emit', lambda event, data: emitted.append((event, data)))
+    dashboard.handle_sync_meeting('not a dict')
+    assert emitted == []
@@ -0,0 +1,70 @@
+import random
+from collections import Counter
+
+from terms import MeetingTerms, TopTerms, TERM_BUCKET_SECONDS, _bucket, tokenize
+
+WINDOW = MeetingTerms.window_buckets
+
+
+def at(minute, second=0):
+    return f'2024-05-01T10:{minute:02d}:{second:02d}Z'
+
+
+def terms(result):
+    return {entry['term']: entry['count'] for entry in result}
+
+
+def test_tokenize_drops_stopwords_and_short_words():
+    assert tokenize("OK so the Budget is really on track, isn't it?") == ['budget', 'track', "isn't"]
+
+
+def test_top_terms_heap_matches_counts():
+    rng = random.Random(7)
+    top = TopTerms()
+    expected = Counter()
+    for _ in range(2000):
+        term = f'term{rng.randrange(40)}'
+        delta = 1 if rng.random() < 0.7 or expected[term] == 0 else -1
+        top.add(term, delta)
+        expected[term] += delta
+        if rng.random() < 0.05:
+            best = sorted(((-c, t) for t, c in expected.items() if c > 0))[:5]
+            assert top.top(5) == [(t, -c) for c, t in best]
+    # Stale entries are compacted rather than growing without bound
+    assert len(top._heap) <= 2 * len(top.counts) + 64
+
+
+def test_recent_window_follows_utterance_time():
+    index = MeetingTerms()
+    index.add(1, 'p1', 'budget budget', at(0))
+    index.add(2, 'p2', 'roadmap', at(WINDOW * TERM_BUCKET_SECONDS // 60 + 1))
+    result = index.top(10)
+    assert terms(result['terms']) == {'budget': 2, 'roadmap': 1}
+    assert terms(result['recent']) == {'roadmap': 1}
+
+
+def test_read_ends_window_at_now_without_moving_it():
+    index = MeetingTerms()
+    index.add(1, 'p1', 'budget', at(0))
+    later = _bucket(at(0)) + WINDOW + 5
+    assert index.top(10, now=later)['recent'] == []
+
+    # The read did not move the window: an utterance stamped just after the first still counts as recent
+    index.add(2, 'p2', 'roadmap', at(0, 30))
+    assert terms(index.top(10)['recent']) == {'budget': 1, 'roadmap': 1}
+
+
+def test_transcriptions_are_counted_once():
+    index = MeetingTerms()
+    assert index.add(1, 'p1', 'budget', at(0))
+    assert not index.add(1, 'p1', 'budget', at(0))
+    assert index.top(10, participant_id='p1')['terms'] == [{'term': 'budget', 'count': 1}]
+
+
+def test_snapshot_round_trip():
+    index = MeetingTerms()
+    index.add(1, 'p1', 'budget roadmap', at(0))
+    index.add(2, 'p2', 'budget', at(9))
+    restored = MeetingTerms.from_snapshot(index.snapshot())
+    assert restored.top(10) == index.top(10)
+    assert restored.snapshot() == index.snapshot()